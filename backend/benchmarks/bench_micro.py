@@ -0,0 +1,148 @@
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from starlette.responses import JSONResponse as StdlibJSONResponse
+
+from benchmarks import results
+from core import auth, security
+from core.config import settings
+from core.pagination import decode_cursor, encode_cursor
+from core.responses import JSONResponse, list_response
+from routers.clients import CLIENT_FIELDS, CLIENT_JSON, _client_dict
+from routers.recordings import _recording_dict
+
+# CPU-only micro-benchmarks for the per-request hot paths that don't touch Postgres:
+# response serializers, cursors, projection SQL, and core.security / token checks.
+# Each case is calibrated to run in batches of at least --batch-ms, and the spread
+# across --repeat batches gives the percentiles.
+#
+#   python -m benchmarks.bench_micro --save
+#   python -m benchmarks.bench_micro --compare benchmarks/results/micro-20261017-101500.json
+
+
+def _client_rows(n: int) -> list[dict]:
+    base = datetime(2026, 1, 1, 9, 30)
+    return [
+        {
+            "id": i, "user_id": 1, "client_name": f"Client {i} — Ünïcödé", "client_code": f"C-{i}",
+            "industry_sector": "Technology", "company_size": "51-200", "headquarters_location": "London",
+            "primary_office_location": None, "website_domain": f"client{i}.example.com",
+            "client_tier": "Normal", "engagement_health": "Good", "is_active": i % 7 != 0,
+            "created_at": base - timedelta(minutes=i, microseconds=i), "updated_at": base,
+        }
+        for i in range(n)
+    ]
+
+
+def _recording_rows(n: int) -> list[dict]:
+    base = datetime(2026, 1, 1, 9, 30)
+    transcript = "budget timeline renewal contract pricing " * 60
+    return [
+        {
+            "id": i, "user_id": 1, "client_id": i % 50, "transcript": transcript,
+            "transcription_status": "completed", "duration_seconds": 600, "audio_content_type": "audio/mp4",
+            "audio_size_bytes": 4_800_000, "created_at": base - timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+
+
+def cases(rows: int) -> dict:
+    clients = _client_rows(rows)
+    recordings = _recording_rows(rows)
+    client_body = {"clients": [_client_dict(r) for r in clients], "next_cursor": None}
+    items = JSONResponse(content=client_body["clients"]).body
+    cursor = encode_cursor(clients[-1]["created_at"], clients[-1]["id"])
+
+    password_hash = security.hash_password("correct horse battery staple")
+    token = security.create_access_token(1, "bench@example.com")
+    auth.verify_token(token)
+
+    return {
+        # Serializers
+        f"client_dicts_{rows}": lambda: [_client_dict(r) for r in clients],
+        f"clients_orjson_{rows}": lambda: JSONResponse(content=client_body).body,
+        f"clients_stdlib_{rows}": lambda: StdlibJSONResponse(content=client_body).body,
+        f"recordings_orjson_{rows}": lambda: JSONResponse(
+            content={"recordings": [_recording_dict(r) for r in recordings], "next_cursor": None}
+        ).body,
+        f"list_response_{rows}": lambda: list_response("clients", items, cursor).body,
+        "encode_cursor": lambda: encode_cursor(clients[0]["created_at"], 12345),
+        "decode_cursor": lambda: decode_cursor(cursor),
+        "projection_sql": lambda: CLIENT_JSON.subset(CLIENT_FIELDS.summary.fields).object_sql(),
+        # core.security and the auth dependency
+        f"hash_password_r{settings.BCRYPT_ROUNDS}": lambda: security.hash_password("correct horse battery staple"),
+        f"verify_password_r{settings.BCRYPT_ROUNDS}": lambda: security.verify_password(
+            "correct horse battery staple", password_hash,
+        ),
+        "needs_rehash": lambda: security.needs_rehash(password_hash),
+        "create_access_token": lambda: security.create_access_token(1, "bench@example.com"),
+        "decode_access_token": lambda: security.decode_access_token(token),
+        "verify_token_cached": lambda: auth.verify_token(token),
+    }
+
+
+def measure(fn, batch_ms: float, repeat: int) -> dict:
+    # Grow the batch until it takes batch_ms, then time `repeat` batches of that size
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if (time.perf_counter() - start) * 1000 >= batch_ms or number >= 1 << 20:
+            break
+        number *= 2
+
+    per_op = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_op.append((time.perf_counter() - start) / number)
+    per_op.sort()
+    mean = sum(per_op) / len(per_op)
+    return {
+        "batch": number,
+        "mean_us": round(mean * 1e6, 3),
+        "p50_us": round(results.percentile(per_op, 50) * 1e6, 3),
+        "p99_us": round(results.percentile(per_op, 99) * 1e6, 3),
+        "ops_per_sec": round(1 / mean, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for serializers and core.security")
+    parser.add_argument("--rows", type=int, default=200, help="rows per serialized page")
+    parser.add_argument("--repeat", type=int, default=20, help="timed batches per case")
+    parser.add_argument("--batch-ms", type=float, default=20.0, help="minimum batch duration")
+    parser.add_argument("--only", help="run cases whose name contains this text")
+    parser.add_argument("--save", nargs="?", const="", help="write results JSON (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    report = {}
+    print(f"{'case':<28}{'batch':>8}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}{'ops/s':>14}")
+    for name, fn in cases(args.rows).items():
+        if args.only and args.only not in name:
+            continue
+        s = report[name] = measure(fn, args.batch_ms, args.repeat)
+        print(
+            f"{name:<28}{s['batch']:>8}{s['mean_us']:>12.2f}{s['p50_us']:>12.2f}"
+            f"{s['p99_us']:>12.2f}{s['ops_per_sec']:>14.1f}"
+        )
+
+    data = {"meta": results.metadata(args), "results": report}
+    if args.save is not None:
+        print(f"\nSaved {results.save(args.save or None, 'micro', data)}")
+    if args.compare:
+        regressions = results.compare(args.compare, report, ("p50_us", "ops_per_sec"), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
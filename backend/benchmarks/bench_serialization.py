@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import asyncpg
+from starlette.responses import JSONResponse as StdlibJSONResponse
+
+from core.config import settings
+from core.jsonsql import fetch_json_page
+from core.pagination import Page, decode_cursor
+from core.responses import list_response
+from routers.clients import CLIENT_JSON, STAKEHOLDER_JSON, _client_dict, _stakeholder_dict
+from routers.locations import PROFILE_JSON, _profile_dict
+from routers.recordings import RECORDING_JSON, _recording_dict
+
+# Compares the old list path (asyncpg rows -> dicts -> stdlib JSONResponse) with the
+# SQL-rendered path (compact JSON built in Postgres -> raw bytes). Seeds data inside a
+# transaction that is always rolled back, asserts the bodies are byte-identical, then
+# times both paths.
+
+AWKWARD_TEXT = [
+    "Acme Corp",
+    'Quote " and backslash \\',
+    "Tab\tnew\nline\r",
+    "Ünïcödé — 東京 🚀",
+    "ctrl \x01\x1f chars",
+    "",
+    None,
+]
+
+
+async def seed(conn, rows: int) -> tuple[int, int]:
+    user_id = await conn.fetchval(
+        "INSERT INTO users (name, email, password) VALUES ('Bench', $1, 'x') RETURNING id",
+        f"bench-{time.time_ns()}@example.com",
+    )
+    rng = random.Random(42)
+    await conn.executemany(
+        """INSERT INTO clients (user_id, client_name, client_code, industry_sector, website_domain,
+                                client_tier, engagement_health, is_active, created_at)
+           VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW() - make_interval(secs => $9))""",
+        [
+            (
+                user_id,
+                rng.choice(AWKWARD_TEXT[:5]) + f" {i}",
+                f"BENCH-{user_id}-{i}",
+                rng.choice(AWKWARD_TEXT),
+                rng.choice(AWKWARD_TEXT),
+                rng.choice(["Strategic", "Normal", "Low Touch"]),
+                rng.choice(["Good", "Neutral", "Risk"]),
+                rng.random() > 0.2,
+                # every tenth row lands on a whole second to exercise the microsecond-less format
+                float(i) if i % 10 == 0 else i + rng.random(),
+            )
+            for i in range(rows)
+        ],
+    )
+    client_id = await conn.fetchval("SELECT id FROM clients WHERE user_id = $1 LIMIT 1", user_id)
+    await conn.executemany(
+        """INSERT INTO stakeholders (client_id, contact_name, email, notes, created_at)
+           VALUES ($1, $2, $3, $4, NOW() + make_interval(secs => $5))""",
+        [
+            (client_id, f"Contact {i}", rng.choice(AWKWARD_TEXT), rng.choice(AWKWARD_TEXT), i * 1.5)
+            for i in range(rows)
+        ],
+    )
+    await conn.executemany(
+        """INSERT INTO location_profiles (user_id, name, type, address, latitude, longitude, created_at)
+           VALUES ($1, $2, 'client', $3, $4, $5, NOW() - make_interval(secs => $6))""",
+        [
+            (
+                user_id,
+                f"Site {i}",
+                rng.choice(AWKWARD_TEXT),
+                rng.choice([None, 40.0, -73.0, rng.uniform(-90, 90), 1e-05, 0.1]),
+                rng.choice([None, 0.0, 151.2093, rng.uniform(-180, 180)]),
+                i + rng.random(),
+            )
+            for i in range(rows)
+        ],
+    )
+    await conn.executemany(
+        """INSERT INTO recordings (user_id, transcript, duration_seconds, created_at)
+           VALUES ($1, $2, $3, NOW() - make_interval(secs => $4))""",
+        [
+            (
+                user_id,
+                rng.choice(AWKWARD_TEXT) and ("word " * rng.randint(50, 500)),
+                rng.choice([None, rng.randint(1, 3600)]),
+                i + rng.random(),
+            )
+            for i in range(rows)
+        ],
+    )
+    return user_id, client_id
+
+
+async def old_path(conn, table, owner, owner_id, key, to_dict, page, descending):
+    keyset, args = page.sql(2, descending)
+    rows = await conn.fetch(f"SELECT * FROM {table} WHERE {owner} = $1{keyset}", owner_id, *args)
+    rows, next_cursor = page.split(rows)
+    return StdlibJSONResponse(content={key: [to_dict(r) for r in rows], "next_cursor": next_cursor}).body
+
+
+async def new_path(conn, table, owner, owner_id, key, shape, page, descending):
+    items, next_cursor = await fetch_json_page(
+        conn, f"SELECT * FROM {table} WHERE {owner} = $1", [owner_id], shape, page, descending,
+    )
+    return list_response(key, items, next_cursor).body
+
+
+async def timed(fn, iterations) -> tuple[float, float]:
+    # wall time includes Postgres; process time is the API worker's own CPU cost
+    start, start_cpu = time.perf_counter(), time.process_time()
+    for _ in range(iterations):
+        await fn()
+    wall = (time.perf_counter() - start) / iterations * 1000
+    cpu = (time.process_time() - start_cpu) / iterations * 1000
+    return wall, cpu
+
+
+async def run(args):
+    conn = await asyncpg.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        database=settings.DB_NAME,
+    )
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        user_id, client_id = await seed(conn, args.rows)
+        cases = [
+            ("clients", "user_id", user_id, "clients", _client_dict, CLIENT_JSON, True),
+            ("stakeholders", "client_id", client_id, "stakeholders", _stakeholder_dict, STAKEHOLDER_JSON, False),
+            ("location_profiles", "user_id", user_id, "profiles", _profile_dict, PROFILE_JSON, True),
+            ("recordings", "user_id", user_id, "recordings", _recording_dict, RECORDING_JSON, True),
+        ]
+        print(
+            f"{'endpoint':<14}{'rows':>6}{'old ms':>9}{'new ms':>9}"
+            f"{'old cpu':>10}{'new cpu':>10}{'cpu gain':>10}  identical"
+        )
+        for table, owner, owner_id, key, to_dict, shape, descending in cases:
+            page = Page(args.limit)
+            # walk every page once to check byte equality across cursors too
+            while True:
+                old = await old_path(conn, table, owner, owner_id, key, to_dict, page, descending)
+                new = await new_path(conn, table, owner, owner_id, key, shape, page, descending)
+                if old != new:
+                    raise SystemExit(f"{key}: bodies differ\nold: {old[:500]!r}\nnew: {new[:500]!r}")
+                next_cursor = json.loads(old)["next_cursor"]
+                if not next_cursor:
+                    break
+                page = Page(args.limit, decode_cursor(next_cursor))
+
+            page = Page(args.limit)
+            old_ms, old_cpu = await timed(
+                lambda: old_path(conn, table, owner, owner_id, key, to_dict, page, descending), args.iterations,
+            )
+            new_ms, new_cpu = await timed(
+                lambda: new_path(conn, table, owner, owner_id, key, shape, page, descending), args.iterations,
+            )
+            print(
+                f"{key:<14}{args.limit:>6}{old_ms:>9.2f}{new_ms:>9.2f}"
+                f"{old_cpu:>10.2f}{new_cpu:>10.2f}{old_cpu / max(new_cpu, 1e-6):>9.1f}x  yes"
+            )
+    finally:
+        await tx.rollback()
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list serialization paths")
+    parser.add_argument("--rows", type=int, default=2000, help="rows seeded per table")
+    parser.add_argument("--limit", type=int, default=200, help="page size")
+    parser.add_argument("--iterations", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
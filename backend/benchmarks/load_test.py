@@ -0,0 +1,359 @@
+import argparse
+import asyncio
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import asyncpg
+import httpx
+
+from benchmarks import results
+from core.config import settings
+from core.migrations import migrate
+from core.security import create_access_token, hash_password
+
+# End-to-end load test: creates a throwaway database next to DB_NAME, migrates and
+# seeds it, boots `uvicorn main:app` against it in a subprocess, drives a weighted
+# mix of reads and writes from concurrent virtual users, and reports latency
+# percentiles and throughput per endpoint. The database is dropped afterwards
+# unless --keep-db is given. Needs httpx, which the app itself doesn't (pip install httpx).
+#
+#   python -m benchmarks.load_test --users 20 --concurrency 32 --duration 30 --save
+#   python -m benchmarks.load_test --compare benchmarks/results/load-20261017-101500.json
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "bench-password"
+
+WORDS = [
+    "budget", "timeline", "renewal", "contract", "pricing", "onboarding", "migration", "roadmap",
+    "stakeholder", "procurement", "security", "compliance", "integration", "dashboard", "forecast",
+    "pipeline", "escalation", "workshop", "quarterly", "review", "expansion", "pilot", "rollout",
+    "feedback", "training", "support", "invoice", "discount", "warehouse", "logistics",
+]
+
+
+# ── Throwaway database ───────────────────────────────────
+
+async def _connect(database: str) -> asyncpg.Connection:
+    return await asyncpg.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        database=database,
+    )
+
+
+async def create_database(name: str):
+    conn = await _connect(settings.DB_NAME)
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}"')
+        await conn.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await conn.close()
+
+
+async def drop_database(name: str):
+    conn = await _connect(settings.DB_NAME)
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+    finally:
+        await conn.close()
+
+
+async def seed(database: str, args) -> dict[int, list[int]]:
+    # Everything is generated in Postgres from a fixed seed so runs are comparable.
+    # Returns user_id -> client ids for the workload to pick from.
+    conn = await _connect(database)
+    try:
+        await migrate(conn)
+        await conn.execute("SELECT setseed(0.42)")
+        password_hash = hash_password(PASSWORD)
+        async with conn.transaction():
+            await conn.execute(
+                """INSERT INTO users (name, email, password)
+                   SELECT 'Bench user ' || g, 'bench' || g || '@example.com', $1
+                   FROM generate_series(1, $2) AS g""",
+                password_hash, args.users,
+            )
+            await conn.execute(
+                """INSERT INTO clients (user_id, client_name, client_code, industry_sector, company_size,
+                                       headquarters_location, website_domain, client_tier,
+                                       engagement_health, is_active, created_at, updated_at)
+                   SELECT u.id, 'Client ' || u.id || '-' || g, 'BENCH-' || u.id || '-' || g,
+                          (ARRAY['Technology', 'Retail', 'Finance', 'Healthcare', 'Logistics'])[1 + g % 5],
+                          (ARRAY['1-50', '51-200', '201-1000', '1000+'])[1 + g % 4],
+                          (ARRAY['London', 'New York', 'Singapore', 'Berlin'])[1 + g % 4],
+                          'client' || g || '.example.com',
+                          (ARRAY['Strategic', 'Normal', 'Low Touch'])[1 + g % 3],
+                          (ARRAY['Good', 'Neutral', 'Risk'])[1 + g % 3],
+                          g % 7 <> 0,
+                          NOW() - make_interval(mins => g),
+                          NOW() - make_interval(mins => g)
+                   FROM users u CROSS JOIN generate_series(1, $1) AS g""",
+                args.clients,
+            )
+            await conn.execute(
+                """INSERT INTO stakeholders (client_id, contact_name, designation_role, email, phone, notes, created_at)
+                   SELECT c.id, 'Contact ' || g, (ARRAY['CTO', 'CFO', 'Buyer', 'Champion'])[1 + g % 4],
+                          'contact' || g || '@client' || c.id || '.example.com', '+44 20 7946 ' || lpad(g::text, 4, '0'),
+                          'Met at kickoff; follow up on ' || (ARRAY['pricing', 'security review', 'rollout'])[1 + g % 3],
+                          NOW() - make_interval(mins => g)
+                   FROM clients c CROSS JOIN generate_series(1, $1) AS g""",
+                args.stakeholders,
+            )
+            await conn.execute(
+                """INSERT INTO recordings (user_id, client_id, transcript, duration_seconds, transcription_status, created_at)
+                   SELECT c.user_id, c.id,
+                          array_to_string(ARRAY(
+                              SELECT ($2::text[])[1 + floor(random() * array_length($2::text[], 1))::int]
+                              FROM generate_series(1, 60 + (g * 37 + c.id) % 400)
+                          ), ' '),
+                          30 + (g * 53 + c.id) % 3600,
+                          'completed',
+                          NOW() - make_interval(mins => g * 5)
+                   FROM clients c CROSS JOIN generate_series(1, $1) AS g""",
+                args.recordings, WORDS,
+            )
+            await conn.execute(
+                """INSERT INTO location_profiles (user_id, name, type, address, latitude, longitude)
+                   SELECT u.id, 'Site ' || g, 'client', g || ' High Street',
+                          51.5 + (random() - 0.5) * 0.4, -0.12 + (random() - 0.5) * 0.6
+                   FROM users u CROSS JOIN generate_series(1, $1) AS g""",
+                args.profiles,
+            )
+        await conn.execute("ANALYZE")
+        rows = await conn.fetch("SELECT user_id, array_agg(id ORDER BY id) AS ids FROM clients GROUP BY user_id")
+        return {r["user_id"]: list(r["ids"]) for r in rows}
+    finally:
+        await conn.close()
+
+
+# ── Server ───────────────────────────────────────────────
+
+def start_server(database: str, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DB_NAME": database,
+        "AUTO_MIGRATE": "false",
+        "JWT_SECRET": settings.JWT_SECRET,
+        "BCRYPT_ROUNDS": str(settings.BCRYPT_ROUNDS),
+        # Every virtual user logs in from 127.0.0.1; measure bcrypt rather than the throttles
+        "LOGIN_IP_BURST": "1000000",
+        "LOGIN_EMAIL_BURST": "1000000",
+    }
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("Server exited during startup")
+        try:
+            if (await client.get("/api/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("Server did not become ready")
+
+
+def stop_server(server: subprocess.Popen):
+    if server.poll() is None:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+# ── Workload ─────────────────────────────────────────────
+
+class VirtualUser:
+    def __init__(self, user_id: int, client_ids: list[int], rng: random.Random):
+        self.user_id = user_id
+        self.email = f"bench{user_id}@example.com"
+        self.client_ids = client_ids
+        self.rng = rng
+        self.headers = {"Authorization": f"Bearer {create_access_token(user_id, self.email)}"}
+
+    def client_id(self) -> int:
+        return self.rng.choice(self.client_ids)
+
+
+def _new_client(u: VirtualUser) -> tuple:
+    code = f"LOAD-{uuid.uuid4().hex[:12]}"
+    return "POST", "/api/clients", {"client_name": f"Load {code}", "client_code": code, "industry_sector": "Retail"}
+
+
+def _new_recording(u: VirtualUser) -> tuple:
+    words = " ".join(u.rng.choice(WORDS) for _ in range(u.rng.randint(60, 400)))
+    body = {"client_id": u.client_id(), "transcript": words, "duration_seconds": u.rng.randint(30, 3600)}
+    return "POST", "/api/recordings", body
+
+
+def _update_client(u: VirtualUser) -> tuple:
+    health = u.rng.choice(["Good", "Neutral", "Risk"])
+    return "PATCH", f"/api/clients/{u.client_id()}", {"engagement_health": health}
+
+
+def _nearby(u: VirtualUser) -> tuple:
+    lat, lng = 51.5 + u.rng.uniform(-0.2, 0.2), -0.12 + u.rng.uniform(-0.3, 0.3)
+    return "GET", f"/api/locations/nearby?lat={lat:.5f}&lng={lng:.5f}&radius=5000", None
+
+
+# name -> (weight, request builder); builders return (method, path, json body)
+SCENARIOS = {
+    "list_clients": (25, lambda u: ("GET", "/api/clients?limit=50", None)),
+    "list_clients_summary": (10, lambda u: ("GET", "/api/clients?limit=200&view=summary", None)),
+    "get_client": (10, lambda u: ("GET", f"/api/clients/{u.client_id()}", None)),
+    "client_overview": (12, lambda u: ("GET", f"/api/clients/{u.client_id()}/overview", None)),
+    "list_stakeholders": (8, lambda u: ("GET", f"/api/clients/{u.client_id()}/stakeholders", None)),
+    "list_recordings": (10, lambda u: ("GET", "/api/recordings?view=summary", None)),
+    "search_recordings": (8, lambda u: ("GET", f"/api/recordings/search?q={u.rng.choice(WORDS)}", None)),
+    "nearby": (5, _nearby),
+    "create_client": (4, _new_client),
+    "update_client": (4, _update_client),
+    "create_recording": (3, _new_recording),
+    "login": (1, lambda u: ("POST", "/api/auth/login", {"email": u.email, "password": PASSWORD})),
+}
+
+
+async def drive(client: httpx.AsyncClient, users: list[VirtualUser], args) -> tuple[dict, float]:
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[n][0] for n in names]
+    samples: dict[str, list[float]] = {n: [] for n in names}
+    # name -> status (or exception class) -> count, for the failed requests only
+    errors: dict[str, dict[str, int]] = {n: {} for n in names}
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    stop_at = measure_from + args.duration
+
+    async def worker(index: int):
+        rng = random.Random(args.seed + index)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            user = rng.choice(users)
+            name = rng.choices(names, weights)[0]
+            method, path, body = SCENARIOS[name][1](user)
+            began = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=user.headers)
+                failure = str(response.status_code) if response.status_code >= 400 else None
+            except httpx.HTTPError as exc:
+                failure = type(exc).__name__
+            elapsed = time.perf_counter() - began
+            if began >= measure_from:
+                samples[name].append(elapsed)
+                if failure is not None:
+                    errors[name][failure] = errors[name].get(failure, 0) + 1
+
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    measured = time.perf_counter() - measure_from
+    report = {}
+    for n in names:
+        if samples[n]:
+            report[n] = results.summarize(samples[n], measured, sum(errors[n].values()))
+            report[n]["failures"] = errors[n]
+    report["all"] = results.summarize(
+        [s for n in names for s in samples[n]], measured, sum(sum(e.values()) for e in errors.values()),
+    )
+    return report, measured
+
+
+def print_report(report: dict):
+    print(
+        f"\n{'endpoint':<22}{'count':>8}{'errors':>8}{'rps':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    )
+    for name, s in report.items():
+        print(
+            f"{name:<22}{s['count']:>8}{s['errors']:>8}{s['rps']:>9.1f}"
+            f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}{s['max_ms']:>9.2f}"
+        )
+    failures = {n: s["failures"] for n, s in report.items() if s.get("failures")}
+    for name, by_status in failures.items():
+        print(f"  {name} failures: " + ", ".join(f"{k} x{v}" for k, v in sorted(by_status.items())))
+
+
+async def run(args) -> int:
+    database = args.db_name or f"{settings.DB_NAME}_bench_{os.getpid()}"
+    await create_database(database)
+    server = None
+    try:
+        started = time.perf_counter()
+        clients_by_user = await seed(database, args)
+        print(
+            f"Seeded {database}: {args.users} users x {args.clients} clients x "
+            f"{args.stakeholders} stakeholders / {args.recordings} recordings per client "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        server = start_server(database, args)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=args.timeout,
+        ) as client:
+            await wait_ready(client, server)
+            rng = random.Random(args.seed)
+            users = [VirtualUser(uid, ids, rng) for uid, ids in sorted(clients_by_user.items())]
+            print(f"Driving {args.concurrency} connections for {args.duration}s (+{args.warmup}s warmup)")
+            report, _ = await drive(client, users, args)
+    finally:
+        if server is not None:
+            stop_server(server)
+        if not args.keep_db:
+            await drop_database(database)
+
+    print_report(report)
+    data = {"meta": results.metadata(args), "results": report}
+    if args.save is not None:
+        print(f"\nSaved {results.save(args.save or None, 'load', data)}")
+    if args.compare:
+        regressions = results.compare(args.compare, report, ("p50_ms", "p95_ms", "p99_ms", "rps"), args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a throwaway database and load-test the API")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=50, help="clients per user")
+    parser.add_argument("--stakeholders", type=int, default=5, help="stakeholders per client")
+    parser.add_argument("--recordings", type=int, default=4, help="recordings per client")
+    parser.add_argument("--profiles", type=int, default=100, help="location profiles per user")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent connections")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds before measuring")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db-name", help="throwaway database name (default: <DB_NAME>_bench_<pid>)")
+    parser.add_argument("--keep-db", action="store_true", help="don't drop the database afterwards")
+    parser.add_argument("--save", nargs="?", const="", help="write results JSON (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import math
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+# Shared by the benchmark scripts: latency summaries plus JSON baselines that a
+# later run can be compared against (--save / --compare).
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summarize(latencies: list[float], elapsed: float | None = None, errors: int = 0) -> dict:
+    # latencies in seconds; reported in milliseconds
+    values = sorted(latencies)
+    summary = {
+        "count": len(values),
+        "errors": errors,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+    if elapsed:
+        summary["rps"] = round(len(values) / elapsed, 1)
+    return summary
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args) -> dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "args": vars(args),
+    }
+
+
+def save(path: str | None, kind: str, data: dict) -> Path:
+    if path is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        target = RESULTS_DIR / f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    else:
+        target = Path(path)
+    target.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    return target
+
+
+def compare(baseline_path: str, results: dict, metrics: tuple[str, ...], threshold: float) -> list[str]:
+    # Prints current vs baseline per case; returns the cases that got worse than threshold (%).
+    # Every metric is treated as lower-is-better except rps and ops_per_sec.
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]
+    regressions = []
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0f}%)")
+    print(f"{'case':<28}{'metric':<12}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<28}(new)")
+            continue
+        for metric in metrics:
+            old, new = before.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if metric in ("rps", "ops_per_sec") else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append(f"{name} {metric}")
+            print(f"{name:<28}{metric:<12}{old:>12.3f}{new:>12.3f}{change:>+8.1f}%{flag}")
+    return regressions
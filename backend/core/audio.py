@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import os
+import re
+from pathlib import Path
+
+import asyncpg
+from fastapi import Request
+from starlette.requests import ClientDisconnect
+
+from core.config import settings
+from core.errors import ApiError
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+_WRITE_BUFFER = 1024 * 1024
+_HASH_BLOCK = 1024 * 1024
+
+
+class AudioUploadError(ApiError):
+    status_code = 400
+
+
+def storage_root() -> Path:
+    return Path(settings.AUDIO_STORAGE_DIR)
+
+
+def blob_path(sha256: str) -> Path:
+    return storage_root() / "blobs" / sha256[:2] / sha256
+
+
+def part_path(upload_id: str) -> Path:
+    return storage_root() / "uploads" / f"{upload_id}.part"
+
+
+def parse_content_range(header: str | None, size_bytes: int) -> tuple[int, int]:
+    # "bytes start-end/total" with an inclusive end, as in a Range response
+    match = _CONTENT_RANGE.match((header or "").strip())
+    if not match:
+        raise AudioUploadError("Content-Range header must look like 'bytes start-end/total'")
+    start, end, total = (int(g) for g in match.groups())
+    if total != size_bytes or end < start or end >= total:
+        raise AudioUploadError(f"Content-Range does not fit an upload of {size_bytes} bytes")
+    if end - start + 1 > settings.AUDIO_CHUNK_MAX_BYTES:
+        raise AudioUploadError(f"Chunks are limited to {settings.AUDIO_CHUNK_MAX_BYTES} bytes")
+    return start, end + 1
+
+
+def _open_part(upload_id: str) -> int:
+    path = part_path(upload_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return os.open(path, os.O_WRONLY | os.O_CREAT, 0o600)
+
+
+def _write_at(fd: int, data: bytes, offset: int):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _sync_and_close(fd: int):
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+async def receive_chunk(request: Request, upload_id: str, start: int, end: int) -> int:
+    # Writes the body at its offset in the part file and returns how many bytes landed on disk.
+    # A dropped connection keeps whatever arrived, so the client resumes from there.
+    fd = await asyncio.to_thread(_open_part, upload_id)
+    offset = start
+    pending = bytearray()
+    try:
+        try:
+            async for data in request.stream():
+                if offset + len(pending) + len(data) > end:
+                    raise AudioUploadError("Chunk body is longer than its Content-Range")
+                pending += data
+                if len(pending) >= _WRITE_BUFFER:
+                    await asyncio.to_thread(_write_at, fd, bytes(pending), offset)
+                    offset += len(pending)
+                    pending.clear()
+        except ClientDisconnect:
+            pass
+        if pending:
+            await asyncio.to_thread(_write_at, fd, bytes(pending), offset)
+            offset += len(pending)
+    finally:
+        await asyncio.to_thread(_sync_and_close, fd)
+    return offset - start
+
+
+def _hash_part(upload_id: str) -> str:
+    digest = hashlib.sha256()
+    with open(part_path(upload_id), "rb") as f:
+        while block := f.read(_HASH_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def hash_part(upload_id: str) -> str:
+    return await asyncio.to_thread(_hash_part, upload_id)
+
+
+def _store_part(upload_id: str, sha256: str):
+    part = part_path(upload_id)
+    target = blob_path(sha256)
+    if target.exists():
+        # Identical audio is already stored; keep the one copy
+        part.unlink()
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(part, target)
+
+
+async def store_part(conn, upload_id: str, sha256: str, size_bytes: int):
+    # Call inside a transaction. The upsert locks the audio_blobs row until commit, and
+    # release_blob takes the same lock before deleting, so the file this upload relies
+    # on can't be removed between the exists() check and the recording pointing at it.
+    await conn.execute(
+        """INSERT INTO audio_blobs (sha256, size_bytes) VALUES ($1, $2)
+           ON CONFLICT (sha256) DO UPDATE SET size_bytes = audio_blobs.size_bytes""",
+        sha256, size_bytes,
+    )
+    await asyncio.to_thread(_store_part, upload_id, sha256)
+
+
+def _unlink(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+async def discard_parts(upload_ids: list[str]):
+    for upload_id in upload_ids:
+        await asyncio.to_thread(_unlink, part_path(upload_id))
+
+
+async def release_blob(conn: asyncpg.Connection, sha256: str | None):
+    # Removes a blob once no recording points at it any more
+    if sha256 is None:
+        return
+    async with conn.transaction():
+        # The row lock store_part holds while a recording adopts the blob; the reference
+        # check runs after it, so it sees that recording once its upload has committed
+        locked = await conn.fetchval("SELECT sha256 FROM audio_blobs WHERE sha256 = $1 FOR UPDATE", sha256)
+        if locked is None:
+            return
+        deleted = await conn.fetchval(
+            """DELETE FROM audio_blobs b
+               WHERE b.sha256 = $1 AND NOT EXISTS (SELECT 1 FROM recordings WHERE audio_sha256 = $1)
+               RETURNING b.sha256""",
+            sha256,
+        )
+        # Still under the lock, so a new upload of the same audio can't find the file and then lose it
+        if deleted:
+            await asyncio.to_thread(_unlink, blob_path(sha256))
@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+
+import asyncpg
+from fastapi import Request
+
+from core.config import settings
+from core.database import get_pool
+from core.errors import ApiError
+from core.security import decode_access_token
+
+
+class AuthError(ApiError):
+    status_code = 401
+
+
+# token -> (user_id, exp); tokens are only cached after a successful signature check
+_token_cache: OrderedDict[str, tuple[int, float]] = OrderedDict()
+# user_id -> (users row, cached_until)
+_user_cache: OrderedDict[int, tuple[asyncpg.Record, float]] = OrderedDict()
+
+
+def verify_token(token: str) -> int | None:
+    now = time.time()
+    cached = _token_cache.get(token)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > now:
+            _token_cache.move_to_end(token)
+            return user_id
+        del _token_cache[token]
+
+    try:
+        decoded = decode_access_token(token)
+        user_id = decoded["id"]
+    except Exception:
+        return None
+
+    if settings.AUTH_TOKEN_CACHE_SIZE > 0:
+        _token_cache[token] = (user_id, float(decoded.get("exp", now)))
+        while len(_token_cache) > settings.AUTH_TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return user_id
+
+
+async def current_user_id(request: Request) -> int:
+    auth_header = request.headers.get("authorization", "")
+    if not auth_header.startswith("Bearer "):
+        raise AuthError("No token provided")
+
+    user_id = verify_token(auth_header.split(" ", 1)[1])
+    if user_id is None:
+        raise AuthError("Invalid or expired token")
+
+    request.state.user_id = user_id
+    return user_id
+
+
+async def get_user(user_id: int) -> asyncpg.Record | None:
+    now = time.monotonic()
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        row, cached_until = cached
+        if cached_until > now:
+            _user_cache.move_to_end(user_id)
+            return row
+        del _user_cache[user_id]
+
+    pool = get_pool()
+    row = await pool.fetchrow(
+        "SELECT id, name, email, created_at FROM users WHERE id = $1",
+        user_id,
+    )
+    if row is not None and settings.AUTH_USER_CACHE_TTL > 0:
+        _user_cache[user_id] = (row, now + settings.AUTH_USER_CACHE_TTL)
+        while len(_user_cache) > settings.AUTH_USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+    return row
+
@@ -0,0 +1,266 @@
+import hashlib
+import inspect
+import re
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+
+import asyncpg
+import orjson
+
+from core import metrics
+from core.config import settings
+from core.database import TimedPool
+from core.errors import ApiError
+
+# POST /api/batch applies a device's queued writes in order, on one connection and in one
+# transaction. Each operation is the request the device would otherwise have sent (method,
+# path, body) and runs through the same handler as that endpoint, so results match status
+# for status. An operation that fails (404, 409, ...) doesn't stop the ones after it.
+#
+# An operation's idempotency key is claimed, and its outcome stored, in the batch's own
+# transaction: a retry after a lost response gets the stored answers and applies nothing
+# twice, and a batch that never committed left no keys behind.
+
+batch_operations = metrics.Counter(
+    "batch_operations_total", "Operations run through /api/batch by outcome (applied, failed, replayed)", ("result",),
+)
+
+# Object created by an earlier operation of the same batch, e.g. "/api/clients/$0/stakeholders"
+_REFERENCE = re.compile(r"^\$(\d+)$")
+
+_after_commit: ContextVar[list | None] = ContextVar("batch_after_commit", default=None)
+
+
+class BatchError(ApiError):
+    status_code = 400
+
+
+class Route:
+    def __init__(self, method: str, path: str, handler: Callable[..., Awaitable]):
+        self.method = method
+        # Path ids are integers or references
+        self.pattern = re.compile(
+            "^" + re.sub(r"\{(\w+)\}", lambda m: rf"(?P<{m.group(1)}>\d+|\$\d+)", path) + "$"
+        )
+        self.handler = handler
+        self.takes_body = "body" in inspect.signature(handler).parameters
+
+
+class Operation:
+    __slots__ = ("method", "path", "body", "key", "fingerprint")
+
+    def __init__(self, method: str, path: str, body: dict, key: str | None):
+        self.method = method
+        self.path = path
+        self.body = body
+        self.key = key
+        self.fingerprint = hashlib.sha256(
+            orjson.dumps([method, path, body], option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+
+
+class Result:
+    __slots__ = ("status", "body", "replayed")
+
+    def __init__(self, status: int, body: bytes, replayed: bool = False):
+        self.status = status
+        self.body = body
+        self.replayed = replayed
+
+    def created_id(self) -> int | None:
+        if self.status != 201:
+            return None
+        # Create responses are {"<entity>": {...}}
+        (created,) = orjson.loads(self.body).values()
+        return created["id"]
+
+
+class _StatementFailed(Exception):
+    def __init__(self, index: int, result: Result):
+        self.index = index
+        self.result = result
+
+
+def _error(status: int, message: str) -> Result:
+    return Result(status, orjson.dumps({"error": message}))
+
+
+def parse_operations(payload) -> list[Operation]:
+    raw_operations = payload.get("operations") if isinstance(payload, dict) else None
+    if not isinstance(raw_operations, list) or not raw_operations:
+        raise BatchError("operations must be a non-empty list")
+    if len(raw_operations) > settings.BATCH_MAX_OPERATIONS:
+        raise BatchError(f"Batches are limited to {settings.BATCH_MAX_OPERATIONS} operations", status_code=413)
+
+    operations = []
+    keys = set()
+    for i, raw in enumerate(raw_operations):
+        if not isinstance(raw, dict) or not isinstance(raw.get("method"), str) or not isinstance(raw.get("path"), str):
+            raise BatchError(f"Operation {i} needs a method and a path")
+        body = raw.get("body")
+        if body is None:
+            body = {}
+        if not isinstance(body, dict):
+            raise BatchError(f"The body of operation {i} must be an object")
+        key = raw.get("idempotency_key")
+        if key is not None:
+            if not isinstance(key, str) or not 0 < len(key) <= 255:
+                raise BatchError(f"The idempotency_key of operation {i} must be a string of up to 255 characters")
+            if key in keys:
+                raise BatchError(f"Idempotency key of operation {i} is used more than once in this batch")
+            keys.add(key)
+        try:
+            operations.append(Operation(raw["method"].upper(), raw["path"], body, key))
+        except orjson.JSONEncodeError:
+            raise BatchError(f"The body of operation {i} has a value out of range")
+    return operations
+
+
+async def after_commit(fn: Callable[..., Awaitable], *args):
+    # Side effects outside Postgres (deleting files) wait for the batch to commit; outside
+    # a batch the write has already committed and they run right away
+    pending = _after_commit.get()
+    if pending is None:
+        await fn(*args)
+    else:
+        pending.append((fn, args))
+
+
+# Claims the keys not seen before and returns the stored outcome of the others. A key
+# whose first use committed after this statement's snapshot comes back without one.
+_CLAIM = """
+    WITH requested AS (
+        SELECT * FROM unnest($2::text[], $3::text[]) AS r(key, fingerprint)
+    ), claimed AS (
+        INSERT INTO idempotency_keys (user_id, key, fingerprint)
+        SELECT $1, key, fingerprint FROM requested
+        ON CONFLICT (user_id, key) DO NOTHING
+        RETURNING key
+    )
+    SELECT r.key, k.fingerprint, k.status, k.response
+    FROM requested r
+    LEFT JOIN idempotency_keys k ON k.user_id = $1 AND k.key = r.key
+    WHERE r.key NOT IN (SELECT key FROM claimed)
+"""
+
+# Stores the outcomes of the claimed keys and drops this user's expired ones
+_RECORD = """
+    WITH expired AS (
+        DELETE FROM idempotency_keys
+        WHERE user_id = $1 AND created_at < NOW() - make_interval(hours => $5)
+    )
+    UPDATE idempotency_keys k SET status = r.status, response = r.response
+    FROM unnest($2::text[], $3::int[], $4::text[]) AS r(key, status, response)
+    WHERE k.user_id = $1 AND k.key = r.key
+"""
+
+
+def _resolve(value, created: list[int | None]):
+    # References become the id the earlier operation created
+    match = _REFERENCE.match(value) if isinstance(value, str) else None
+    if match is None:
+        return value
+    index = int(match.group(1))
+    if index >= len(created) or created[index] is None:
+        raise LookupError(index)
+    return created[index]
+
+
+async def _run(conn, user_id: int, routes: list[Route], index: int, operation: Operation, created) -> Result:
+    for route in routes:
+        match = route.pattern.match(operation.path) if route.method == operation.method else None
+        if match:
+            break
+    else:
+        return _error(404, f"Unknown operation {operation.method} {operation.path}")
+
+    try:
+        params = {
+            name: int(value) if value.isdigit() else _resolve(value, created)
+            for name, value in match.groupdict().items()
+        }
+        if route.takes_body:
+            params["body"] = {
+                name: _resolve(value, created) if name.endswith("_id") else value
+                for name, value in operation.body.items()
+            }
+    except LookupError as exc:
+        return _error(424, f"Operation {exc.args[0]} of this batch did not create anything")
+
+    try:
+        response = await route.handler(conn, user_id, **params)
+    except (asyncpg.DataError, asyncpg.CheckViolationError, asyncpg.NotNullViolationError) as exc:
+        raise _StatementFailed(index, _error(400, "Invalid value for one of the fields")) from exc
+    except asyncpg.IntegrityConstraintViolationError as exc:
+        # Foreign key or unique conflicts, e.g. the client was deleted since the device queued the write
+        raise _StatementFailed(index, _error(409, "Conflicts with the current state of a related record")) from exc
+    return Result(response.status_code, response.body)
+
+
+async def _apply(conn, user_id: int, routes: list[Route], operations: list[Operation], rejected: dict[int, Result]):
+    keyed = [op for op in operations if op.key is not None]
+    stored = {}
+    if keyed:
+        rows = await conn.fetch(_CLAIM, user_id, [op.key for op in keyed], [op.fingerprint for op in keyed])
+        for r in rows:
+            if r["status"] is None:
+                raise BatchError(
+                    "Another request with the same idempotency key is still running",
+                    status_code=409,
+                    headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+                )
+            stored[r["key"]] = r
+
+    results = []
+    created = []
+    for index, operation in enumerate(operations):
+        previous = stored.get(operation.key)
+        if previous is not None:
+            if previous["fingerprint"] == operation.fingerprint:
+                result = Result(previous["status"], previous["response"].encode("utf-8"), replayed=True)
+            else:
+                result = _error(422, "Idempotency key was already used for a different operation")
+        elif index in rejected:
+            result = rejected[index]
+        else:
+            result = await _run(conn, user_id, routes, index, operation, created)
+        results.append(result)
+        created.append(result.created_id())
+
+    recorded = [(op, result) for op, result in zip(operations, results) if op.key is not None and op.key not in stored]
+    if recorded:
+        await conn.execute(
+            _RECORD,
+            user_id,
+            [op.key for op, _ in recorded],
+            [result.status for _, result in recorded],
+            [result.body.decode("utf-8") for _, result in recorded],
+            settings.BATCH_IDEMPOTENCY_TTL_HOURS,
+        )
+    return results
+
+
+async def execute(pool: TimedPool, user_id: int, routes: list[Route], operations: list[Operation]) -> list[Result]:
+    rejected: dict[int, Result] = {}
+    pending: list = []
+    token = _after_commit.set(pending)
+    try:
+        async with pool.acquire() as conn:
+            while True:
+                pending.clear()
+                try:
+                    async with conn.transaction():
+                        results = await _apply(conn, user_id, routes, operations, rejected)
+                    break
+                except _StatementFailed as exc:
+                    # A rejected statement aborts the whole transaction; run the batch again with
+                    # that operation answered 400 or 409, so at most one retry per operation
+                    rejected[exc.index] = exc.result
+    finally:
+        _after_commit.reset(token)
+
+    for fn, args in pending:
+        await fn(*args)
+    for result in results:
+        batch_operations.inc("replayed" if result.replayed else "applied" if result.status < 400 else "failed")
+    return results
@@ -0,0 +1,179 @@
+import codecs
+import csv
+import io
+from collections.abc import AsyncIterator
+
+import orjson
+from fastapi import Request
+
+from core.database import TimedPool
+from core.errors import ApiError
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+class BulkFormatError(ApiError):
+    status_code = 400
+
+
+class RowError(ValueError):
+    pass
+
+
+def request_format(request: Request, fmt: str | None) -> str:
+    if fmt is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        fmt = CONTENT_TYPES.get(content_type)
+    if fmt not in ("csv", "ndjson"):
+        raise BulkFormatError("Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+    return fmt
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="strict")
+    tail = ""
+    try:
+        async for chunk in request.stream():
+            text = tail + decoder.decode(chunk)
+            lines = text.split("\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line
+        tail += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise BulkFormatError("Import body must be UTF-8 encoded")
+    if tail:
+        yield tail
+
+
+async def iter_records(request: Request, fmt: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    # Yields (line number, record, error); parsing problems are reported per row, not raised
+    if fmt == "ndjson":
+        line_no = 0
+        async for line in _iter_lines(request):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                yield line_no, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Each line must be a JSON object"
+                continue
+            yield line_no, record, None
+        return
+
+    header = None
+    pending = ""
+    start_line = line_no = 0
+    async for line in _iter_lines(request):
+        line_no += 1
+        if not pending:
+            start_line = line_no
+        pending += line + "\n"
+        # A record is complete once its quotes balance (embedded "" pairs keep parity even)
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader(io.StringIO(text)))
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        if len(values) != len(header):
+            yield start_line, None, f"Expected {len(header)} columns, found {len(values)}"
+            continue
+        yield start_line, dict(zip(header, values)), None
+    if pending.strip():
+        yield start_line, None, "Unterminated quoted field"
+
+
+def text_field(record: dict, field: str, max_length: int | None = None, required: bool = False) -> str | None:
+    value = record.get(field)
+    if value is not None and not isinstance(value, str):
+        value = str(value)
+    value = value.strip() if value is not None else None
+    if not value:
+        if required:
+            raise RowError(f"{field} is required")
+        return None
+    if max_length is not None and len(value) > max_length:
+        raise RowError(f"{field} is longer than {max_length} characters")
+    return value
+
+
+def choice_field(record: dict, field: str, choices: tuple[str, ...]) -> str | None:
+    value = text_field(record, field)
+    if value is not None and value not in choices:
+        raise RowError(f"{field} must be one of: {', '.join(choices)}")
+    return value
+
+
+def bool_field(record: dict, field: str) -> bool | None:
+    value = record.get(field)
+    if value is None or isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized == "":
+        return None
+    if normalized in ("true", "t", "yes", "1"):
+        return True
+    if normalized in ("false", "f", "no", "0"):
+        return False
+    raise RowError(f"{field} must be true or false")
+
+
+def _csv_chunk(rows: list, columns: list[str]) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    for row in rows:
+        writer.writerow([_csv_value(row[c]) for c in columns])
+    return out.getvalue().encode("utf-8")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+async def stream_csv(
+    pool: TimedPool, query: str, args: list, columns: list[str], batch_size: int,
+) -> AsyncIterator[bytes]:
+    yield _csv_chunk([dict(zip(columns, columns))], columns)
+    async for rows in _cursor_batches(pool, query, args, batch_size):
+        yield _csv_chunk(rows, columns)
+
+
+async def stream_ndjson(pool: TimedPool, query: str, args: list, batch_size: int) -> AsyncIterator[bytes]:
+    # query selects a single pre-rendered JSON text column
+    async for rows in _cursor_batches(pool, query, args, batch_size):
+        yield "".join(r[0] + "\n" for r in rows).encode("utf-8")
+
+
+async def _cursor_batches(pool: TimedPool, query: str, args: list, batch_size: int) -> AsyncIterator[list]:
+    # Server-side cursor: only one batch of rows is held in memory at a time
+    async with pool.acquire() as conn:
+        async with conn.transaction(readonly=True):
+            cursor = await conn.cursor(query, *args)
+            while True:
+                rows = await cursor.fetch(batch_size)
+                if not rows:
+                    break
+                yield rows
+
@@ -0,0 +1,194 @@
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from fastapi import Request
+from starlette.responses import Response
+
+from core import metrics, notify
+from core.config import settings
+from core.database import TimedPool, get_pool, get_read_pool
+from core.etags import CollectionState, collection_state
+from core.responses import RawJSONResponse
+
+# Per-process cache of serialized GET responses for a user's collections. A hit costs no
+# Postgres round trip at all, not even the collection_versions lookup: the entry keeps
+# the versions it was built from, so ETags and 304s come straight from memory.
+#
+# Entries are dropped when a write in this process touches their collections, and when
+# the collection_versions triggers announce a change over NOTIFY (migration 0012), which
+# covers writes from other workers, bulk imports, cascades and worker.py alike. While the
+# LISTEN connection is down nothing is cached, and everything is dropped on reconnect.
+
+CHANGES_CHANNEL = "collection_changes"
+
+# Rough per-entry and per-user bookkeeping cost, counted against RESPONSE_CACHE_MAX_BYTES
+_OVERHEAD = 256
+
+cache_requests = metrics.Counter(
+    "response_cache_requests_total", "Cacheable reads by outcome (hit, miss, bypass)", ("result",),
+)
+cache_evictions = metrics.Counter("response_cache_evictions_total", "Entries dropped to stay within the size limits")
+cache_invalidations = metrics.Counter(
+    "response_cache_invalidations_total", "Entries dropped because a collection changed", ("source",),
+)
+cache_size = metrics.Gauge("response_cache_size", "Cached responses and their approximate memory", ("unit",))
+
+
+class _Entry:
+    __slots__ = ("collections", "versions", "last_modified", "body", "size")
+
+    def __init__(self, key: str, collections: tuple[str, ...], state: CollectionState, body: bytes):
+        self.collections = collections
+        self.versions = state.versions
+        self.last_modified: datetime | None = state.last_modified
+        self.body = body
+        self.size = len(body) + len(key) + _OVERHEAD
+
+
+class _UserEntries:
+    def __init__(self):
+        self.entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Bumped by every invalidation so a fill that raced one is not stored
+        self.generation = 0
+
+
+class ResponseCache:
+    def __init__(self):
+        self.enabled = False
+        self.size = 0
+        self.entries = 0
+        self._users: OrderedDict[int, _UserEntries] = OrderedDict()
+
+    def get(self, user_id: int, key: str) -> _Entry | None:
+        user = self._users.get(user_id)
+        entry = user.entries.get(key) if user is not None else None
+        if entry is not None:
+            self._users.move_to_end(user_id)
+            user.entries.move_to_end(key)
+        return entry
+
+    def reserve(self, user_id: int) -> tuple[_UserEntries, int] | None:
+        # Taken before the read; None when the cache can't be trusted right now
+        if not self.enabled:
+            return None
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = _UserEntries()
+            self.size += _OVERHEAD
+            self._shrink()
+        return user, user.generation
+
+    def store(self, ticket: tuple[_UserEntries, int], user_id: int, key: str, entry: _Entry):
+        user, generation = ticket
+        if not self.enabled or self._users.get(user_id) is not user or user.generation != generation:
+            return
+        self._drop(user, key)
+        user.entries[key] = entry
+        self.size += entry.size
+        self.entries += 1
+        self._users.move_to_end(user_id)
+        while len(user.entries) > settings.RESPONSE_CACHE_USER_ENTRIES:
+            self._drop(user, next(iter(user.entries)))
+            cache_evictions.inc()
+        self._shrink()
+
+    def invalidate(self, user_id: int, collection: str, source: str):
+        user = self._users.get(user_id)
+        if user is None:
+            return
+        user.generation += 1
+        stale = [key for key, entry in user.entries.items() if collection in entry.collections]
+        for key in stale:
+            self._drop(user, key)
+        if stale:
+            cache_invalidations.inc(source, amount=len(stale))
+
+    def reset(self, enabled: bool):
+        self._users.clear()
+        self.size = 0
+        self.entries = 0
+        self.enabled = enabled
+
+    def _drop(self, user: _UserEntries, key: str):
+        entry = user.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+            self.entries -= 1
+
+    def _shrink(self):
+        # Least recently used users go first, whole
+        while self.size > settings.RESPONSE_CACHE_MAX_BYTES and self._users:
+            _, user = self._users.popitem(last=False)
+            self.size -= _OVERHEAD + sum(entry.size for entry in user.entries.values())
+            self.entries -= len(user.entries)
+            cache_evictions.inc(amount=len(user.entries))
+
+
+cache = ResponseCache()
+
+
+def parse_change(payload: str) -> tuple[int, str, int]:
+    user_id, collection, version = payload.split(":")
+    return int(user_id), collection, int(version)
+
+
+def _on_change(payload: str):
+    user_id, collection, _ = parse_change(payload)
+    cache.invalidate(user_id, collection, "notify")
+
+
+if settings.RESPONSE_CACHE_ENABLED:
+    notify.subscribe(CHANGES_CHANNEL, _on_change)
+    notify.on_state_change(cache.reset)
+
+
+@metrics.collector
+def _cache_gauges():
+    cache_size.set(cache.entries, "entries")
+    cache_size.set(cache.size, "bytes")
+
+
+def invalidate(user_id: int, *collections: str):
+    # After a write in this process; the NOTIFY reaches every other process
+    for collection in collections:
+        cache.invalidate(user_id, collection, "local")
+
+
+async def read_through(
+    request: Request,
+    user_id: int,
+    collections: tuple[str, ...],
+    load: Callable[[TimedPool], Awaitable[Response]],
+) -> Response:
+    # `load` builds the response from Postgres; only 200s with a rendered body are cached
+    key = f"{request.url.path}?{request.url.query}"
+    entry = cache.get(user_id, key)
+    if entry is not None:
+        cache_requests.inc("hit")
+        state = CollectionState(request, user_id, entry.versions, entry.last_modified)
+        if state.matches():
+            return state.not_modified()
+        return state.apply(RawJSONResponse(entry.body))
+
+    ticket = cache.reserve(user_id)
+    if ticket is None:
+        cache_requests.inc("bypass")
+        pool = get_read_pool(user_id)
+        state = await collection_state(pool, request, user_id, *collections)
+        if state.matches():
+            return state.not_modified()
+        return state.apply(await load(pool))
+
+    # Fills read from the primary: a replica could still return rows from before a change
+    # whose NOTIFY has already been handled, and that entry would then never be dropped.
+    # The body is built even for a matching If-None-Match so the next request is a hit.
+    cache_requests.inc("miss")
+    pool = get_pool()
+    state = await collection_state(pool, request, user_id, *collections)
+    response = await load(pool)
+    if response.status_code == 200:
+        cache.store(ticket, user_id, key, _Entry(key, collections, state, response.body))
+        if state.matches():
+            return state.not_modified()
+    return state.apply(response)
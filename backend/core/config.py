@@ -10,6 +10,155 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "secret"
     PORT: int = 3001
 
+    # Connection pool; acquires wait at most DB_ACQUIRE_TIMEOUT before answering 503.
+    # Set DB_STATEMENT_CACHE_SIZE=0 behind a transaction-mode pgbouncer.
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 20
+    DB_POOL_MAX_QUERIES: int = 50000
+    DB_POOL_MAX_IDLE_SECONDS: float = 300.0
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: float | None = 30.0
+    DB_ACQUIRE_TIMEOUT: float = 10.0
+    # serve.py sizes per-worker pools to fit max_connections minus this many
+    DB_CONNECTION_RESERVE: int = 10
+
+    # Admission control: at most ADMISSION_MAX_IN_FLIGHT requests (0 = unbounded) run at once,
+    # extra ones queue for ADMISSION_QUEUE_TIMEOUT, and new ones are shed with 503 while the
+    # oldest pool acquire has waited longer than ADMISSION_SHED_WAIT. Auth and health skip it.
+    ADMISSION_MAX_IN_FLIGHT: int = 64
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_SHED_WAIT: float = 1.0
+    ADMISSION_RETRY_AFTER: int = 1
+
+    # Optional streaming replica for read-mostly endpoints. It is used only while it has
+    # replayed the caller's own recent writes and lags the primary by at most
+    # REPLICA_MAX_LAG_SECONDS; otherwise reads fall back to the primary.
+    DB_REPLICA_HOST: str = ""
+    DB_REPLICA_PORT: int | None = None
+    DB_REPLICA_POOL_MAX_SIZE: int | None = None
+    REPLICA_POLL_INTERVAL: float = 0.2
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+
+    # Production launcher (serve.py); WEB_WORKERS=0 runs one worker per CPU and
+    # WEB_MAX_REQUESTS=0 never recycles them
+    WEB_HOST: str = "0.0.0.0"
+    WEB_WORKERS: int = 0
+    WEB_MAX_REQUESTS: int = 10000
+    WEB_MAX_REQUESTS_JITTER: int = 1000
+    WEB_GRACEFUL_TIMEOUT: int = 30
+    WEB_KEEP_ALIVE: int = 5
+    WEB_ACCESS_LOG: bool = False
+    WEB_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Apply pending migrations on startup (development); production runs `python migrate.py`
+    AUTO_MIGRATE: bool = False
+
+    # Password hashing runs on a dedicated executor so bcrypt never blocks the event loop
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_WORKERS: int = 4
+    PASSWORD_MAX_PENDING: int = 64
+    PASSWORD_RETRY_AFTER: int = 2
+
+    # Login / registration throttling, checked before any password hashing. Buckets refill
+    # at *_PER_MINUTE up to *_BURST; LOGIN_MAX_FAILURES failed logins for one email within
+    # LOGIN_FAILURE_WINDOW seconds lock it until they age out. RATE_LIMIT_BACKEND=postgres
+    # shares the state across workers, "memory" keeps it per process (LRU-bounded): with
+    # N workers every limit, and the failure lockout, effectively becomes N times looser.
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_EMAIL_BURST: int = 5
+    LOGIN_EMAIL_PER_MINUTE: float = 2
+    LOGIN_MAX_FAILURES: int = 10
+    LOGIN_FAILURE_WINDOW: int = 900
+    REGISTER_IP_BURST: int = 5
+    REGISTER_IP_PER_MINUTE: float = 1
+
+    # Verified-token and users-row caches used by the auth dependency
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_SIZE: int = 1000
+    AUTH_USER_CACHE_TTL: int = 60  # seconds; 0 disables the users-row cache
+
+    # Keyset pagination on list endpoints
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    # Nearby / geofence lookups over location profiles
+    GEOFENCE_RADIUS_M: int = 150
+    NEARBY_MAX_RADIUS_M: int = 50000
+    GEO_CACHE_USERS: int = 10000
+    GEO_CACHE_MAX_PROFILES: int = 5000
+
+    # Per-user cache of client / stakeholder / location GET responses (core/cache.py), kept
+    # coherent across processes by NOTIFY from the collection_versions triggers
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_USER_ENTRIES: int = 64
+    NOTIFY_PING_INTERVAL: float = 10.0
+    NOTIFY_RECONNECT_DELAY: float = 1.0
+
+    # Change stream (/api/stream, WebSocket or server-sent events)
+    STREAM_HEARTBEAT: float = 25.0
+    STREAM_SEND_TIMEOUT: float = 10.0
+    STREAM_MAX_CONNECTIONS: int = 10000
+    STREAM_RETRY_MS: int = 3000
+
+    # Delta sync (GET /api/sync). Tombstones older than SYNC_TOMBSTONE_DAYS are purged,
+    # and devices that last synced before then are told to reload from scratch.
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_PAGE_MAX: int = 2000
+    SYNC_TOMBSTONE_DAYS: int = 90
+    SYNC_COMPACT_INTERVAL: float = 3600.0
+
+    # Batched writes (POST /api/batch); idempotency keys are remembered for at least
+    # BATCH_IDEMPOTENCY_TTL_HOURS, so that is how long a device may keep retrying a flush
+    BATCH_MAX_OPERATIONS: int = 100
+    BATCH_IDEMPOTENCY_TTL_HOURS: int = 24
+
+    # GPS breadcrumb ingestion (POST /api/locations/track)
+    TRACK_MAX_SAMPLES_PER_REQUEST: int = 500
+    TRACK_BUFFER_MAX_ROWS: int = 50000
+    TRACK_FLUSH_ROWS: int = 5000
+    TRACK_FLUSH_INTERVAL: float = 0.25  # seconds
+    TRACK_RETRY_AFTER: int = 5
+    TRACK_RETENTION_DAYS: int = 90
+
+    # Adds an X-DB-Round-Trips header with the number of statements each request ran
+    DB_ROUND_TRIP_HEADER: bool = False
+
+    # Metrics (GET /api/metrics) and readiness (GET /api/ready)
+    METRICS_ENABLED: bool = True
+    DB_SLOW_QUERY_MS: float = 500.0
+    READY_TIMEOUT: float = 2.0
+
+    # Client overview: stakeholders and recent recordings returned inline
+    OVERVIEW_STAKEHOLDERS: int = 50
+    OVERVIEW_RECORDINGS: int = 5
+
+    # Bulk client / stakeholder import and export
+    IMPORT_MAX_ROWS: int = 100000
+    IMPORT_BATCH_ROWS: int = 5000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    EXPORT_BATCH_ROWS: int = 1000
+
+    # Recording audio: resumable chunked uploads, stored content-addressed on local disk
+    AUDIO_STORAGE_DIR: str = "storage/audio"
+    AUDIO_MAX_BYTES: int = 512 * 1024 * 1024
+    AUDIO_CHUNK_MAX_BYTES: int = 8 * 1024 * 1024
+    AUDIO_UPLOAD_TTL_HOURS: int = 24
+
+    # Transcription queue (worker.py)
+    TRANSCRIPTION_ENGINE: str = "stub"
+    TRANSCRIPTION_PROCESSES: int = 2
+    TRANSCRIPTION_MAX_ATTEMPTS: int = 5
+    TRANSCRIPTION_RETRY_BASE_SECONDS: float = 10.0
+    TRANSCRIPTION_RETRY_MAX_SECONDS: float = 3600.0
+    TRANSCRIPTION_POLL_INTERVAL: float = 5.0
+    TRANSCRIPTION_HEARTBEAT: float = 30.0
+    TRANSCRIPTION_LOCK_TIMEOUT: float = 300.0
+
     class Config:
         env_file = ".env"
 
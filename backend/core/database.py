@@ -1,96 +1,305 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
 import asyncpg
+from core import metrics
 from core.config import settings
+from core.errors import ApiError
+from core.migrations import check_schema, migrate
 
-pool: asyncpg.Pool | None = None
+pool: "TimedPool | None" = None
+replica: "TimedPool | None" = None
 
+# Per-request count of statements sent to Postgres; a one-item list so the
+# query logger, which runs in a copy of the request's context, can update it
+round_trips: ContextVar[list[int] | None] = ContextVar("round_trips", default=None)
 
-async def init_db():
-    global pool
-    pool = await asyncpg.create_pool(
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
+
+def _statement_kind(query: str) -> str:
+    # Leading keyword only, so the metric's label set stays small
+    word = query.lstrip(" \t\n(").split(None, 1)[0].upper() if query.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY") else "OTHER"
+
+
+def _on_query(record):
+    counter = round_trips.get()
+    if counter is not None:
+        counter[0] += 1
+
+    kind = _statement_kind(record.query)
+    metrics.db_query_latency.observe(record.elapsed, kind)
+    if record.exception is not None:
+        metrics.db_query_errors.inc(kind)
+    if record.elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        metrics.db_slow_queries.inc(kind)
+        print(f"Slow query ({record.elapsed * 1000:.0f} ms): {' '.join(record.query.split())[:300]}")
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    conn.add_query_logger(_on_query)
+
+
+class PoolTimeout(ApiError):
+    status_code = 503
+
+    def __init__(self):
+        super().__init__(
+            "The service is busy, please retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+
+
+# Start times of acquires still waiting for a connection, oldest first
+_waiting: dict[object, float] = {}
+
+
+def acquire_backlog() -> float:
+    # How long the oldest pending acquire has been waiting; 0 when nobody is queued
+    for start in _waiting.values():
+        return time.perf_counter() - start
+    return 0.0
+
+
+class _TimedAcquire:
+    # Used as `async with pool.acquire() as conn` or `conn = await pool.acquire()`
+    def __init__(self, pool: asyncpg.Pool, timeout: float | None):
+        self._pool = pool
+        self._timeout = timeout
+        self._conn: asyncpg.Connection | None = None
+
+    async def _acquire(self) -> asyncpg.Connection:
+        start = time.perf_counter()
+        token = object()
+        _waiting[token] = start
+        try:
+            return await self._pool.acquire(timeout=self._timeout or settings.DB_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            metrics.db_acquire_timeouts.inc()
+            # A caller that chose its own timeout handles it; otherwise the client is told to retry
+            if self._timeout is not None:
+                raise
+            raise PoolTimeout() from None
+        finally:
+            del _waiting[token]
+            metrics.db_acquire_wait.observe(time.perf_counter() - start)
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        self._conn = await self._acquire()
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
+
+
+# The app's handle on an asyncpg pool. Every way it takes a connection, including the
+# pool-level query helpers, goes through acquire() so the wait is measured.
+class TimedPool:
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+
+    def acquire(self, *, timeout: float | None = None) -> _TimedAcquire:
+        return _TimedAcquire(self._pool, timeout)
+
+    async def release(self, conn: asyncpg.Connection):
+        await self._pool.release(conn)
+
+    async def execute(self, query: str, *args, timeout: float | None = None) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: float | None = None) -> list:
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    def get_size(self) -> int:
+        return self._pool.get_size()
+
+    def get_idle_size(self) -> int:
+        return self._pool.get_idle_size()
+
+    def get_max_size(self) -> int:
+        return self._pool.get_max_size()
+
+    async def close(self):
+        await self._pool.close()
+
+
+@metrics.collector
+def _pool_gauges():
+    for name, p in (("primary", pool), ("replica", replica)):
+        if p is None:
+            continue
+        idle = p.get_idle_size()
+        metrics.db_pool_connections.set(idle, name, "idle")
+        metrics.db_pool_connections.set(p.get_size() - idle, name, "in_use")
+        metrics.db_pool_connections.set(p.get_max_size(), name, "max")
+    if replica is not None:
+        metrics.db_replica_lag.set(round(replica_lag(), 3))
+
+
+def _stats(p: TimedPool) -> dict:
+    idle = p.get_idle_size()
+    return {"size": p.get_size(), "idle": idle, "in_use": p.get_size() - idle, "max": p.get_max_size()}
+
+
+def pool_stats() -> dict:
+    stats = _stats(pool)
+    if replica is not None:
+        stats["replica"] = {**_stats(replica), "healthy": _replica_state.healthy, "lag_seconds": round(replica_lag(), 3)}
+    return stats
+
+
+async def _create_pool(host: str, port: int, max_size: int) -> TimedPool:
+    return TimedPool(await asyncpg.create_pool(
+        host=host,
+        port=port,
         user=settings.DB_USER,
         password=settings.DB_PASSWORD,
         database=settings.DB_NAME,
-    )
+        init=_init_connection,
+        min_size=min(settings.DB_POOL_MIN_SIZE, max_size),
+        max_size=max_size,
+        max_queries=settings.DB_POOL_MAX_QUERIES,
+        max_inactive_connection_lifetime=settings.DB_POOL_MAX_IDLE_SECONDS,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        command_timeout=settings.DB_COMMAND_TIMEOUT,
+    ))
+
+
+async def init_db():
+    global pool, replica
+    pool = await _create_pool(settings.DB_HOST, settings.DB_PORT, settings.DB_POOL_MAX_SIZE)
     async with pool.acquire() as conn:
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255) NOT NULL,
-                email VARCHAR(255) UNIQUE NOT NULL,
-                password VARCHAR(255) NOT NULL,
-                created_at TIMESTAMP DEFAULT NOW(),
-                login_count INTEGER DEFAULT 0
-            );
-        """)
-        # Add login_count column if table already exists without it
-        await conn.execute("""
-            ALTER TABLE users ADD COLUMN IF NOT EXISTS login_count INTEGER DEFAULT 0;
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS location_profiles (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                name VARCHAR(255) NOT NULL,
-                type VARCHAR(50) NOT NULL CHECK (type IN ('base', 'client')),
-                address TEXT,
-                latitude DOUBLE PRECISION,
-                longitude DOUBLE PRECISION,
-                use_current_location BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS clients (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                client_name VARCHAR(255) NOT NULL,
-                client_code VARCHAR(100) UNIQUE NOT NULL,
-                industry_sector VARCHAR(255),
-                company_size VARCHAR(100),
-                headquarters_location TEXT,
-                primary_office_location TEXT,
-                website_domain VARCHAR(255),
-                client_tier VARCHAR(50) DEFAULT 'Normal' CHECK (client_tier IN ('Strategic', 'Normal', 'Low Touch')),
-                engagement_health VARCHAR(20) DEFAULT 'Neutral' CHECK (engagement_health IN ('Good', 'Neutral', 'Risk')),
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT NOW(),
-                updated_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS stakeholders (
-                id SERIAL PRIMARY KEY,
-                client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
-                contact_name VARCHAR(255) NOT NULL,
-                designation_role VARCHAR(255),
-                email VARCHAR(255),
-                phone VARCHAR(50),
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT NOW(),
-                updated_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS recordings (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                transcript TEXT,
-                duration_seconds INTEGER,
-                created_at TIMESTAMP DEFAULT NOW()
-            );
-        """)
-    print("Database initialized — tables ready")
+        if settings.AUTO_MIGRATE:
+            await migrate(conn)
+        await check_schema(conn)
+    if settings.DB_REPLICA_HOST:
+        replica = await _create_pool(
+            settings.DB_REPLICA_HOST,
+            settings.DB_REPLICA_PORT or settings.DB_PORT,
+            settings.DB_REPLICA_POOL_MAX_SIZE or settings.DB_POOL_MAX_SIZE,
+        )
+        _replica_state.start()
+    print("Database initialized — schema up to date")
 
 
 async def close_db():
-    global pool
+    global pool, replica
+    if replica:
+        await _replica_state.stop()
+        await replica.close()
+        replica = None
     if pool:
         await pool.close()
         pool = None
 
 
-def get_pool() -> asyncpg.Pool:
+def get_pool() -> TimedPool:
     assert pool is not None, "Database pool not initialized"
     return pool
+
+
+# ── Read replica routing ─────────────────────────────────
+
+# Wall-clock time of the caller's last write as sent back in X-Consistency-Token,
+# so a write handled by another worker process still counts
+read_after: ContextVar[float] = ContextVar("read_after", default=0.0)
+
+# user_id -> wall-clock time of their last write through this process
+_last_writes: dict[int, float] = {}
+
+
+class _ReplicaState:
+    # Polls both servers' WAL positions. A primary LSN read at time t covers every
+    # commit that finished before t, so once the replica has replayed past it, all
+    # writes before t are visible there: that t is `visible_until`.
+    def __init__(self):
+        self.visible_until = 0.0
+        self.healthy = False
+        self._samples: list[tuple[float, int]] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.healthy = False
+
+    async def poll(self):
+        now = time.time()
+        primary_lsn = await pool.fetchval("SELECT (pg_current_wal_lsn() - '0/0')::bigint")
+        self._samples.append((now, primary_lsn))
+        # Bounded while the replica is unreachable; older samples only matter if it returns
+        del self._samples[:-1000]
+        # A server that isn't in recovery (e.g. the primary itself in development) is always current
+        replayed = await replica.fetchval(
+            """SELECT (CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn()
+                            ELSE pg_current_wal_lsn() END - '0/0')::bigint"""
+        )
+        caught_up = [t for t, lsn in self._samples if replayed is not None and lsn <= replayed]
+        if caught_up:
+            self.visible_until = max(self.visible_until, caught_up[-1])
+        self._samples = [(t, lsn) for t, lsn in self._samples if t > self.visible_until]
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+                self.healthy = True
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError, ApiError) as exc:
+                if self.healthy:
+                    print(f"Replica unavailable, reading from the primary: {exc!r}")
+                self.healthy = False
+            await asyncio.sleep(settings.REPLICA_POLL_INTERVAL)
+
+
+_replica_state = _ReplicaState()
+
+
+def replica_lag() -> float:
+    return max(time.time() - _replica_state.visible_until, 0.0)
+
+
+def note_write(user_id: int, at: float):
+    _last_writes[user_id] = at
+    if len(_last_writes) > 10000:
+        # Writes the replica has already replayed no longer affect routing
+        for uid in [u for u, t in _last_writes.items() if t < _replica_state.visible_until]:
+            del _last_writes[uid]
+
+
+def get_read_pool(user_id: int | None = None) -> TimedPool:
+    # For reads that may be served slightly stale; falls back to the primary when there is
+    # no replica, it is unreachable or lagging, or it hasn't replayed this user's last write
+    if replica is None or not _replica_state.healthy:
+        return get_pool()
+    visible_until = _replica_state.visible_until
+    if time.time() - visible_until > settings.REPLICA_MAX_LAG_SECONDS:
+        metrics.db_read_routing.inc("primary_lagging")
+        return get_pool()
+    last_write = max(read_after.get(), _last_writes.get(user_id, 0.0) if user_id is not None else 0.0)
+    if last_write >= visible_until:
+        metrics.db_read_routing.inc("primary_own_write")
+        return get_pool()
+    metrics.db_read_routing.inc("replica")
+    return replica
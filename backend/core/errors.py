@@ -0,0 +1,9 @@
+class ApiError(Exception):
+    status_code = 400
+
+    def __init__(self, message: str, status_code: int | None = None, headers: dict | None = None):
+        super().__init__(message)
+        self.message = message
+        if status_code is not None:
+            self.status_code = status_code
+        self.headers = headers
@@ -0,0 +1,65 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+from fastapi import Request
+from starlette.responses import Response
+
+# Conditional GET support backed by collection_versions (migration 0010). Triggers
+# bump a user's counter for a collection on every write, so a matching ETag means
+# nothing in the collection changed and a 304 can go out after one indexed lookup.
+
+
+class CollectionState:
+    def __init__(
+        self,
+        request: Request,
+        user_id: int,
+        versions: dict[str, int],
+        last_modified: datetime | None,
+    ):
+        # Each user, path and query string (cursor, limit, ...) is its own representation
+        variant = hashlib.sha256(f"{user_id}:{request.url.path}?{request.url.query}".encode("utf-8")).hexdigest()[:12]
+        stamp = "-".join(f"{name}.{versions[name]}" for name in sorted(versions))
+        self.etag = f'"{stamp}-{variant}"'
+        self.versions = versions
+        self.last_modified = last_modified
+        self._if_none_match = request.headers.get("if-none-match")
+
+    def _headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def matches(self) -> bool:
+        if not self._if_none_match:
+            return False
+        if self._if_none_match.strip() == "*":
+            return True
+        candidates = [tag.strip().removeprefix("W/") for tag in self._if_none_match.split(",")]
+        return self.etag in candidates
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self._headers())
+
+    def apply(self, response: Response) -> Response:
+        if response.status_code == 200:
+            response.headers.update(self._headers())
+        return response
+
+
+async def collection_state(conn, request: Request, user_id: int, *collections: str) -> CollectionState:
+    # Read before the data: a write that lands in between only makes the ETag stale-looking,
+    # never lets a client keep outdated rows
+    rows = await conn.fetch(
+        "SELECT collection, version, updated_at FROM collection_versions WHERE user_id = $1 AND collection = ANY($2::text[])",
+        user_id, list(collections),
+    )
+    versions = {name: 0 for name in collections}
+    last_modified = None
+    for r in rows:
+        versions[r["collection"]] = r["version"]
+        if last_modified is None or r["updated_at"] > last_modified:
+            last_modified = r["updated_at"]
+    return CollectionState(request, user_id, versions, last_modified)
@@ -0,0 +1,130 @@
+import math
+from collections import OrderedDict
+
+from core.config import settings
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# Grid used by the geo_cell column; must match migrations/0004_location_geo.sql
+CELL_DEGREES = 0.01
+LNG_CELLS = 36_000
+MAX_QUERY_CELLS = 400
+
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _lat_index(lat: float) -> int:
+    return math.floor((lat + 90) / CELL_DEGREES)
+
+
+def _lng_index(lng: float) -> int:
+    return math.floor((lng + 180) / CELL_DEGREES) % LNG_CELLS
+
+
+def cell_id(lat: float, lng: float) -> int:
+    return _lat_index(lat) * LNG_CELLS + _lng_index(lng)
+
+
+def cells_within(lat: float, lng: float, radius_m: float) -> list[int] | None:
+    # Every grid cell touched by the radius's bounding box; None when that is too many to list
+    dlat = radius_m / _METERS_PER_DEGREE
+    cos_lat = math.cos(math.radians(min(abs(lat) + dlat, 90.0)))
+    dlng = 180.0 if cos_lat < 1e-6 else min(radius_m / (_METERS_PER_DEGREE * cos_lat), 180.0)
+
+    lat_lo = _lat_index(max(lat - dlat, -90.0))
+    lat_hi = _lat_index(min(lat + dlat, 90.0))
+    lng_span = math.floor((lng + dlng + 180) / CELL_DEGREES) - math.floor((lng - dlng + 180) / CELL_DEGREES)
+    lng_span = min(lng_span, LNG_CELLS - 1)
+    if (lat_hi - lat_lo + 1) * (lng_span + 1) > MAX_QUERY_CELLS:
+        return None
+
+    lng_lo = _lng_index(lng - dlng)
+    return [
+        la * LNG_CELLS + (lng_lo + i) % LNG_CELLS
+        for la in range(lat_lo, lat_hi + 1)
+        for i in range(lng_span + 1)
+    ]
+
+
+class GridIndex:
+    def __init__(self, profiles: list[dict]):
+        self.size = len(profiles)
+        self._buckets: dict[int, list[dict]] = {}
+        for p in profiles:
+            self._buckets.setdefault(cell_id(p["latitude"], p["longitude"]), []).append(p)
+
+    def within(self, lat: float, lng: float, radius_m: float) -> list[tuple[float, dict]]:
+        cells = cells_within(lat, lng, radius_m)
+        if cells is None:
+            candidates = [p for bucket in self._buckets.values() for p in bucket]
+        else:
+            candidates = [p for c in cells for p in self._buckets.get(c, ())]
+        return nearest(candidates, lat, lng, radius_m)
+
+
+def nearest(profiles, lat: float, lng: float, radius_m: float) -> list[tuple[float, dict]]:
+    hits = []
+    for p in profiles:
+        distance = haversine_m(lat, lng, p["latitude"], p["longitude"])
+        if distance <= radius_m:
+            hits.append((distance, p))
+    hits.sort(key=lambda hit: (hit[0], hit[1]["id"]))
+    return hits
+
+
+# ── Per-user spatial cache ───────────────────────────────
+
+class _Slot:
+    __slots__ = ("loaded", "index")
+
+    def __init__(self):
+        self.loaded = False
+        # None for users with too many profiles to hold in memory
+        self.index: GridIndex | None = None
+
+
+# user_id -> slot; a slot is created before its index is read, and invalidation drops it,
+# so a load that raced an invalidation finds its slot gone and isn't kept
+_cache: OrderedDict[int, _Slot] = OrderedDict()
+
+
+def cached_index(user_id: int) -> tuple[bool, GridIndex | None]:
+    slot = _cache.get(user_id)
+    if slot is None or not slot.loaded:
+        return False, None
+    _cache.move_to_end(user_id)
+    return True, slot.index
+
+
+def reserve(user_id: int) -> _Slot:
+    # Taken before reading the profiles; pass it back to cache_index
+    slot = _cache.get(user_id)
+    if slot is None:
+        slot = _cache[user_id] = _Slot()
+        while len(_cache) > settings.GEO_CACHE_USERS:
+            _cache.popitem(last=False)
+    return slot
+
+
+def cache_index(ticket: _Slot, user_id: int, profiles: list[dict]) -> GridIndex | None:
+    index = GridIndex(profiles) if len(profiles) <= settings.GEO_CACHE_MAX_PROFILES else None
+    if _cache.get(user_id) is ticket:
+        ticket.index = index
+        ticket.loaded = True
+    return index
+
+
+def invalidate(user_id: int):
+    _cache.pop(user_id, None)
+
+
+def invalidate_all():
+    _cache.clear()
@@ -0,0 +1,162 @@
+import random
+
+from core.config import settings
+
+# Postgres-backed transcription queue. The API only enqueues; worker.py claims
+# jobs with FOR UPDATE SKIP LOCKED, so any number of worker processes can share it.
+
+NOTIFY_CHANNEL = "transcription_jobs"
+
+
+async def enqueue(conn, recording_id: int) -> bool:
+    # Returns False when the recording already has a queued or running job. A running
+    # job notices replaced audio when it completes and queues itself again.
+    job_id = await conn.fetchval(
+        """WITH job AS (
+               INSERT INTO transcription_jobs (recording_id, max_attempts)
+               VALUES ($1, $2)
+               ON CONFLICT (recording_id) WHERE status IN ('queued', 'running') DO NOTHING
+               RETURNING id
+           ), marked AS (
+               UPDATE recordings SET transcription_status = 'queued'
+               WHERE id = $1 AND EXISTS (SELECT 1 FROM job)
+           )
+           SELECT id FROM job""",
+        recording_id, settings.TRANSCRIPTION_MAX_ATTEMPTS,
+    )
+    if job_id is None:
+        # Still wake the workers: a queued job may only now have become claimable,
+        # e.g. when this is called as its recording's audio finishes uploading
+        await conn.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, "")
+        return False
+    await conn.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, str(job_id))
+    return True
+
+
+async def claim(conn, worker_id: str, limit: int) -> list:
+    # Only recordings whose audio has arrived are claimable
+    return await conn.fetch(
+        """WITH next AS (
+               SELECT j.id FROM transcription_jobs j
+               JOIN recordings r ON r.id = j.recording_id
+               WHERE j.status = 'queued' AND j.run_at <= NOW() AND r.audio_sha256 IS NOT NULL
+               ORDER BY j.run_at, j.id
+               LIMIT $2
+               FOR UPDATE OF j SKIP LOCKED
+           ), claimed AS (
+               UPDATE transcription_jobs j
+               SET status = 'running', attempts = j.attempts + 1,
+                   locked_by = $1, locked_at = NOW(), updated_at = NOW()
+               FROM next WHERE j.id = next.id
+               RETURNING j.id, j.recording_id, j.attempts, j.max_attempts
+           ), marked AS (
+               UPDATE recordings r SET transcription_status = 'processing'
+               FROM claimed c WHERE r.id = c.recording_id
+               RETURNING r.id, r.audio_sha256, r.audio_content_type
+           )
+           SELECT c.id, c.recording_id, c.attempts, c.max_attempts,
+                  m.audio_sha256, m.audio_content_type
+           FROM claimed c JOIN marked m ON m.id = c.recording_id
+           ORDER BY c.id""",
+        worker_id, limit,
+    )
+
+
+async def heartbeat(conn, worker_id: str, job_ids: list[int]):
+    if job_ids:
+        await conn.execute(
+            """UPDATE transcription_jobs SET locked_at = NOW()
+               WHERE id = ANY($1::bigint[]) AND locked_by = $2 AND status = 'running'""",
+            job_ids, worker_id,
+        )
+
+
+async def complete(conn, job_id: int, worker_id: str, audio_sha256: str, transcript: str) -> bool:
+    async with conn.transaction():
+        # Same lock an upload takes on the recording, so new audio either lands before
+        # this check or enqueues its own job once this one is no longer running
+        current = await conn.fetchval(
+            """SELECT audio_sha256 FROM recordings
+               WHERE id = (SELECT recording_id FROM transcription_jobs WHERE id = $1)
+               FOR UPDATE""",
+            job_id,
+        )
+        if current is not None and current != audio_sha256:
+            # Audio was replaced while this job ran; transcribe the new audio instead
+            requeued = await conn.fetchval(
+                """WITH requeued AS (
+                       UPDATE transcription_jobs
+                       SET status = 'queued', attempts = attempts - 1, run_at = NOW(),
+                           locked_by = NULL, locked_at = NULL, updated_at = NOW()
+                       WHERE id = $1 AND locked_by = $2 AND status = 'running'
+                       RETURNING recording_id
+                   ), marked AS (
+                       UPDATE recordings SET transcription_status = 'queued'
+                       FROM requeued WHERE recordings.id = requeued.recording_id
+                   )
+                   SELECT EXISTS (SELECT 1 FROM requeued)""",
+                job_id, worker_id,
+            )
+            if requeued:
+                await conn.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, str(job_id))
+            return False
+        # A job whose lock went stale and was handed to another worker is not overwritten
+        return await conn.fetchval(
+            """WITH done AS (
+                   UPDATE transcription_jobs
+                   SET status = 'completed', locked_by = NULL, locked_at = NULL,
+                       last_error = NULL, updated_at = NOW()
+                   WHERE id = $1 AND locked_by = $2 AND status = 'running'
+                   RETURNING recording_id
+               ), saved AS (
+                   UPDATE recordings SET transcript = $3, transcription_status = 'completed'
+                   FROM done WHERE recordings.id = done.recording_id
+                   RETURNING recordings.id
+               )
+               SELECT EXISTS (SELECT 1 FROM saved)""",
+            job_id, worker_id, transcript,
+        )
+
+
+def retry_delay(attempts: int) -> float:
+    # Exponential backoff with jitter so failed jobs do not retry in lockstep
+    delay = min(
+        settings.TRANSCRIPTION_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.TRANSCRIPTION_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def fail(conn, job_id: int, worker_id: str, attempts: int, error: str):
+    await conn.execute(
+        """WITH failed AS (
+               UPDATE transcription_jobs
+               SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                   run_at = NOW() + make_interval(secs => $3),
+                   locked_by = NULL, locked_at = NULL, last_error = $4, updated_at = NOW()
+               WHERE id = $1 AND locked_by = $2 AND status = 'running'
+               RETURNING recording_id, status
+           )
+           UPDATE recordings SET transcription_status = failed.status
+           FROM failed WHERE recordings.id = failed.recording_id""",
+        job_id, worker_id, retry_delay(attempts), error[:2000],
+    )
+
+
+async def requeue_stale(conn) -> int:
+    # Jobs held by a worker that stopped heartbeating go back to the queue
+    rows = await conn.fetch(
+        """WITH stale AS (
+               UPDATE transcription_jobs
+               SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                   run_at = NOW(), locked_by = NULL, locked_at = NULL,
+                   last_error = 'Worker stopped responding', updated_at = NOW()
+               WHERE status = 'running' AND locked_at < NOW() - make_interval(secs => $1)
+               RETURNING recording_id, status
+           )
+           UPDATE recordings SET transcription_status = stale.status
+           FROM stale WHERE recordings.id = stale.recording_id
+           RETURNING recordings.id""",
+        float(settings.TRANSCRIPTION_LOCK_TIMEOUT),
+    )
+    return len(rows)
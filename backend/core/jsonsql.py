@@ -0,0 +1,153 @@
+from core.errors import ApiError
+from core.pagination import Page, encode_cursor
+
+# Renders rows as compact JSON text inside Postgres, byte-identical to what
+# JSONResponse produced from the old per-row dicts, so list endpoints can hand
+# the aggregated text straight to the client without decoding it in Python.
+
+
+def _timestamp_sql(column: str) -> str:
+    # Matches datetime.isoformat() for TIMESTAMP columns: microseconds only when non-zero
+    return (
+        "COALESCE('\"' || regexp_replace(to_char("
+        + column
+        + ", 'YYYY-MM-DD\"T\"HH24:MI:SS.US'), '\\.000000$', '') || '\"', 'null')"
+    )
+
+
+def _float_sql(column: str) -> str:
+    # Python writes integral floats as "40.0"; Postgres would write "40"
+    return (
+        f"COALESCE(CASE WHEN {column} = trunc({column}) AND abs({column}) < 1e16 "
+        f"THEN trunc({column})::bigint::text || '.0' ELSE {column}::text END, 'null')"
+    )
+
+
+def _value_sql(column: str) -> str:
+    return f"COALESCE(to_json({column})::text, 'null')"
+
+
+class JsonShape:
+    def __init__(self, *fields: str, timestamps: tuple = (), floats: tuple = ()):
+        self.fields = fields
+        self.timestamps = set(timestamps)
+        self.floats = set(floats)
+
+    def object_sql(self, alias: str = "") -> str:
+        prefix = f"{alias}." if alias else ""
+        parts = []
+        for i, field in enumerate(self.fields):
+            column = prefix + field
+            if field in self.timestamps:
+                value = _timestamp_sql(column)
+            elif field in self.floats:
+                value = _float_sql(column)
+            else:
+                value = _value_sql(column)
+            key = ("{" if i == 0 else ",") + f'"{field}":'
+            parts.append(f"'{key}' || {value}")
+        return "(" + " || ".join(parts) + " || '}')"
+
+    def subset(self, fields) -> "JsonShape":
+        # Keeps the shape's own field order regardless of the order asked for
+        wanted = set(fields)
+        return JsonShape(
+            *[f for f in self.fields if f in wanted],
+            timestamps=self.timestamps & wanted,
+            floats=self.floats & wanted,
+        )
+
+    def columns(self, alias: str = "") -> str:
+        # Column list for the source query: the shape's fields plus the keyset columns,
+        # so Postgres never reads (or detoasts) a column nobody asked for
+        prefix = f"{alias}." if alias else ""
+        names = list(self.fields) + [k for k in ("id", "created_at") if k not in self.fields]
+        return ", ".join(prefix + name for name in names)
+
+
+class ProjectionError(ApiError):
+    status_code = 400
+
+
+# Query-parameter dependency shared by list endpoints: ?fields=a,b,c or ?view=summary
+class Projection:
+    def __init__(self, shape: JsonShape, summary: tuple):
+        self.shape = shape
+        self.summary = shape.subset(summary)
+
+    async def __call__(self, fields: str | None = None, view: str | None = None) -> JsonShape:
+        if fields is not None and view is not None:
+            raise ProjectionError("Use either fields or view, not both")
+        if fields is not None:
+            requested = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in requested if f not in self.shape.fields]
+            if unknown:
+                raise ProjectionError(f"Unknown field(s): {', '.join(unknown)}")
+            if not requested:
+                raise ProjectionError("fields must name at least one field")
+            return self.shape.subset(requested)
+        if view is None or view == "full":
+            return self.shape
+        if view == "summary":
+            return self.summary
+        raise ProjectionError("view must be 'full' or 'summary'")
+
+
+def json_array_sql(source: str, shape: JsonShape, limit_param: int, descending: bool = True) -> str:
+    # Subquery over the first limit+1 rows of source (which must expose created_at and id)
+    # yielding the first `limit` as a JSON array plus what is needed for a next_cursor.
+    # Meant for LATERAL joins that put several lists into one statement.
+    direction = "DESC" if descending else "ASC"
+    return f"""(
+        SELECT '[' || COALESCE(
+                   string_agg(obj, ',' ORDER BY rn) FILTER (WHERE rn <= ${limit_param}), ''
+               ) || ']' AS items,
+               max(created_at) FILTER (WHERE rn = ${limit_param}) AS last_created_at,
+               max(id) FILTER (WHERE rn = ${limit_param}) AS last_id,
+               count(*) AS fetched
+        FROM (
+            SELECT {shape.object_sql("src")} AS obj, src.created_at, src.id,
+                   row_number() OVER (ORDER BY src.created_at {direction}, src.id {direction}) AS rn
+            FROM ({source}) AS src
+            ORDER BY src.created_at {direction}, src.id {direction}
+            LIMIT ${limit_param} + 1
+        ) AS rows
+    )"""
+
+
+async def fetch_json_page(
+    conn,
+    source: str,
+    args: list,
+    shape: JsonShape,
+    page: Page,
+    descending: bool = True,
+    guard: str | None = None,
+) -> tuple[bytes | None, str | None]:
+    # guard: optional boolean SQL over args (e.g. an ownership EXISTS) checked in the
+    # same statement; items come back as None when it is false
+    keyset, keyset_args = page.sql(len(args) + 1, descending)
+    limit_param = len(args) + len(keyset_args) + 1
+    direction = "DESC" if descending else "ASC"
+    row = await conn.fetchrow(
+        f"""WITH page AS (
+                SELECT src.*, row_number() OVER (ORDER BY created_at {direction}, id {direction}) AS rn
+                FROM ({source}{keyset}) AS src
+            )
+            SELECT '[' || COALESCE(
+                       string_agg({shape.object_sql()}, ',' ORDER BY rn) FILTER (WHERE rn <= ${limit_param}),
+                       ''
+                   ) || ']' AS items,
+                   max(created_at) FILTER (WHERE rn = ${limit_param}) AS last_created_at,
+                   max(id) FILTER (WHERE rn = ${limit_param}) AS last_id,
+                   count(*) AS fetched,
+                   {guard or "TRUE"} AS found
+            FROM page""",
+        *args, *keyset_args, page.limit,
+    )
+    if not row["found"]:
+        return None, None
+    next_cursor = None
+    if row["fetched"] > page.limit:
+        next_cursor = encode_cursor(row["last_created_at"], row["last_id"])
+    return row["items"].encode("utf-8"), next_cursor
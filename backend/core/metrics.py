@@ -0,0 +1,153 @@
+import math
+from collections.abc import Callable, Iterable
+
+# In-process metrics rendered in the Prometheus text format by GET /api/metrics.
+# Each server process keeps its own registry, so with several uvicorn workers
+# scrape every worker (or run one per container) rather than the load balancer.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_registry: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e16:
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, *labels):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def set(self, value: float, *labels):
+        self._values[labels] = value
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+# Callbacks run at scrape time to refresh gauges owned by other modules
+_collectors: list[Callable[[], None]] = []
+
+
+def collector(fn: Callable[[], None]) -> Callable[[], None]:
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    for fn in _collectors:
+        fn()
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# ── HTTP ─────────────────────────────────────────────────
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"),
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body", ("method", "route"),
+)
+http_in_flight = Gauge("http_requests_in_flight", "Requests currently being handled")
+
+# ── Database ─────────────────────────────────────────────
+
+db_query_latency = Histogram(
+    "db_query_duration_seconds", "Postgres statement time as seen by asyncpg", ("statement",), DB_BUCKETS,
+)
+db_query_errors = Counter("db_query_errors_total", "Statements that raised", ("statement",))
+db_slow_queries = Counter("db_slow_queries_total", "Statements slower than DB_SLOW_QUERY_MS", ("statement",))
+db_acquire_wait = Histogram(
+    "db_pool_acquire_wait_seconds", "Time spent waiting for a pooled connection", buckets=DB_BUCKETS,
+)
+db_acquire_timeouts = Counter("db_pool_acquire_timeouts_total", "Pool acquires that gave up waiting")
+db_pool_connections = Gauge("db_pool_connections", "Pooled connections by state", ("pool", "state"))
+db_replica_lag = Gauge("db_replica_lag_seconds", "How far behind the primary the replica's replayed writes are")
+db_read_routing = Counter("db_read_routing_total", "Replica-eligible reads by where they were sent", ("target",))
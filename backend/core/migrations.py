@@ -0,0 +1,89 @@
+import re
+from pathlib import Path
+
+import asyncpg
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Arbitrary constant shared by every worker; pg_advisory_lock serializes migration runs on it
+MIGRATION_LOCK_ID = 4_201_700_001
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: Path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+
+def load_migrations() -> list[Migration]:
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise RuntimeError(f"Unexpected migration file name: {path.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), path))
+
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError("Duplicate migration version numbers")
+    return migrations
+
+
+def latest_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+async def current_version(conn: asyncpg.Connection) -> int:
+    try:
+        version = await conn.fetchval("SELECT MAX(version) FROM schema_version")
+    except asyncpg.UndefinedTableError:
+        return 0
+    return version or 0
+
+
+async def migrate(conn: asyncpg.Connection, target: int | None = None) -> list[Migration]:
+    applied = []
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+    try:
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT NOW()
+            );
+        """)
+        done = {r["version"] for r in await conn.fetch("SELECT version FROM schema_version")}
+
+        for migration in load_migrations():
+            if migration.version in done:
+                continue
+            if target is not None and migration.version > target:
+                break
+            async with conn.transaction():
+                await conn.execute(migration.sql())
+                await conn.execute(
+                    "INSERT INTO schema_version (version, name) VALUES ($1, $2)",
+                    migration.version, migration.name,
+                )
+            applied.append(migration)
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+    return applied
+
+
+async def check_schema(conn: asyncpg.Connection):
+    expected = latest_version()
+    version = await current_version(conn)
+    # A newer schema is fine: it means a later release migrated ahead of this worker
+    if version < expected:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {expected}. "
+            "Run `python migrate.py` to apply pending migrations."
+        )
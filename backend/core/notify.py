@@ -0,0 +1,98 @@
+import asyncio
+from collections.abc import Callable
+
+import asyncpg
+
+from core.config import settings
+
+# One LISTEN connection per API process, shared by everything that reacts to NOTIFY.
+# It is a dedicated connection rather than a pooled one: the pool recycles idle and
+# long-lived connections, which would silently drop the subscriptions. serve.py counts
+# it when it sizes each worker's pool against max_connections.
+#
+# Notifications sent while the connection is down are lost, so state listeners are
+# told whenever it goes up or down and must treat a reconnect as "anything may have
+# changed".
+
+_handlers: dict[str, list[Callable[[str], None]]] = {}
+_state_listeners: list[Callable[[bool], None]] = []
+
+
+def subscribe(channel: str, handler: Callable[[str], None]):
+    # Call before start(); handler receives the payload and runs on the event loop
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def on_state_change(listener: Callable[[bool], None]):
+    _state_listeners.append(listener)
+
+
+class _Listener:
+    def __init__(self):
+        self.connected = False
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if _handlers:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._set_connected(False)
+
+    def _set_connected(self, connected: bool):
+        if connected == self.connected:
+            return
+        self.connected = connected
+        for listener in _state_listeners:
+            listener(connected)
+
+    def _dispatch(self, conn, pid, channel, payload):
+        for handler in _handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception as exc:
+                print(f"NOTIFY handler for {channel} failed: {exc!r}")
+
+    async def _listen(self):
+        conn = await asyncpg.connect(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            database=settings.DB_NAME,
+        )
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda _: lost.set())
+        try:
+            for channel in _handlers:
+                await conn.add_listener(channel, self._dispatch)
+            self._set_connected(True)
+            # A half-open TCP connection never terminates on its own; the ping notices it
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=settings.NOTIFY_PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    await conn.execute("SELECT 1", timeout=settings.NOTIFY_PING_INTERVAL)
+        finally:
+            self._set_connected(False)
+            conn.terminate()
+
+    async def _run(self):
+        while True:
+            try:
+                await self._listen()
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                print(f"LISTEN connection lost, reconnecting: {exc!r}")
+            else:
+                print("LISTEN connection closed by the server, reconnecting")
+            await asyncio.sleep(settings.NOTIFY_RECONNECT_DELAY)
+
+
+listener = _Listener()
@@ -0,0 +1,86 @@
+import base64
+import binascii
+from datetime import datetime
+
+from core.config import settings
+from core.errors import ApiError
+
+
+class PaginationError(ApiError):
+    status_code = 400
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_parts(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        key, row_id = raw.split("|", 1)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError("Invalid cursor")
+    return key, row_id
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    key, row_id = _decode_parts(cursor)
+    try:
+        return datetime.fromisoformat(key), int(row_id)
+    except ValueError:
+        raise PaginationError("Invalid cursor")
+
+
+# Search results are ordered by (rank, id) instead of (created_at, id)
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    raw = f"{rank!r}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    key, row_id = _decode_parts(cursor)
+    try:
+        return float(key), int(row_id)
+    except ValueError:
+        raise PaginationError("Invalid cursor")
+
+
+# Keyset page over (created_at, id); one extra row is fetched to detect a next page
+class Page:
+    def __init__(self, limit: int, after: tuple[datetime, int] | None = None):
+        self.limit = limit
+        self.after = after
+
+    def sql(self, first_param: int, descending: bool = True, alias: str = "") -> tuple[str, list]:
+        prefix = f"{alias}." if alias else ""
+        op, direction = ("<", "DESC") if descending else (">", "ASC")
+        clause = ""
+        args: list = []
+        idx = first_param
+        if self.after is not None:
+            clause = f" AND ({prefix}created_at, {prefix}id) {op} (${idx}, ${idx + 1})"
+            args.extend(self.after)
+            idx += 2
+        clause += (
+            f" ORDER BY {prefix}created_at {direction}, {prefix}id {direction}"
+            f" LIMIT ${idx}"
+        )
+        args.append(self.limit + 1)
+        return clause, args
+
+    def split(self, rows: list) -> tuple[list, str | None]:
+        if len(rows) <= self.limit:
+            return rows, None
+        rows = rows[: self.limit]
+        last = rows[-1]
+        return rows, encode_cursor(last["created_at"], last["id"])
+
+
+async def page_params(limit: int | None = None, cursor: str | None = None) -> Page:
+    if limit is None:
+        limit = settings.PAGE_SIZE_DEFAULT
+    if limit < 1 or limit > settings.PAGE_SIZE_MAX:
+        raise PaginationError(f"limit must be between 1 and {settings.PAGE_SIZE_MAX}")
+    after = decode_cursor(cursor) if cursor else None
+    return Page(limit, after)
@@ -0,0 +1,69 @@
+# Write statements shared by the routers. Each one does its existence, ownership and
+# uniqueness checks inside a single statement, so a write costs one round trip and
+# there is no window between a check and the write. The text never varies, so
+# asyncpg prepares each statement once per connection and reuses it.
+
+CLIENT_UPDATABLE = (
+    "client_name", "industry_sector", "company_size",
+    "headquarters_location", "primary_office_location",
+    "website_domain", "client_tier", "engagement_health", "is_active",
+)
+
+# NULL when client_code is already taken
+INSERT_CLIENT = """
+    INSERT INTO clients (
+        user_id, client_name, client_code, industry_sector, company_size,
+        headquarters_location, primary_office_location, website_domain, client_tier
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    ON CONFLICT (client_code) DO NOTHING
+    RETURNING *
+"""
+
+# $3/$4, $5/$6, ... are (present, value) pairs in CLIENT_UPDATABLE order, so one
+# statement covers every combination of fields in a PATCH body
+UPDATE_CLIENT = (
+    "UPDATE clients SET "
+    + ", ".join(
+        f"{field} = CASE WHEN ${3 + 2 * i}::boolean THEN ${4 + 2 * i} ELSE {field} END"
+        for i, field in enumerate(CLIENT_UPDATABLE)
+    )
+    + ", updated_at = NOW() WHERE id = $1 AND user_id = $2 RETURNING *"
+)
+
+# NULL when the client does not exist or belongs to someone else
+INSERT_STAKEHOLDER = """
+    INSERT INTO stakeholders (client_id, contact_name, designation_role, email, phone, notes)
+    SELECT id, $3, $4, $5, $6, $7 FROM clients WHERE id = $1 AND user_id = $2
+    RETURNING *
+"""
+
+DELETE_STAKEHOLDER = """
+    WITH client AS (
+        SELECT id FROM clients WHERE id = $2 AND user_id = $3
+    ), deleted AS (
+        DELETE FROM stakeholders WHERE id = $1 AND client_id IN (SELECT id FROM client)
+        RETURNING id
+    )
+    SELECT EXISTS (SELECT 1 FROM client) AS client_found,
+           EXISTS (SELECT 1 FROM deleted) AS deleted
+"""
+
+OWNS_CLIENT = "EXISTS (SELECT 1 FROM clients WHERE id = $1 AND user_id = $2)"
+
+# NULL when a base profile already exists; idx_location_profiles_one_base enforces it
+INSERT_PROFILE = """
+    INSERT INTO location_profiles (user_id, name, type, address, latitude, longitude, use_current_location)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ON CONFLICT (user_id) WHERE type = 'base' DO NOTHING
+    RETURNING {columns}
+"""
+
+
+def update_client_args(client_id: int, user_id: int, body: dict) -> list | None:
+    # None when the body has no updatable field
+    args = [client_id, user_id]
+    for field in CLIENT_UPDATABLE:
+        args.extend((field in body, body.get(field)))
+    if not any(args[2::2]):
+        return None
+    return args
@@ -0,0 +1,176 @@
+import math
+import time
+from collections import OrderedDict
+
+from core import metrics
+from core.config import settings
+from core.database import get_pool
+from core.errors import ApiError
+
+# Throttles login and registration before any bcrypt work is queued, so a credential
+# stuffing burst or a client stuck in a retry loop can't take every core. Attempts
+# draw from token buckets per client IP and per email; failed logins also count in a
+# sliding window per email that locks further attempts once LOGIN_MAX_FAILURES is hit.
+
+rate_limited = metrics.Counter("rate_limited_total", "Requests refused by the login throttles", ("limit",))
+
+
+class RateLimited(ApiError):
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            "Too many attempts, please try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def _sliding_count(hits: int, previous: int, window: int) -> float:
+    # Previous window's hits weighted by how much of it the sliding window still covers
+    elapsed = (time.time() % window) / window
+    return hits + previous * (1 - elapsed)
+
+
+class MemoryStore:
+    # Per-process state. Past RATE_LIMIT_MAX_KEYS the least recently used keys are
+    # dropped; a dropped key starts again from a full bucket, so eviction only errs lenient.
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        # key -> (window number, hits in it, hits in the window before)
+        self._counters: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+
+    def _store(self, table: OrderedDict, key: str, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_keys:
+            table.popitem(last=False)
+
+    def _take(self, key: str, burst: float, rate: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            self._store(self._buckets, key, (tokens - 1, now))
+            return 0.0
+        self._store(self._buckets, key, (tokens, now))
+        return (1 - tokens) / rate
+
+    def _window(self, key: str, window: int) -> tuple[int, int, int]:
+        number = int(time.time() // window)
+        stored, hits, previous = self._counters.get(key, (number, 0, 0))
+        if stored == number:
+            return number, hits, previous
+        return number, 0, hits if stored == number - 1 else 0
+
+    async def check(
+        self, buckets: list[tuple[str, float, float]], counter: str | None = None, window: int = 0,
+    ) -> tuple[float, float]:
+        retry_after = max([self._take(*b) for b in buckets], default=0.0)
+        if counter is None:
+            return retry_after, 0.0
+        _, hits, previous = self._window(counter, window)
+        return retry_after, _sliding_count(hits, previous, window)
+
+    async def hit(self, counter: str, window: int):
+        number, hits, previous = self._window(counter, window)
+        self._store(self._counters, counter, (number, hits + 1, previous))
+
+    async def clear(self, counter: str):
+        self._counters.pop(counter, None)
+
+
+class PostgresStore:
+    # Shared by every worker; see migrations/0011_rate_limits.sql. A check is one statement.
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self):
+        self._last_prune = 0.0
+
+    async def check(
+        self, buckets: list[tuple[str, float, float]], counter: str | None = None, window: int = 0,
+    ) -> tuple[float, float]:
+        pool = get_pool()
+        # Without a counter its two lookups match nothing
+        number = int(time.time() // window) if counter is not None else 0
+        row = await pool.fetchrow(
+            """SELECT COALESCE((
+                          SELECT max(take_rate_limit_token(k, b, r))
+                          FROM unnest($1::text[], $2::float8[], $3::float8[]) AS t(k, b, r)
+                      ), 0) AS retry_after,
+                      COALESCE((SELECT hits FROM rate_limit_counters WHERE key = $4 AND bucket = $5), 0) AS hits,
+                      COALESCE((SELECT hits FROM rate_limit_counters WHERE key = $4 AND bucket = $5 - 1), 0) AS previous""",
+            [b[0] for b in buckets], [float(b[1]) for b in buckets], [float(b[2]) for b in buckets],
+            counter, number,
+        )
+        await self._prune(pool)
+        if counter is None:
+            return row["retry_after"], 0.0
+        return row["retry_after"], _sliding_count(row["hits"], row["previous"], window)
+
+    async def hit(self, counter: str, window: int):
+        await get_pool().execute(
+            """INSERT INTO rate_limit_counters (key, bucket, hits) VALUES ($1, $2, 1)
+               ON CONFLICT (key, bucket) DO UPDATE
+               SET hits = rate_limit_counters.hits + 1, updated_at = NOW()""",
+            counter, int(time.time() // window),
+        )
+
+    async def clear(self, counter: str):
+        await get_pool().execute("DELETE FROM rate_limit_counters WHERE key = $1", counter)
+
+    async def _prune(self, pool):
+        # Idle buckets are full again, and counters older than two windows no longer count
+        if time.monotonic() - self._last_prune < self.PRUNE_INTERVAL:
+            return
+        self._last_prune = time.monotonic()
+        await pool.execute("DELETE FROM rate_limit_buckets WHERE updated_at < NOW() - INTERVAL '1 hour'")
+        await pool.execute(
+            "DELETE FROM rate_limit_counters WHERE updated_at < NOW() - make_interval(secs => $1)",
+            2.0 * settings.LOGIN_FAILURE_WINDOW,
+        )
+
+
+store = PostgresStore() if settings.RATE_LIMIT_BACKEND == "postgres" else MemoryStore(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def _bucket(name: str, key: str, burst: int, per_minute: float) -> tuple[str, float, float]:
+    return f"{name}:{key}", burst, per_minute / 60
+
+
+async def check_login(email: str, ip: str) -> float:
+    # Raises RateLimited, or returns the email's recent failure count
+    retry_after, failures = await store.check(
+        [
+            _bucket("login-ip", ip, settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE),
+            _bucket("login-email", email, settings.LOGIN_EMAIL_BURST, settings.LOGIN_EMAIL_PER_MINUTE),
+        ],
+        f"login-failures:{email}",
+        settings.LOGIN_FAILURE_WINDOW,
+    )
+    if retry_after > 0:
+        rate_limited.inc("login")
+        raise RateLimited(retry_after)
+    if failures >= settings.LOGIN_MAX_FAILURES:
+        rate_limited.inc("login_failures")
+        window = settings.LOGIN_FAILURE_WINDOW
+        raise RateLimited(window - time.time() % window)
+    return failures
+
+
+async def login_failed(email: str):
+    await store.hit(f"login-failures:{email}", settings.LOGIN_FAILURE_WINDOW)
+
+
+async def login_succeeded(email: str, failures: float):
+    if failures:
+        await store.clear(f"login-failures:{email}")
+
+
+async def check_register(ip: str):
+    retry_after, _ = await store.check(
+        [_bucket("register-ip", ip, settings.REGISTER_IP_BURST, settings.REGISTER_IP_PER_MINUTE)],
+    )
+    if retry_after > 0:
+        rate_limited.inc("register")
+        raise RateLimited(retry_after)
@@ -0,0 +1,18 @@
+import orjson
+from starlette.responses import JSONResponse as StarletteJSONResponse
+from starlette.responses import Response
+
+
+# Drop-in for fastapi.responses.JSONResponse; orjson emits the same compact output
+class JSONResponse(StarletteJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+class RawJSONResponse(Response):
+    media_type = "application/json"
+
+
+def list_response(key: str, items: bytes, next_cursor: str | None, status_code: int = 200) -> Response:
+    body = b'{"' + key.encode("utf-8") + b'":' + items + b',"next_cursor":' + orjson.dumps(next_cursor) + b"}"
+    return RawJSONResponse(body, status_code=status_code)
@@ -1,19 +1,123 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import bcrypt
 import jwt
 
 from core.config import settings
+from core.errors import ApiError
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+class PasswordPoolBusy(ApiError):
+    status_code = 503
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            "Server is busy, please try again shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.retry_after = retry_after
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    try:
+        cost = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return cost != settings.BCRYPT_ROUNDS
+
+
+# ── Password executor ────────────────────────────────────
+
+_executor: Executor | None = None
+_pending = 0
+_stats = {
+    "completed": 0,
+    "rejected": 0,
+    "failed": 0,
+    "busy_seconds": 0.0,
+    "max_pending": 0,
+}
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.PASSWORD_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_WORKERS)
+        else:
+            # bcrypt releases the GIL while hashing, so threads scale across cores
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_WORKERS,
+                thread_name_prefix="password",
+            )
+    return _executor
+
+
+async def _run_password_work(fn, *args):
+    global _pending
+    if _pending >= settings.PASSWORD_MAX_PENDING:
+        _stats["rejected"] += 1
+        raise PasswordPoolBusy(settings.PASSWORD_RETRY_AFTER)
+
+    _pending += 1
+    _stats["max_pending"] = max(_stats["max_pending"], _pending)
+    start = time.perf_counter()
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    finally:
+        _pending -= 1
+        _stats["busy_seconds"] += time.perf_counter() - start
+    _stats["completed"] += 1
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_work(hash_password, password, settings.BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_work(verify_password, plain_password, hashed_password)
+
+
+def password_pool_stats() -> dict:
+    workers = settings.PASSWORD_WORKERS
+    return {
+        "executor": settings.PASSWORD_EXECUTOR,
+        "workers": workers,
+        "pending": _pending,
+        "active": min(_pending, workers),
+        "queued": max(_pending - workers, 0),
+        "saturation": round(_pending / workers, 3) if workers else 0.0,
+        "max_pending_limit": settings.PASSWORD_MAX_PENDING,
+        **_stats,
+    }
+
+
+def shutdown_password_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# ── Tokens ───────────────────────────────────────────────
+
 def create_access_token(user_id: int, email: str) -> str:
     payload = {
         "id": user_id,
@@ -0,0 +1,171 @@
+import asyncio
+import base64
+import binascii
+from collections.abc import AsyncIterator
+
+from core import metrics, notify
+from core.cache import CHANGES_CHANNEL, parse_change
+from core.config import settings
+from core.database import get_pool
+from core.errors import ApiError
+
+# Per-user change events for /api/stream, fanned out from the collection_changes NOTIFY
+# (migration 0012) that the process already listens to. An idle stream is a parked
+# coroutine: no query, no pooled connection, just a heartbeat every STREAM_HEARTBEAT.
+#
+# An event says "collection X is now at version N"; clients refetch what they show.
+# Pending events are coalesced per collection, so a slow client gets the latest
+# version once instead of an ever-growing backlog. Every event carries a cursor (the
+# versions seen so far) that a reconnecting client passes back to hear only about
+# what changed while it was away.
+
+stream_connections = metrics.Gauge("stream_connections", "Open change streams", ("transport",))
+stream_events = metrics.Counter("stream_events_total", "Change events sent to streams", ("transport",))
+
+
+class StreamError(ApiError):
+    status_code = 400
+
+
+class StreamFull(ApiError):
+    status_code = 503
+
+    def __init__(self):
+        super().__init__(
+            "Too many open streams, please retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+
+
+# The "v1;" prefix keeps a cursor for a user with no collections yet from being empty,
+# since EventSource doesn't send back an empty Last-Event-ID
+def encode_cursor(versions: dict[str, int]) -> str:
+    raw = "v1;" + ",".join(f"{name}:{versions[name]}" for name in sorted(versions))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        prefix, pairs = raw.split(";", 1)
+        if prefix != "v1":
+            raise ValueError(prefix)
+        return {name: int(version) for name, version in (pair.split(":", 1) for pair in pairs.split(",") if pair)}
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise StreamError("Invalid cursor")
+
+
+class Subscriber:
+    def __init__(self, user_id: int, seen: dict[str, int]):
+        self.user_id = user_id
+        self.seen = seen
+        self.closed = False
+        self._pending: dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+
+    def push(self, collection: str, version: int):
+        if version > max(self.seen.get(collection, 0), self._pending.get(collection, 0)):
+            self._pending[collection] = version
+            self._wakeup.set()
+
+    def close(self):
+        self.closed = True
+        self._wakeup.set()
+
+    def _take(self) -> list[dict]:
+        events = []
+        for collection, version in sorted(self._pending.items()):
+            if version <= self.seen.get(collection, 0):
+                continue
+            self.seen[collection] = version
+            events.append({"type": "change", "collection": collection, "version": version})
+        self._pending.clear()
+        cursor = encode_cursor(self.seen)
+        for event in events:
+            event["cursor"] = cursor
+        return events
+
+    async def events(self) -> AsyncIterator[dict | None]:
+        # Catch-up changes, then "ready", then live changes; None means send a heartbeat
+        for event in self._take():
+            yield event
+        yield {"type": "ready", "cursor": encode_cursor(self.seen)}
+        while not self.closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            self._wakeup.clear()
+            for event in self._take():
+                yield event
+
+
+class StreamHub:
+    def __init__(self):
+        self.count = 0
+        self._subscribers: dict[int, set[Subscriber]] = {}
+        self._resync_task: asyncio.Task | None = None
+
+    def check_capacity(self):
+        if self.count >= settings.STREAM_MAX_CONNECTIONS:
+            raise StreamFull()
+
+    async def open(self, user_id: int, seen: dict[str, int] | None) -> Subscriber:
+        self.check_capacity()
+        # Registered before the lookup so a change announced meanwhile isn't missed
+        subscriber = Subscriber(user_id, dict(seen or {}))
+        self._subscribers.setdefault(user_id, set()).add(subscriber)
+        self.count += 1
+        try:
+            rows = await get_pool().fetch(
+                "SELECT collection, version FROM collection_versions WHERE user_id = $1", user_id,
+            )
+        except BaseException:
+            self.close(subscriber)
+            raise
+        for r in rows:
+            if seen is None:
+                # Without a cursor the client is about to load everything, so start from now
+                subscriber.seen[r["collection"]] = max(subscriber.seen.get(r["collection"], 0), r["version"])
+            else:
+                subscriber.push(r["collection"], r["version"])
+        return subscriber
+
+    def close(self, subscriber: Subscriber):
+        subscriber.close()
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if subscribers is not None and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            self.count -= 1
+            if not subscribers:
+                del self._subscribers[subscriber.user_id]
+
+    def on_change(self, payload: str):
+        user_id, collection, version = parse_change(payload)
+        for subscriber in self._subscribers.get(user_id, ()):
+            subscriber.push(collection, version)
+
+    def on_state_change(self, connected: bool):
+        # Changes made while LISTEN was down were never announced; look them up in one query
+        if connected and self._subscribers and self._resync_task is None:
+            self._resync_task = asyncio.create_task(self._resync())
+
+    async def _resync(self):
+        try:
+            rows = await get_pool().fetch(
+                "SELECT user_id, collection, version FROM collection_versions WHERE user_id = ANY($1::int[])",
+                list(self._subscribers),
+            )
+            for r in rows:
+                for subscriber in self._subscribers.get(r["user_id"], ()):
+                    subscriber.push(r["collection"], r["version"])
+        except Exception as exc:
+            print(f"Change stream resync failed: {exc!r}")
+        finally:
+            self._resync_task = None
+
+
+hub = StreamHub()
+notify.subscribe(CHANGES_CHANNEL, hub.on_change)
+notify.on_state_change(hub.on_state_change)
@@ -0,0 +1,102 @@
+import base64
+import binascii
+import time
+
+from core.config import settings
+from core.errors import ApiError
+
+# Delta sync over change_log (migration 0013). A position in the log is
+# (txid, entity, entity_id); rows are read in that order. A cursor also carries the
+# txid its pass started from (0 for a full pass), because whether a pass must reset
+# depends on where it began, not on how far it has paged: live rows are never purged,
+# so a mid-pass position can sit below the horizon without anything being lost.
+#
+# Each read is capped at the snapshot's xmin, the oldest transaction still running:
+# every transaction below it has finished, and every later one has a larger txid.
+# So once a client's cursor passes a txid, no change can ever appear behind it,
+# which a sequence number can't promise (a smaller value may commit later). A long
+# write transaction delays sync until it finishes, but never makes it skip a row.
+
+ENTITIES = ("clients", "stakeholders", "locations", "recordings")
+
+
+class SyncError(ApiError):
+    status_code = 400
+
+
+def encode_cursor(txid: str, entity: str = "", entity_id: int = 0, origin: str | None = None) -> str:
+    # A cursor that ends a pass starts the next one, so by default it is its own origin
+    raw = f"{txid}|{entity}|{entity_id}|{txid if origin is None else origin}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str, int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        txid, entity, entity_id, origin = raw.split("|")
+        if not txid.isdigit() or not origin.isdigit():
+            raise ValueError(txid)
+        return txid, entity, int(entity_id), origin
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise SyncError("Invalid cursor")
+
+
+def changes_sql(shapes: dict) -> str:
+    # shapes: entity -> (table, JsonShape). One statement so the rows, their current data
+    # and the xmin bound all come from the same snapshot. A delta pass resets when
+    # tombstones newer than its origin ($6) may have been purged, whichever page it is on;
+    # it then restarts from the beginning as a full pass.
+    data = "\n".join(
+        f"WHEN '{entity}' THEN (SELECT {shape.object_sql('e')} FROM {table} e WHERE e.id = l.entity_id)"
+        for entity, (table, shape) in shapes.items()
+    )
+    return f"""
+        WITH bounds AS (
+            SELECT pg_snapshot_xmin(pg_current_snapshot()) AS upto,
+                   $6::text::xid8 > '0' AND $6::text::xid8 <= (SELECT purged_through FROM sync_horizon) AS reset
+        )
+        SELECT b.upto::text AS upto, b.reset, l.txid::text AS txid, l.entity, l.entity_id, l.deleted,
+               CASE WHEN l.deleted THEN NULL ELSE CASE l.entity {data} END END AS data
+        FROM bounds b
+        LEFT JOIN LATERAL (
+            SELECT * FROM change_log
+            WHERE user_id = $1
+              AND txid < b.upto
+              AND (b.reset OR (txid, entity, entity_id) > ($2::text::xid8, $3::text, $4::int))
+            ORDER BY txid, entity, entity_id
+            LIMIT $5 + 1
+        ) l ON TRUE
+        ORDER BY l.txid, l.entity, l.entity_id"""
+
+
+_last_compaction = 0.0
+
+
+async def compact(pool):
+    # Tombstones only need to outlive the devices that haven't synced since; past
+    # SYNC_TOMBSTONE_DAYS they are purged and older cursors are told to start over.
+    # Live rows are never purged: they are what a fresh sync reads.
+    global _last_compaction
+    if time.monotonic() - _last_compaction < settings.SYNC_COMPACT_INTERVAL:
+        return
+    _last_compaction = time.monotonic()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            # One process at a time; the others skip this round
+            if not await conn.fetchval("SELECT pg_try_advisory_xact_lock(hashtext('change_log_compaction'))"):
+                return
+            purged = await conn.fetchval(
+                """WITH purged AS (
+                       DELETE FROM change_log
+                       WHERE deleted AND changed_at < NOW() - make_interval(days => $1)
+                       RETURNING txid
+                   ), horizon AS (
+                       UPDATE sync_horizon
+                       SET purged_through = GREATEST(purged_through, (SELECT max(txid) FROM purged))
+                       WHERE EXISTS (SELECT 1 FROM purged)
+                   )
+                   SELECT count(*) FROM purged""",
+                settings.SYNC_TOMBSTONE_DAYS,
+            )
+    if purged:
+        print(f"Purged {purged} sync tombstones older than {settings.SYNC_TOMBSTONE_DAYS} days")
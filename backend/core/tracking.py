@@ -0,0 +1,221 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import asyncpg
+
+from core.config import settings
+from core.database import get_pool
+from core.errors import ApiError
+
+SAMPLE_COLUMNS = [
+    "user_id", "device_id", "seq", "recorded_at",
+    "latitude", "longitude", "accuracy_m", "speed_mps", "heading",
+]
+
+PARTITION_PREFIX = "location_samples_"
+
+_INSERT_STAGED = f"""
+    INSERT INTO location_samples ({", ".join(SAMPLE_COLUMNS)})
+    SELECT {", ".join(SAMPLE_COLUMNS)} FROM track_staging
+    ON CONFLICT (user_id, device_id, seq, recorded_at) DO NOTHING
+    RETURNING user_id, device_id, seq
+"""
+
+# Highest seq received per device, reported back so clients know where they stand
+_ADVANCE_CURSORS = """
+    INSERT INTO location_track_cursors (user_id, device_id, last_seq)
+    SELECT * FROM unnest($1::int[], $2::text[], $3::bigint[])
+    ON CONFLICT (user_id, device_id) DO UPDATE
+    SET last_seq = GREATEST(location_track_cursors.last_seq, EXCLUDED.last_seq),
+        updated_at = NOW()
+    RETURNING user_id, device_id, last_seq
+"""
+
+
+class TrackBufferFull(ApiError):
+    status_code = 503
+
+    def __init__(self):
+        super().__init__(
+            "Location track buffer is full, please retry shortly",
+            headers={"Retry-After": str(settings.TRACK_RETRY_AFTER)},
+        )
+
+
+class TrackFlushFailed(ApiError):
+    status_code = 503
+
+    def __init__(self):
+        super().__init__(
+            "Could not store location samples, please retry",
+            headers={"Retry-After": str(settings.TRACK_RETRY_AFTER)},
+        )
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+class _Batch:
+    def __init__(self):
+        self.rows: list[tuple] = []
+        self.waiters: list[asyncio.Future] = []
+        # (user_id, device_id) -> highest seq in this batch
+        self.high_water: dict[tuple[int, str], int] = {}
+
+
+class _Flushed:
+    def __init__(self, inserted: set[tuple[int, str, int]], last_seqs: dict[tuple[int, str], int]):
+        # (user_id, device_id, seq) of the rows this flush stored
+        self.inserted = inserted
+        self.last_seqs = last_seqs
+
+
+# Buffers breadcrumbs from concurrent requests and writes them with one COPY per flush.
+# A request returns only once its batch is committed, so an acknowledged sample is durable.
+# Replays are dropped by the unique index (migration 0015), not by per-process state, so
+# they are caught whichever worker they reach, and late out-of-order samples still land.
+class TrackBuffer:
+    def __init__(self):
+        self._batch = _Batch()
+        self._inflight: _Batch | None = None
+        self._partitions: set[date] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._last_retention = 0.0
+
+    def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Let the loop finish its current flush and drain what is left
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._batch.rows),
+            "inflight": len(self._inflight.rows) if self._inflight else 0,
+            "capacity": settings.TRACK_BUFFER_MAX_ROWS,
+            "partitions": len(self._partitions),
+        }
+
+    async def submit(self, user_id: int, device_id: str, samples: list[dict]) -> dict:
+        key = (user_id, device_id)
+        fresh = {s["seq"]: s for s in samples}
+
+        pending = len(self._batch.rows) + (len(self._inflight.rows) if self._inflight else 0)
+        if pending + len(fresh) > settings.TRACK_BUFFER_MAX_ROWS:
+            raise TrackBufferFull()
+
+        batch = self._batch
+        for seq in sorted(fresh):
+            s = fresh[seq]
+            batch.rows.append((
+                user_id, device_id, seq, s["recorded_at"],
+                s["latitude"], s["longitude"], s.get("accuracy_m"), s.get("speed_mps"), s.get("heading"),
+            ))
+        batch.high_water[key] = max(batch.high_water.get(key, -1), max(fresh))
+        waiter = asyncio.get_running_loop().create_future()
+        batch.waiters.append(waiter)
+        if len(batch.rows) >= settings.TRACK_FLUSH_ROWS:
+            self._wakeup.set()
+
+        flushed = await asyncio.shield(waiter)
+        # Replayed uploads are acknowledged; only rows the flush actually stored count
+        accepted = sum(1 for seq in fresh if (user_id, device_id, seq) in flushed.inserted)
+        return {"accepted": accepted, "duplicates": len(samples) - accepted, "last_seq": flushed.last_seqs[key]}
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.TRACK_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_retention > 3600:
+                    self._last_retention = time.monotonic()
+                    await drop_expired_partitions()
+            except Exception as exc:
+                print(f"Location track flush failed: {exc!r}")
+
+    async def flush(self):
+        if not self._batch.rows or self._inflight is not None:
+            return
+        batch, self._batch = self._batch, _Batch()
+        self._inflight = batch
+        try:
+            async with get_pool().acquire() as conn:
+                await self._ensure_partitions(conn, {row[3].date() for row in batch.rows})
+                async with conn.transaction():
+                    await conn.execute(
+                        "CREATE TEMP TABLE track_staging (LIKE location_samples INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    await conn.copy_records_to_table("track_staging", records=batch.rows, columns=SAMPLE_COLUMNS)
+                    inserted = await conn.fetch(_INSERT_STAGED)
+                    cursors = await conn.fetch(
+                        _ADVANCE_CURSORS,
+                        [u for u, _ in batch.high_water],
+                        [d for _, d in batch.high_water],
+                        list(batch.high_water.values()),
+                    )
+        except Exception:
+            for waiter in batch.waiters:
+                if not waiter.done():
+                    waiter.set_exception(TrackFlushFailed())
+            raise
+        finally:
+            self._inflight = None
+
+        flushed = _Flushed(
+            {(r["user_id"], r["device_id"], r["seq"]) for r in inserted},
+            {(r["user_id"], r["device_id"]): r["last_seq"] for r in cursors},
+        )
+        for waiter in batch.waiters:
+            if not waiter.done():
+                waiter.set_result(flushed)
+
+    async def _ensure_partitions(self, conn: asyncpg.Connection, days: set[date]):
+        for day in sorted(days - self._partitions):
+            async with conn.transaction():
+                # Serialize DDL across workers that flush the same new day at once
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext('location_samples'))")
+                await conn.execute(
+                    f"""CREATE TABLE IF NOT EXISTS {partition_name(day)}
+                        PARTITION OF location_samples
+                        FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"""
+                )
+            self._partitions.add(day)
+
+
+async def drop_expired_partitions() -> list[str]:
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=settings.TRACK_RETENTION_DAYS)
+    pool = get_pool()
+    rows = await pool.fetch(
+        """SELECT c.relname FROM pg_inherits i
+           JOIN pg_class c ON c.oid = i.inhrelid
+           WHERE i.inhparent = 'location_samples'::regclass""",
+    )
+    dropped = []
+    for row in rows:
+        name = row["relname"]
+        try:
+            day = datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+        except ValueError:
+            continue
+        if day < cutoff:
+            await pool.execute(f"DROP TABLE IF EXISTS {name}")
+            dropped.append(name)
+    return dropped
+
+
+buffer = TrackBuffer()
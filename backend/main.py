@@ -1,36 +1,70 @@
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from core import notify, tracking
 from core.config import settings
 from core.database import close_db, init_db
-from routers import auth, clients, health, locations, recordings
+from core.errors import ApiError
+from core.middleware import AdmissionMiddleware, ConsistencyMiddleware, MetricsMiddleware, RoundTripMiddleware
+from core.responses import JSONResponse
+from core.security import shutdown_password_pool
+from routers import auth, batch, clients, health, locations, recordings, stream, sync
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    tracking.buffer.start()
+    notify.listener.start()
     yield
+    await notify.listener.stop()
+    await tracking.buffer.stop()
     await close_db()
+    shutdown_password_pool()
 
 
 app = FastAPI(lifespan=lifespan)
 
+# Middleware added later wraps the earlier ones, so admission runs inside CORS
+app.add_middleware(AdmissionMiddleware)
+if settings.DB_REPLICA_HOST:
+    app.add_middleware(ConsistencyMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Consistency-Token"],
 )
 
+if settings.DB_ROUND_TRIP_HEADER:
+    app.add_middleware(RoundTripMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(ApiError)
+async def api_error_handler(request: Request, exc: ApiError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.message},
+        headers=exc.headers,
+    )
+
+
 app.include_router(auth.router)
 app.include_router(health.router)
 app.include_router(locations.router)
 app.include_router(clients.router)
 app.include_router(recordings.router)
+app.include_router(stream.router)
+app.include_router(sync.router)
+app.include_router(batch.router)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=settings.PORT, reload=True)
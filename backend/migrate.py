@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+
+import asyncpg
+
+from core.config import settings
+from core.migrations import current_version, load_migrations, migrate
+
+
+async def run(args: argparse.Namespace):
+    conn = await asyncpg.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        database=settings.DB_NAME,
+    )
+    try:
+        version = await current_version(conn)
+        if args.status:
+            print(f"Current schema version: {version}")
+            for m in load_migrations():
+                state = "applied" if m.version <= version else "pending"
+                print(f"  {m.version:04d}_{m.name}  {state}")
+            return
+
+        applied = await migrate(conn, target=args.target)
+        for m in applied:
+            print(f"Applied {m.version:04d}_{m.name}")
+        print(f"Schema at version {await current_version(conn)}")
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="show applied and pending migrations")
+    parser.add_argument("--target", type=int, default=None, help="migrate up to this version only")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    login_count INTEGER DEFAULT 0
+);
+
+-- Databases created before login_count existed
+ALTER TABLE users ADD COLUMN IF NOT EXISTS login_count INTEGER DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS location_profiles (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    name VARCHAR(255) NOT NULL,
+    type VARCHAR(50) NOT NULL CHECK (type IN ('base', 'client')),
+    address TEXT,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    use_current_location BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS clients (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    client_name VARCHAR(255) NOT NULL,
+    client_code VARCHAR(100) UNIQUE NOT NULL,
+    industry_sector VARCHAR(255),
+    company_size VARCHAR(100),
+    headquarters_location TEXT,
+    primary_office_location TEXT,
+    website_domain VARCHAR(255),
+    client_tier VARCHAR(50) DEFAULT 'Normal' CHECK (client_tier IN ('Strategic', 'Normal', 'Low Touch')),
+    engagement_health VARCHAR(20) DEFAULT 'Neutral' CHECK (engagement_health IN ('Good', 'Neutral', 'Risk')),
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS stakeholders (
+    id SERIAL PRIMARY KEY,
+    client_id INTEGER NOT NULL REFERENCES clients(id) ON DELETE CASCADE,
+    contact_name VARCHAR(255) NOT NULL,
+    designation_role VARCHAR(255),
+    email VARCHAR(255),
+    phone VARCHAR(50),
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS recordings (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    transcript TEXT,
+    duration_seconds INTEGER,
+    created_at TIMESTAMP DEFAULT NOW()
+);
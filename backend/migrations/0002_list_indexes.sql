@@ -0,0 +1,9 @@
+-- Composite indexes matching the (created_at, id) keyset order of each list endpoint
+CREATE INDEX IF NOT EXISTS idx_clients_user_created
+    ON clients (user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_location_profiles_user_created
+    ON location_profiles (user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_recordings_user_created
+    ON recordings (user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_stakeholders_client_created
+    ON stakeholders (client_id, created_at, id);
@@ -0,0 +1,8 @@
+-- Full-text search over transcripts. The planner combines this GIN index with
+-- idx_recordings_user_created (bitmap AND) to restrict matches to one user.
+ALTER TABLE recordings
+    ADD COLUMN IF NOT EXISTS transcript_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', COALESCE(transcript, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_recordings_transcript_tsv
+    ON recordings USING GIN (transcript_tsv);
@@ -0,0 +1,12 @@
+-- 0.01 degree grid cell (about 1.1 km of latitude) for nearby / geofence lookups.
+-- core/geo.py computes the same cell ids; keep CELL_DEGREES and LNG_CELLS in sync.
+ALTER TABLE location_profiles
+    ADD COLUMN IF NOT EXISTS geo_cell BIGINT
+    GENERATED ALWAYS AS (
+        floor((latitude + 90) / 0.01::float8)::bigint * 36000
+        + mod(floor((longitude + 180) / 0.01::float8)::bigint, 36000)
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_location_profiles_user_cell
+    ON location_profiles (user_id, geo_cell)
+    WHERE geo_cell IS NOT NULL;
@@ -0,0 +1,26 @@
+-- GPS breadcrumbs, partitioned by day so retention drops whole partitions.
+-- Daily partitions are created on demand by core/tracking.py.
+CREATE TABLE IF NOT EXISTS location_samples (
+    user_id INTEGER NOT NULL,
+    device_id VARCHAR(64) NOT NULL,
+    seq BIGINT NOT NULL,
+    recorded_at TIMESTAMP NOT NULL,
+    latitude DOUBLE PRECISION NOT NULL,
+    longitude DOUBLE PRECISION NOT NULL,
+    accuracy_m REAL,
+    speed_mps REAL,
+    heading REAL,
+    received_at TIMESTAMP NOT NULL DEFAULT NOW()
+) PARTITION BY RANGE (recorded_at);
+
+CREATE INDEX IF NOT EXISTS idx_location_samples_user_recorded
+    ON location_samples (user_id, recorded_at);
+
+-- Highest sequence number stored per device; replayed uploads below it are skipped
+CREATE TABLE IF NOT EXISTS location_track_cursors (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    device_id VARCHAR(64) NOT NULL,
+    last_seq BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (user_id, device_id)
+);
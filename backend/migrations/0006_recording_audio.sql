@@ -0,0 +1,28 @@
+-- Audio files are stored content-addressed on disk (see core/audio.py); one row per stored blob
+CREATE TABLE IF NOT EXISTS audio_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size_bytes BIGINT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+ALTER TABLE recordings
+    ADD COLUMN IF NOT EXISTS audio_sha256 CHAR(64) REFERENCES audio_blobs(sha256),
+    ADD COLUMN IF NOT EXISTS audio_content_type VARCHAR(100),
+    ADD COLUMN IF NOT EXISTS audio_size_bytes BIGINT;
+
+CREATE INDEX IF NOT EXISTS idx_recordings_audio_sha256
+    ON recordings (audio_sha256) WHERE audio_sha256 IS NOT NULL;
+
+-- In-progress resumable uploads; received_bytes is the offset the next chunk must start at
+CREATE TABLE IF NOT EXISTS audio_uploads (
+    id UUID PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    recording_id INTEGER NOT NULL REFERENCES recordings(id) ON DELETE CASCADE,
+    size_bytes BIGINT NOT NULL,
+    received_bytes BIGINT NOT NULL DEFAULT 0,
+    content_type VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_audio_uploads_recording ON audio_uploads (recording_id);
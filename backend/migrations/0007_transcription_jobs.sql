@@ -0,0 +1,30 @@
+-- Server-side transcription; recordings with a client-supplied transcript keep a NULL status
+ALTER TABLE recordings
+    ADD COLUMN IF NOT EXISTS transcription_status VARCHAR(20)
+        CHECK (transcription_status IN ('queued', 'processing', 'completed', 'failed'));
+
+-- Queue claimed by worker.py with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS transcription_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    recording_id INTEGER NOT NULL REFERENCES recordings(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(100),
+    locked_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- At most one live job per recording
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transcription_jobs_live
+    ON transcription_jobs (recording_id) WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_transcription_jobs_ready
+    ON transcription_jobs (run_at, id) WHERE status = 'queued';
+
+CREATE INDEX IF NOT EXISTS idx_transcription_jobs_running
+    ON transcription_jobs (locked_at) WHERE status = 'running';
@@ -0,0 +1,11 @@
+-- One base location per user, enforced by the database instead of a check-then-insert.
+-- Extra bases left behind by earlier races are kept as client locations.
+UPDATE location_profiles p SET type = 'client'
+WHERE p.type = 'base' AND EXISTS (
+    SELECT 1 FROM location_profiles o
+    WHERE o.user_id = p.user_id AND o.type = 'base'
+      AND (o.created_at, o.id) < (p.created_at, p.id)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_location_profiles_one_base
+    ON location_profiles (user_id) WHERE type = 'base';
@@ -0,0 +1,6 @@
+-- Recordings can be filed under a client; the client overview lists the latest ones
+ALTER TABLE recordings
+    ADD COLUMN IF NOT EXISTS client_id INTEGER REFERENCES clients(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_recordings_client_created
+    ON recordings (client_id, created_at DESC, id DESC) WHERE client_id IS NOT NULL;
@@ -0,0 +1,84 @@
+-- Per-user change counter for each API collection, bumped by triggers on every write.
+-- Conditional GETs compare against it (core/etags.py) without touching row data.
+CREATE TABLE IF NOT EXISTS collection_versions (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    collection VARCHAR(32) NOT NULL,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, collection)
+);
+
+CREATE OR REPLACE FUNCTION bump_collection_versions(p_collection TEXT, p_user_ids INTEGER[])
+RETURNS void AS $$
+    INSERT INTO collection_versions (user_id, collection, version, updated_at)
+    SELECT u, p_collection, 1, clock_timestamp()
+    -- A user may appear many times; ON CONFLICT can't update the same row twice
+    FROM (SELECT DISTINCT u FROM unnest(p_user_ids) AS u) AS ids
+    WHERE u IS NOT NULL
+      AND EXISTS (SELECT 1 FROM users WHERE id = u)
+    ON CONFLICT (user_id, collection) DO UPDATE
+    SET version = collection_versions.version + 1, updated_at = EXCLUDED.updated_at
+$$ LANGUAGE sql;
+
+-- Statement-level, so a bulk import bumps each user's version once rather than per row
+CREATE OR REPLACE FUNCTION track_user_collection() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_collection_versions(TG_ARGV[0], ARRAY(SELECT user_id FROM new_rows));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_collection_versions(TG_ARGV[0], ARRAY(SELECT user_id FROM old_rows));
+    ELSE
+        PERFORM bump_collection_versions(
+            TG_ARGV[0],
+            ARRAY(SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows)
+        );
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- Stakeholders have no user_id of their own; they count against the owning client's user
+CREATE OR REPLACE FUNCTION track_stakeholder_collection() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_collection_versions('stakeholders', ARRAY(
+            SELECT c.user_id FROM clients c WHERE c.id IN (SELECT client_id FROM new_rows)));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_collection_versions('stakeholders', ARRAY(
+            SELECT c.user_id FROM clients c WHERE c.id IN (SELECT client_id FROM old_rows)));
+    ELSE
+        PERFORM bump_collection_versions('stakeholders', ARRAY(
+            SELECT c.user_id FROM clients c
+            WHERE c.id IN (SELECT client_id FROM new_rows UNION SELECT client_id FROM old_rows)));
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger, hence three triggers per table
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN SELECT * FROM (VALUES
+        ('clients', 'track_user_collection(''clients'')'),
+        ('location_profiles', 'track_user_collection(''locations'')'),
+        ('recordings', 'track_user_collection(''recordings'')'),
+        ('stakeholders', 'track_stakeholder_collection()')
+    ) AS v(tbl, fn)
+    LOOP
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION %s',
+            t.tbl || '_version_insert', t.tbl, t.fn);
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER UPDATE ON %I REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION %s',
+            t.tbl || '_version_update', t.tbl, t.fn);
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION %s',
+            t.tbl || '_version_delete', t.tbl, t.fn);
+    END LOOP;
+END
+$$;
@@ -0,0 +1,46 @@
+-- Shared login / registration throttling state for RATE_LIMIT_BACKEND=postgres (core/ratelimit.py).
+-- UNLOGGED: losing it in a crash only resets the limits, and it skips WAL on every attempt.
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+    key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated ON rate_limit_buckets (updated_at);
+
+-- Hits per fixed window; a sliding count weights the previous window by how much of it still overlaps
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_counters (
+    key TEXT NOT NULL,
+    bucket BIGINT NOT NULL,
+    hits INTEGER NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (key, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_updated ON rate_limit_counters (updated_at);
+
+-- Takes one token from p_key's bucket, refilled at p_rate per second up to p_burst.
+-- Returns 0 when allowed, otherwise the seconds until a token will be available.
+-- The row lock makes concurrent callers on any worker see each other's takes.
+CREATE OR REPLACE FUNCTION take_rate_limit_token(p_key TEXT, p_burst DOUBLE PRECISION, p_rate DOUBLE PRECISION)
+RETURNS DOUBLE PRECISION AS $$
+DECLARE
+    v_now TIMESTAMPTZ := clock_timestamp();
+    v_tokens DOUBLE PRECISION;
+BEGIN
+    INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (p_key, p_burst, v_now)
+    ON CONFLICT (key) DO NOTHING;
+
+    SELECT LEAST(p_burst, tokens + GREATEST(EXTRACT(EPOCH FROM v_now - updated_at), 0) * p_rate)
+    INTO v_tokens
+    FROM rate_limit_buckets WHERE key = p_key
+    FOR UPDATE;
+
+    IF v_tokens >= 1 THEN
+        UPDATE rate_limit_buckets SET tokens = v_tokens - 1, updated_at = v_now WHERE key = p_key;
+        RETURN 0;
+    END IF;
+    UPDATE rate_limit_buckets SET tokens = v_tokens, updated_at = v_now WHERE key = p_key;
+    RETURN (1 - v_tokens) / p_rate;
+END
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,22 @@
+-- Broadcast every collection version bump as NOTIFY collection_changes, payload
+-- "user_id:collection:version", so each API process can drop its cached copies
+-- (core/cache.py). Notifications are delivered on commit, and only if it commits.
+CREATE OR REPLACE FUNCTION bump_collection_versions(p_collection TEXT, p_user_ids INTEGER[])
+RETURNS void AS $$
+DECLARE
+    bumped RECORD;
+BEGIN
+    FOR bumped IN
+        INSERT INTO collection_versions (user_id, collection, version, updated_at)
+        SELECT u, p_collection, 1, clock_timestamp()
+        FROM (SELECT DISTINCT u FROM unnest(p_user_ids) AS u) AS ids
+        WHERE u IS NOT NULL
+          AND EXISTS (SELECT 1 FROM users WHERE id = u)
+        ON CONFLICT (user_id, collection) DO UPDATE
+        SET version = collection_versions.version + 1, updated_at = EXCLUDED.updated_at
+        RETURNING user_id, collection, version
+    LOOP
+        PERFORM pg_notify('collection_changes', bumped.user_id || ':' || bumped.collection || ':' || bumped.version);
+    END LOOP;
+END
+$$ LANGUAGE plpgsql;
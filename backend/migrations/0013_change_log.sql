@@ -0,0 +1,84 @@
+-- Delta sync (GET /api/sync, core/sync.py). One row per entity ever written, holding the
+-- id of the transaction that last changed it; a delete turns the row into a tombstone.
+-- Upserting in place is the compaction: however often an entity changes, it has one row.
+-- Transaction ids (xid8) rather than a sequence order the log, because a sequence value
+-- can commit after a larger one has already been read; see core/sync.py.
+CREATE TABLE IF NOT EXISTS change_log (
+    entity VARCHAR(32) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    txid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp(),
+    PRIMARY KEY (entity, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_user_position ON change_log (user_id, txid, entity, entity_id);
+CREATE INDEX IF NOT EXISTS idx_change_log_tombstones ON change_log (changed_at) WHERE deleted;
+
+-- Highest txid among purged tombstones; cursors at or below it must resync from scratch
+CREATE TABLE IF NOT EXISTS sync_horizon (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    purged_through XID8 NOT NULL
+);
+
+INSERT INTO sync_horizon (purged_through) VALUES ('0') ON CONFLICT DO NOTHING;
+
+-- Statement-level like the collection_versions triggers. Deletes only flip existing rows,
+-- which also covers stakeholders removed by a client's cascade: their client row (and so
+-- their user) is gone by the time the trigger runs, but the log row still knows the user.
+CREATE OR REPLACE FUNCTION log_entity_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE change_log
+        SET deleted = TRUE, txid = pg_current_xact_id(), changed_at = clock_timestamp()
+        WHERE entity = TG_ARGV[0] AND entity_id IN (SELECT id FROM old_rows);
+    ELSIF TG_ARGV[0] = 'stakeholders' THEN
+        INSERT INTO change_log (entity, entity_id, user_id)
+        SELECT 'stakeholders', s.id, c.user_id FROM new_rows s JOIN clients c ON c.id = s.client_id
+        ON CONFLICT (entity, entity_id) DO UPDATE
+        SET user_id = EXCLUDED.user_id, txid = EXCLUDED.txid, deleted = FALSE, changed_at = EXCLUDED.changed_at;
+    ELSE
+        INSERT INTO change_log (entity, entity_id, user_id)
+        SELECT TG_ARGV[0], id, user_id FROM new_rows
+        ON CONFLICT (entity, entity_id) DO UPDATE
+        SET user_id = EXCLUDED.user_id, txid = EXCLUDED.txid, deleted = FALSE, changed_at = EXCLUDED.changed_at;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN SELECT * FROM (VALUES
+        ('clients', 'clients'),
+        ('location_profiles', 'locations'),
+        ('recordings', 'recordings'),
+        ('stakeholders', 'stakeholders')
+    ) AS v(tbl, entity)
+    LOOP
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION log_entity_changes(%L)',
+            t.tbl || '_change_log_insert', t.tbl, t.entity);
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER UPDATE ON %I REFERENCING NEW TABLE AS new_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION log_entity_changes(%L)',
+            t.tbl || '_change_log_update', t.tbl, t.entity);
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows
+             FOR EACH STATEMENT EXECUTE FUNCTION log_entity_changes(%L)',
+            t.tbl || '_change_log_delete', t.tbl, t.entity);
+    END LOOP;
+END
+$$;
+
+-- Existing rows, so a first sync can start from an empty cursor
+INSERT INTO change_log (entity, entity_id, user_id)
+SELECT 'clients', id, user_id FROM clients
+UNION ALL SELECT 'locations', id, user_id FROM location_profiles
+UNION ALL SELECT 'recordings', id, user_id FROM recordings
+UNION ALL SELECT 'stakeholders', s.id, c.user_id FROM stakeholders s JOIN clients c ON c.id = s.client_id
+ON CONFLICT (entity, entity_id) DO NOTHING;
@@ -0,0 +1,12 @@
+-- Outcomes of POST /api/batch operations by the client's idempotency key (core/batch.py), so
+-- a retried flush gets the original answers back instead of applying its writes twice.
+-- fingerprint is a hash of the operation, to catch a key reused for a different one.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    key VARCHAR(255) NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status SMALLINT,
+    response TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, key)
+);
@@ -0,0 +1,12 @@
+-- Replayed breadcrumb uploads are deduplicated here rather than by each worker's memory
+-- (core/tracking.py), so a retry that lands on another worker isn't stored twice. A unique
+-- index on a partitioned table must include the partition key; a replay resends the same
+-- sample, so its recorded_at matches as well.
+DELETE FROM location_samples a
+USING location_samples b
+WHERE a.user_id = b.user_id AND a.device_id = b.device_id AND a.seq = b.seq
+  AND a.recorded_at = b.recorded_at
+  AND a.tableoid = b.tableoid AND a.ctid > b.ctid;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_location_samples_device_seq
+    ON location_samples (user_id, device_id, seq, recorded_at);
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
 
+from core import ratelimit
+from core.auth import current_user_id, get_user
 from core.database import get_pool
+from core.responses import JSONResponse
 from core.security import (
+    PasswordPoolBusy,
     create_access_token,
-    decode_access_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
 )
 
 router = APIRouter(prefix="/api/auth")
@@ -24,6 +27,10 @@ def _user_dict(row) -> dict:
     return d
 
 
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
 @router.post("/register")
 async def register(request: Request):
     body = await request.json()
@@ -37,6 +44,8 @@ async def register(request: Request):
             content={"error": "Name, email, and password are required"},
         )
 
+    await ratelimit.check_register(_client_ip(request))
+
     pool = get_pool()
     existing = await pool.fetchrow("SELECT id FROM users WHERE email = $1", email)
     if existing:
@@ -45,7 +54,7 @@ async def register(request: Request):
             content={"error": "An account with this email already exists"},
         )
 
-    hashed = hash_password(password)
+    hashed = await hash_password_async(password)
     row = await pool.fetchrow(
         "INSERT INTO users (name, email, password) VALUES ($1, $2, $3) RETURNING id, name, email, created_at",
         name,
@@ -70,52 +79,49 @@ async def login(request: Request):
             content={"error": "Email and password are required"},
         )
 
+    # Throttled before the lookup so a refused attempt costs no query or bcrypt work
+    throttle_key = email.strip().lower()
+    failures = await ratelimit.check_login(throttle_key, _client_ip(request))
+
     pool = get_pool()
     row = await pool.fetchrow("SELECT * FROM users WHERE email = $1", email)
     if not row:
+        await ratelimit.login_failed(throttle_key)
         return JSONResponse(
             status_code=401,
             content={"error": "Invalid email or password"},
         )
 
-    if not verify_password(password, row["password"]):
+    if not await verify_password_async(password, row["password"]):
+        await ratelimit.login_failed(throttle_key)
         return JSONResponse(
             status_code=401,
             content={"error": "Invalid email or password"},
         )
 
+    # Upgrade the stored hash when BCRYPT_ROUNDS has changed since it was created
+    rehashed = None
+    if needs_rehash(row["password"]):
+        try:
+            rehashed = await hash_password_async(password)
+        except PasswordPoolBusy:
+            rehashed = None
+
     updated = await pool.fetchrow(
-        "UPDATE users SET login_count = login_count + 1 WHERE id = $1 RETURNING id, name, email, created_at, login_count",
+        """UPDATE users SET login_count = login_count + 1, password = COALESCE($2, password)
+           WHERE id = $1 RETURNING id, name, email, created_at, login_count""",
         row["id"],
+        rehashed,
     )
+    await ratelimit.login_succeeded(throttle_key, failures)
     user = _user_dict(updated)
     token = create_access_token(user["id"], user["email"])
     return JSONResponse(status_code=200, content={"user": user, "token": token})
 
 
 @router.get("/me")
-async def me(request: Request):
-    auth_header = request.headers.get("authorization", "")
-    if not auth_header.startswith("Bearer "):
-        return JSONResponse(
-            status_code=401,
-            content={"error": "No token provided"},
-        )
-
-    token = auth_header.split(" ", 1)[1]
-    try:
-        decoded = decode_access_token(token)
-    except Exception:
-        return JSONResponse(
-            status_code=401,
-            content={"error": "Invalid or expired token"},
-        )
-
-    pool = get_pool()
-    row = await pool.fetchrow(
-        "SELECT id, name, email, created_at FROM users WHERE id = $1",
-        decoded["id"],
-    )
+async def me(user_id: int = Depends(current_user_id)):
+    row = await get_user(user_id)
     if not row:
         return JSONResponse(
             status_code=404,
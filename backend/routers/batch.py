@@ -0,0 +1,44 @@
+import orjson
+from fastapi import APIRouter, Depends, Request
+
+from core import batch, cache, geo
+from core.auth import current_user_id
+from core.database import get_pool
+from core.responses import RawJSONResponse
+from routers import clients, locations, recordings
+
+router = APIRouter(prefix="/api/batch")
+
+_ROUTES = [
+    batch.Route("POST", "/api/clients", clients.add_client),
+    batch.Route("PATCH", "/api/clients/{client_id}", clients.edit_client),
+    batch.Route("DELETE", "/api/clients/{client_id}", clients.remove_client),
+    batch.Route("POST", "/api/clients/{client_id}/stakeholders", clients.add_stakeholder),
+    batch.Route("DELETE", "/api/clients/{client_id}/stakeholders/{stakeholder_id}", clients.remove_stakeholder),
+    batch.Route("POST", "/api/locations", locations.add_profile),
+    batch.Route("DELETE", "/api/locations/{profile_id}", locations.remove_profile),
+    batch.Route("POST", "/api/recordings", recordings.add_recording),
+    batch.Route("DELETE", "/api/recordings/{recording_id}", recordings.remove_recording),
+]
+
+
+# {"operations": [{"method": "POST", "path": "/api/clients", "body": {...}, "idempotency_key": "..."}, ...]}
+# answers {"results": [{"status": 201, "body": {...}, "replayed": false}, ...]} in the same
+# order. "$<n>" as a path id or a *_id body field stands for the id operation n created.
+@router.post("")
+async def run_batch(request: Request, user_id: int = Depends(current_user_id)):
+    operations = batch.parse_operations(await request.json())
+    results = await batch.execute(get_pool(), user_id, _ROUTES, operations)
+
+    if any(result.status < 400 and not result.replayed for result in results):
+        # The handlers invalidated before the commit, so a concurrent read may have cached
+        # the old rows again; the NOTIFY would catch it, but not before this response
+        cache.invalidate(user_id, "clients", "stakeholders", "locations")
+        geo.invalidate(user_id)
+
+    parts = [
+        b'{"status":' + orjson.dumps(result.status) + b',"body":' + result.body
+        + b',"replayed":' + orjson.dumps(result.replayed) + b"}"
+        for result in results
+    ]
+    return RawJSONResponse(b'{"results":[' + b",".join(parts) + b"]}")
@@ -1,24 +1,20 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
-
-from core.database import get_pool
-from core.security import decode_access_token
+import orjson
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from core import bulk, cache, queries
+from core.auth import current_user_id
+from core.config import settings
+from core.database import get_pool, get_read_pool
+from core.etags import collection_state
+from core.jsonsql import JsonShape, Projection, fetch_json_page, json_array_sql
+from core.pagination import Page, encode_cursor, page_params
+from core.responses import JSONResponse, RawJSONResponse, list_response
+from routers.recordings import RECORDING_COLUMNS, RECORDING_JSON
 
 router = APIRouter(prefix="/api/clients")
 
 
-def _get_user_id(request: Request) -> int | None:
-    auth_header = request.headers.get("authorization", "")
-    if not auth_header.startswith("Bearer "):
-        return None
-    token = auth_header.split(" ", 1)[1]
-    try:
-        decoded = decode_access_token(token)
-        return decoded["id"]
-    except Exception:
-        return None
-
-
 def _client_dict(row) -> dict:
     return {
         "id": row["id"],
@@ -52,15 +48,38 @@ def _stakeholder_dict(row) -> dict:
     }
 
 
-# ── Clients ──────────────────────────────────────────────
+CLIENT_JSON = JsonShape(
+    "id", "user_id", "client_name", "client_code", "industry_sector", "company_size",
+    "headquarters_location", "primary_office_location", "website_domain",
+    "client_tier", "engagement_health", "is_active", "created_at", "updated_at",
+    timestamps=("created_at", "updated_at"),
+)
+
+STAKEHOLDER_JSON = JsonShape(
+    "id", "client_id", "contact_name", "designation_role", "email", "phone", "notes",
+    "created_at", "updated_at",
+    timestamps=("created_at", "updated_at"),
+)
+
+CLIENT_FIELDS = Projection(
+    CLIENT_JSON,
+    summary=(
+        "id", "client_name", "client_code", "industry_sector", "headquarters_location",
+        "client_tier", "engagement_health", "is_active", "created_at",
+    ),
+)
+
+STAKEHOLDER_FIELDS = Projection(
+    STAKEHOLDER_JSON,
+    summary=("id", "client_id", "contact_name", "designation_role", "created_at"),
+)
 
-@router.post("")
-async def create_client(request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
 
-    body = await request.json()
+# ── Clients ──────────────────────────────────────────────
+
+# Writes take the connection to run on, so POST /api/batch can run them inside its
+# transaction; the endpoints pass the pool
+async def add_client(conn, user_id: int, body: dict) -> JSONResponse:
     client_name = body.get("client_name")
     client_code = body.get("client_code")
 
@@ -70,23 +89,8 @@ async def create_client(request: Request):
             content={"error": "Client name and client code are required"},
         )
 
-    pool = get_pool()
-
-    existing = await pool.fetchrow(
-        "SELECT id FROM clients WHERE client_code = $1", client_code
-    )
-    if existing:
-        return JSONResponse(
-            status_code=409,
-            content={"error": f"Client code '{client_code}' already exists"},
-        )
-
-    row = await pool.fetchrow(
-        """INSERT INTO clients (
-            user_id, client_name, client_code, industry_sector, company_size,
-            headquarters_location, primary_office_location, website_domain, client_tier
-        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        RETURNING *""",
+    row = await conn.fetchrow(
+        queries.INSERT_CLIENT,
         user_id,
         client_name,
         client_code,
@@ -97,185 +101,537 @@ async def create_client(request: Request):
         body.get("website_domain"),
         body.get("client_tier", "Normal"),
     )
+    if not row:
+        return JSONResponse(
+            status_code=409,
+            content={"error": f"Client code '{client_code}' already exists"},
+        )
 
+    cache.invalidate(user_id, "clients")
     return JSONResponse(status_code=201, content={"client": _client_dict(row)})
 
 
+@router.post("")
+async def create_client(request: Request, user_id: int = Depends(current_user_id)):
+    return await add_client(get_pool(), user_id, await request.json())
+
+
 @router.get("")
-async def list_clients(request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+async def list_clients(
+    request: Request,
+    page: Page = Depends(page_params),
+    shape: JsonShape = Depends(CLIENT_FIELDS),
+    user_id: int = Depends(current_user_id),
+):
+    async def load(pool):
+        items, next_cursor = await fetch_json_page(
+            pool,
+            f"SELECT {shape.columns()} FROM clients WHERE user_id = $1",
+            [user_id],
+            shape,
+            page,
+        )
+        return list_response("clients", items, next_cursor)
 
-    pool = get_pool()
-    rows = await pool.fetch(
-        "SELECT * FROM clients WHERE user_id = $1 ORDER BY created_at DESC",
-        user_id,
+    return await cache.read_through(request, user_id, ("clients",), load)
+
+
+# ── Bulk import / export ─────────────────────────────────
+
+CLIENT_TIERS = ("Strategic", "Normal", "Low Touch")
+ENGAGEMENT_HEALTH = ("Good", "Neutral", "Risk")
+
+_IMPORT_CLIENT_COLUMNS = [
+    "line", "client_name", "client_code", "industry_sector", "company_size",
+    "headquarters_location", "primary_office_location", "website_domain",
+    "client_tier", "engagement_health", "is_active",
+]
+
+_IMPORT_STAKEHOLDER_COLUMNS = [
+    "line", "client_code", "contact_name", "designation_role", "email", "phone", "notes",
+]
+
+_EXPORT_CLIENT_COLUMNS = [
+    "id", "client_code", "client_name", "industry_sector", "company_size",
+    "headquarters_location", "primary_office_location", "website_domain",
+    "client_tier", "engagement_health", "is_active", "created_at", "updated_at",
+]
+
+_EXPORT_STAKEHOLDER_COLUMNS = [
+    "id", "client_code", "contact_name", "designation_role", "email", "phone", "notes",
+    "created_at", "updated_at",
+]
+
+STAKEHOLDER_EXPORT_JSON = JsonShape(*_EXPORT_STAKEHOLDER_COLUMNS, timestamps=("created_at", "updated_at"))
+
+
+def _import_client_row(line: int, record: dict) -> tuple:
+    return (
+        line,
+        bulk.text_field(record, "client_name", 255, required=True),
+        bulk.text_field(record, "client_code", 100, required=True),
+        bulk.text_field(record, "industry_sector", 255),
+        bulk.text_field(record, "company_size", 100),
+        bulk.text_field(record, "headquarters_location"),
+        bulk.text_field(record, "primary_office_location"),
+        bulk.text_field(record, "website_domain", 255),
+        bulk.choice_field(record, "client_tier", CLIENT_TIERS),
+        bulk.choice_field(record, "engagement_health", ENGAGEMENT_HEALTH),
+        bulk.bool_field(record, "is_active"),
+    )
+
+
+def _import_stakeholder_row(line: int, record: dict, client_code: str | None = None) -> tuple:
+    return (
+        line,
+        client_code or bulk.text_field(record, "client_code", 100, required=True),
+        bulk.text_field(record, "contact_name", 255, required=True),
+        bulk.text_field(record, "designation_role", 255),
+        bulk.text_field(record, "email", 255),
+        bulk.text_field(record, "phone", 50),
+        bulk.text_field(record, "notes"),
+    )
+
+
+# Staged rows are resolved against clients in one statement each; every staged line
+# ends up with a status so failures can be reported back by line number. With
+# on_conflict=update only the values a row actually carries are written: a column that
+# is missing from the file, or empty in that row, keeps what the client already has.
+_RESOLVE_CLIENTS = """
+    WITH firsts AS (
+        SELECT DISTINCT ON (client_code) * FROM import_clients ORDER BY client_code, line
+    ), updated AS (
+        UPDATE clients c SET
+            client_name = f.client_name,
+            industry_sector = COALESCE(f.industry_sector, c.industry_sector),
+            company_size = COALESCE(f.company_size, c.company_size),
+            headquarters_location = COALESCE(f.headquarters_location, c.headquarters_location),
+            primary_office_location = COALESCE(f.primary_office_location, c.primary_office_location),
+            website_domain = COALESCE(f.website_domain, c.website_domain),
+            client_tier = COALESCE(f.client_tier, c.client_tier),
+            engagement_health = COALESCE(f.engagement_health, c.engagement_health),
+            is_active = COALESCE(f.is_active, c.is_active),
+            updated_at = NOW()
+        FROM firsts f
+        WHERE $2 AND c.client_code = f.client_code AND c.user_id = $1
+        RETURNING c.client_code
+    ), inserted AS (
+        INSERT INTO clients (
+            user_id, client_name, client_code, industry_sector, company_size,
+            headquarters_location, primary_office_location, website_domain,
+            client_tier, engagement_health, is_active
+        )
+        SELECT $1, client_name, client_code, industry_sector, company_size,
+               headquarters_location, primary_office_location, website_domain,
+               COALESCE(client_tier, 'Normal'), COALESCE(engagement_health, 'Neutral'),
+               COALESCE(is_active, TRUE)
+        FROM firsts f
+        WHERE NOT EXISTS (SELECT 1 FROM clients c WHERE c.client_code = f.client_code)
+        ON CONFLICT (client_code) DO NOTHING
+        RETURNING client_code
+    )
+    SELECT s.line,
+           CASE
+               WHEN f.line IS NULL THEN 'duplicate'
+               WHEN u.client_code IS NOT NULL THEN 'updated'
+               WHEN i.client_code IS NOT NULL THEN 'created'
+               ELSE 'conflict'
+           END AS status
+    FROM import_clients s
+    LEFT JOIN firsts f ON f.line = s.line
+    LEFT JOIN updated u ON u.client_code = f.client_code
+    LEFT JOIN inserted i ON i.client_code = f.client_code
+"""
+
+_RESOLVE_STAKEHOLDERS = """
+    WITH resolved AS (
+        SELECT s.*, c.id AS client_id
+        FROM import_stakeholders s
+        LEFT JOIN clients c ON c.client_code = s.client_code AND c.user_id = $1
+    ), inserted AS (
+        INSERT INTO stakeholders (client_id, contact_name, designation_role, email, phone, notes)
+        SELECT client_id, contact_name, designation_role, email, phone, notes
+        FROM resolved WHERE client_id IS NOT NULL
+        RETURNING id
     )
+    SELECT line, CASE WHEN client_id IS NULL THEN 'unknown_client' ELSE 'created' END AS status
+    FROM resolved
+"""
+
+_STATUS_ERRORS = {
+    "duplicate": "client_code appears earlier in this file",
+    "conflict": "client_code already belongs to another client",
+    "unknown_client": "client_code does not match one of your clients",
+}
+
+
+@router.post("/import")
+async def import_clients(
+    request: Request,
+    type: str = "clients",
+    format: str | None = None,
+    on_conflict: str = "skip",
+    user_id: int = Depends(current_user_id),
+):
+    if type not in ("clients", "stakeholders"):
+        return JSONResponse(status_code=400, content={"error": "type must be 'clients' or 'stakeholders'"})
+    if on_conflict not in ("skip", "update"):
+        return JSONResponse(status_code=400, content={"error": "on_conflict must be 'skip' or 'update'"})
+    fmt = bulk.request_format(request, format)
+
+    errors: list[dict] = []
+    error_count = 0
+    rows_seen = 0
+
+    def reject(line: int, message: str):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": message})
 
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("""
+                CREATE TEMP TABLE import_clients (
+                    line INTEGER, client_name TEXT, client_code TEXT, industry_sector TEXT,
+                    company_size TEXT, headquarters_location TEXT, primary_office_location TEXT,
+                    website_domain TEXT, client_tier TEXT, engagement_health TEXT, is_active BOOLEAN
+                ) ON COMMIT DROP;
+                CREATE TEMP TABLE import_stakeholders (
+                    line INTEGER, client_code TEXT, contact_name TEXT, designation_role TEXT,
+                    email TEXT, phone TEXT, notes TEXT
+                ) ON COMMIT DROP;
+            """)
+
+            client_rows: list[tuple] = []
+            stakeholder_rows: list[tuple] = []
+
+            async def flush_staged():
+                if client_rows:
+                    await conn.copy_records_to_table(
+                        "import_clients", records=client_rows, columns=_IMPORT_CLIENT_COLUMNS,
+                    )
+                    client_rows.clear()
+                if stakeholder_rows:
+                    await conn.copy_records_to_table(
+                        "import_stakeholders", records=stakeholder_rows, columns=_IMPORT_STAKEHOLDER_COLUMNS,
+                    )
+                    stakeholder_rows.clear()
+
+            async for line, record, parse_error in bulk.iter_records(request, fmt):
+                rows_seen += 1
+                if rows_seen > settings.IMPORT_MAX_ROWS:
+                    return JSONResponse(
+                        status_code=413,
+                        content={"error": f"Imports are limited to {settings.IMPORT_MAX_ROWS} rows"},
+                    )
+                if parse_error:
+                    reject(line, parse_error)
+                    continue
+                try:
+                    if type == "stakeholders":
+                        stakeholder_rows.append(_import_stakeholder_row(line, record))
+                        continue
+                    client = _import_client_row(line, record)
+                    # NDJSON clients may carry their contacts inline
+                    nested = record.get("stakeholders") or []
+                    if not isinstance(nested, list) or not all(isinstance(s, dict) for s in nested):
+                        raise bulk.RowError("stakeholders must be a list of objects")
+                    contacts = [_import_stakeholder_row(line, s, client[2]) for s in nested]
+                except bulk.RowError as exc:
+                    reject(line, str(exc))
+                    continue
+                client_rows.append(client)
+                stakeholder_rows.extend(contacts)
+                if len(client_rows) + len(stakeholder_rows) >= settings.IMPORT_BATCH_ROWS:
+                    await flush_staged()
+            await flush_staged()
+
+            counts = {"created": 0, "updated": 0, "skipped": 0}
+            statuses = await conn.fetch(_RESOLVE_CLIENTS, user_id, on_conflict == "update")
+            # Nested contacts are only imported for clients created or updated by this file
+            rejected_lines = [r["line"] for r in statuses if r["status"] in ("duplicate", "conflict")]
+            if rejected_lines:
+                await conn.execute("DELETE FROM import_stakeholders WHERE line = ANY($1::int[])", rejected_lines)
+            stakeholder_statuses = await conn.fetch(_RESOLVE_STAKEHOLDERS, user_id)
+
+    for r in statuses:
+        if r["status"] in ("created", "updated"):
+            counts[r["status"]] += 1
+        elif r["status"] == "conflict" and on_conflict == "skip":
+            counts["skipped"] += 1
+            reject(r["line"], "client_code already exists")
+        else:
+            reject(r["line"], _STATUS_ERRORS[r["status"]])
+    stakeholders_created = 0
+    for r in stakeholder_statuses:
+        if r["status"] == "created":
+            stakeholders_created += 1
+        else:
+            reject(r["line"], _STATUS_ERRORS[r["status"]])
+
+    if counts["created"] or counts["updated"] or stakeholders_created:
+        cache.invalidate(user_id, "clients", "stakeholders")
+    errors.sort(key=lambda e: e["line"])
     return JSONResponse(
         status_code=200,
-        content={"clients": [_client_dict(r) for r in rows]},
+        content={
+            "clients": counts,
+            "stakeholders": {"created": stakeholders_created},
+            "error_count": error_count,
+            "errors": errors,
+        },
     )
 
 
-@router.get("/{client_id}")
-async def get_client(client_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+@router.get("/export")
+async def export_clients(
+    type: str = "clients",
+    format: str = "ndjson",
+    user_id: int = Depends(current_user_id),
+):
+    if type not in ("clients", "stakeholders"):
+        return JSONResponse(status_code=400, content={"error": "type must be 'clients' or 'stakeholders'"})
+    if format not in ("csv", "ndjson"):
+        return JSONResponse(status_code=400, content={"error": "format must be 'csv' or 'ndjson'"})
+
+    if type == "clients":
+        source = "FROM clients WHERE user_id = $1 ORDER BY id"
+        shape, columns = CLIENT_JSON, _EXPORT_CLIENT_COLUMNS
+    else:
+        # client_code instead of client_id so an export can be fed straight back into import
+        source = """FROM (
+                        SELECT s.*, c.client_code FROM stakeholders s
+                        JOIN clients c ON c.id = s.client_id
+                        WHERE c.user_id = $1
+                    ) AS s ORDER BY id"""
+        shape = STAKEHOLDER_EXPORT_JSON
+        columns = _EXPORT_STAKEHOLDER_COLUMNS
+
+    pool = get_read_pool(user_id)
+    if format == "ndjson":
+        body = bulk.stream_ndjson(
+            pool, f"SELECT {shape.object_sql()} {source}", [user_id], settings.EXPORT_BATCH_ROWS,
+        )
+    else:
+        body = bulk.stream_csv(
+            pool, f"SELECT {', '.join(columns)} {source}", [user_id], columns, settings.EXPORT_BATCH_ROWS,
+        )
 
-    pool = get_pool()
-    row = await pool.fetchrow(
-        "SELECT * FROM clients WHERE id = $1 AND user_id = $2",
-        client_id, user_id,
+    return StreamingResponse(
+        body,
+        media_type=bulk.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{type}.{format}"'},
     )
+
+
+@router.get("/{client_id}")
+async def get_client(client_id: int, request: Request, user_id: int = Depends(current_user_id)):
+    async def load(pool):
+        row = await pool.fetchrow(
+            "SELECT * FROM clients WHERE id = $1 AND user_id = $2",
+            client_id, user_id,
+        )
+        if not row:
+            return JSONResponse(status_code=404, content={"error": "Client not found"})
+        return JSONResponse(status_code=200, content={"client": _client_dict(row)})
+
+    return await cache.read_through(request, user_id, ("clients",), load)
+
+
+async def edit_client(conn, user_id: int, client_id: int, body: dict) -> JSONResponse:
+    args = queries.update_client_args(client_id, user_id, body)
+    if args is None:
+        return JSONResponse(status_code=400, content={"error": "No fields to update"})
+
+    row = await conn.fetchrow(queries.UPDATE_CLIENT, *args)
     if not row:
         return JSONResponse(status_code=404, content={"error": "Client not found"})
 
+    cache.invalidate(user_id, "clients")
     return JSONResponse(status_code=200, content={"client": _client_dict(row)})
 
 
 @router.patch("/{client_id}")
-async def update_client(client_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+async def update_client(client_id: int, request: Request, user_id: int = Depends(current_user_id)):
+    return await edit_client(get_pool(), user_id, client_id, await request.json())
 
-    body = await request.json()
-    pool = get_pool()
 
-    existing = await pool.fetchrow(
-        "SELECT * FROM clients WHERE id = $1 AND user_id = $2",
+async def remove_client(conn, user_id: int, client_id: int) -> JSONResponse:
+    row = await conn.fetchrow(
+        "DELETE FROM clients WHERE id = $1 AND user_id = $2 RETURNING id",
         client_id, user_id,
     )
-    if not existing:
+    if not row:
         return JSONResponse(status_code=404, content={"error": "Client not found"})
 
-    updatable = [
-        "client_name", "industry_sector", "company_size",
-        "headquarters_location", "primary_office_location",
-        "website_domain", "client_tier", "engagement_health", "is_active",
-    ]
-    sets = []
-    vals = []
-    idx = 1
-    for field in updatable:
-        if field in body:
-            sets.append(f"{field} = ${idx}")
-            vals.append(body[field])
-            idx += 1
-
-    if not sets:
-        return JSONResponse(status_code=400, content={"error": "No fields to update"})
+    # Cached stakeholder pages depend on "clients" too, so the cascade is covered
+    cache.invalidate(user_id, "clients")
+    return JSONResponse(status_code=200, content={"deleted": True})
 
-    sets.append(f"updated_at = NOW()")
-    vals.append(client_id)
-    vals.append(user_id)
 
-    query = f"UPDATE clients SET {', '.join(sets)} WHERE id = ${idx} AND user_id = ${idx + 1} RETURNING *"
-    row = await pool.fetchrow(query, *vals)
+@router.delete("/{client_id}")
+async def delete_client(client_id: int, user_id: int = Depends(current_user_id)):
+    return await remove_client(get_pool(), user_id, client_id)
 
-    return JSONResponse(status_code=200, content={"client": _client_dict(row)})
 
+# ── Overview ─────────────────────────────────────────────
 
-@router.delete("/{client_id}")
-async def delete_client(client_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+OVERVIEW_SECTIONS = ("stakeholders", "recordings", "summary")
 
-    pool = get_pool()
+
+@router.get("/{client_id}/overview")
+async def get_client_overview(
+    client_id: int,
+    request: Request,
+    include: str | None = None,
+    user_id: int = Depends(current_user_id),
+):
+    sections = OVERVIEW_SECTIONS if include is None else tuple(
+        s.strip() for s in include.split(",") if s.strip()
+    )
+    unknown = [s for s in sections if s not in OVERVIEW_SECTIONS]
+    if unknown:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Unknown include section(s): {', '.join(unknown)}"},
+        )
+
+    # Everything the detail screen needs comes from one statement keyed on the owned client
+    columns = [f"{CLIENT_JSON.object_sql('c')} AS client"]
+    joins = []
+    args = [client_id, user_id]
+    if "stakeholders" in sections:
+        args.append(settings.OVERVIEW_STAKEHOLDERS)
+        source = "SELECT * FROM stakeholders WHERE client_id = c.id"
+        joins.append(f"CROSS JOIN LATERAL {json_array_sql(source, STAKEHOLDER_JSON, len(args), descending=False)} st")
+        columns += [
+            "st.items AS stakeholders", "st.fetched AS stakeholders_fetched",
+            "st.last_created_at AS stakeholders_last_created_at", "st.last_id AS stakeholders_last_id",
+        ]
+    if "recordings" in sections:
+        args.append(settings.OVERVIEW_RECORDINGS)
+        source = f"SELECT {RECORDING_COLUMNS} FROM recordings WHERE client_id = c.id AND user_id = c.user_id"
+        joins.append(f"CROSS JOIN LATERAL {json_array_sql(source, RECORDING_JSON, len(args))} rec")
+        columns += ["rec.items AS recordings", "rec.fetched AS recordings_fetched"]
+    if "summary" in sections:
+        columns += [
+            "(SELECT count(*) FROM stakeholders WHERE client_id = c.id) AS stakeholder_count",
+            "rs.recording_count", "rs.recorded_seconds", "rs.last_recording_at",
+        ]
+        joins.append(
+            """CROSS JOIN LATERAL (
+                   SELECT count(*) AS recording_count,
+                          COALESCE(sum(duration_seconds), 0) AS recorded_seconds,
+                          max(created_at) AS last_recording_at
+                   FROM recordings WHERE client_id = c.id AND user_id = c.user_id
+               ) rs"""
+        )
+
+    pool = get_read_pool(user_id)
+    state = await collection_state(pool, request, user_id, "clients", "stakeholders", "recordings")
+    if state.matches():
+        return state.not_modified()
     row = await pool.fetchrow(
-        "DELETE FROM clients WHERE id = $1 AND user_id = $2 RETURNING id",
-        client_id, user_id,
+        f"""SELECT {", ".join(columns)}
+            FROM clients c
+            {" ".join(joins)}
+            WHERE c.id = $1 AND c.user_id = $2""",
+        *args,
     )
     if not row:
         return JSONResponse(status_code=404, content={"error": "Client not found"})
 
-    return JSONResponse(status_code=200, content={"deleted": True})
+    # The lists arrive as JSON text from Postgres; only the small extras go through orjson
+    parts = [b'{"client":' + row["client"].encode("utf-8")]
+    if "stakeholders" in sections:
+        next_cursor = None
+        if row["stakeholders_fetched"] > settings.OVERVIEW_STAKEHOLDERS:
+            next_cursor = encode_cursor(row["stakeholders_last_created_at"], row["stakeholders_last_id"])
+        parts.append(b'"stakeholders":' + row["stakeholders"].encode("utf-8"))
+        parts.append(b'"stakeholders_next_cursor":' + orjson.dumps(next_cursor))
+    if "recordings" in sections:
+        parts.append(b'"recordings":' + row["recordings"].encode("utf-8"))
+        parts.append(b'"more_recordings":' + orjson.dumps(row["recordings_fetched"] > settings.OVERVIEW_RECORDINGS))
+    if "summary" in sections:
+        summary = {
+            "stakeholder_count": row["stakeholder_count"],
+            "recording_count": row["recording_count"],
+            "recorded_seconds": row["recorded_seconds"],
+            "last_recording_at": row["last_recording_at"].isoformat() if row["last_recording_at"] else None,
+        }
+        parts.append(b'"summary":' + orjson.dumps(summary))
+
+    return state.apply(RawJSONResponse(b",".join(parts) + b"}"))
 
 
 # ── Stakeholders ─────────────────────────────────────────
 
-@router.post("/{client_id}/stakeholders")
-async def create_stakeholder(client_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
-
-    pool = get_pool()
-    client = await pool.fetchrow(
-        "SELECT id FROM clients WHERE id = $1 AND user_id = $2",
-        client_id, user_id,
-    )
-    if not client:
-        return JSONResponse(status_code=404, content={"error": "Client not found"})
-
-    body = await request.json()
+async def add_stakeholder(conn, user_id: int, client_id: int, body: dict) -> JSONResponse:
     contact_name = body.get("contact_name")
     if not contact_name:
         return JSONResponse(status_code=400, content={"error": "Contact name is required"})
 
-    row = await pool.fetchrow(
-        """INSERT INTO stakeholders (client_id, contact_name, designation_role, email, phone, notes)
-           VALUES ($1, $2, $3, $4, $5, $6)
-           RETURNING *""",
+    row = await conn.fetchrow(
+        queries.INSERT_STAKEHOLDER,
         client_id,
+        user_id,
         contact_name,
         body.get("designation_role"),
         body.get("email"),
         body.get("phone"),
         body.get("notes"),
     )
+    if not row:
+        return JSONResponse(status_code=404, content={"error": "Client not found"})
 
+    cache.invalidate(user_id, "stakeholders")
     return JSONResponse(status_code=201, content={"stakeholder": _stakeholder_dict(row)})
 
 
-@router.get("/{client_id}/stakeholders")
-async def list_stakeholders(client_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
-
-    pool = get_pool()
-    client = await pool.fetchrow(
-        "SELECT id FROM clients WHERE id = $1 AND user_id = $2",
-        client_id, user_id,
-    )
-    if not client:
-        return JSONResponse(status_code=404, content={"error": "Client not found"})
+@router.post("/{client_id}/stakeholders")
+async def create_stakeholder(client_id: int, request: Request, user_id: int = Depends(current_user_id)):
+    return await add_stakeholder(get_pool(), user_id, client_id, await request.json())
 
-    rows = await pool.fetch(
-        "SELECT * FROM stakeholders WHERE client_id = $1 ORDER BY created_at ASC",
-        client_id,
-    )
 
-    return JSONResponse(
-        status_code=200,
-        content={"stakeholders": [_stakeholder_dict(r) for r in rows]},
-    )
+@router.get("/{client_id}/stakeholders")
+async def list_stakeholders(
+    client_id: int,
+    request: Request,
+    page: Page = Depends(page_params),
+    shape: JsonShape = Depends(STAKEHOLDER_FIELDS),
+    user_id: int = Depends(current_user_id),
+):
+    async def load(pool):
+        items, next_cursor = await fetch_json_page(
+            pool,
+            f"SELECT {shape.columns()} FROM stakeholders WHERE client_id = $1",
+            [client_id, user_id],
+            shape,
+            page,
+            descending=False,
+            guard=queries.OWNS_CLIENT,
+        )
+        if items is None:
+            return JSONResponse(status_code=404, content={"error": "Client not found"})
+        return list_response("stakeholders", items, next_cursor)
 
+    # Deleting a client cascades to its stakeholders without a stakeholders bump
+    return await cache.read_through(request, user_id, ("clients", "stakeholders"), load)
 
-@router.delete("/{client_id}/stakeholders/{stakeholder_id}")
-async def delete_stakeholder(client_id: int, stakeholder_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
 
-    pool = get_pool()
-    client = await pool.fetchrow(
-        "SELECT id FROM clients WHERE id = $1 AND user_id = $2",
-        client_id, user_id,
-    )
-    if not client:
+async def remove_stakeholder(conn, user_id: int, client_id: int, stakeholder_id: int) -> JSONResponse:
+    row = await conn.fetchrow(queries.DELETE_STAKEHOLDER, stakeholder_id, client_id, user_id)
+    if not row["client_found"]:
         return JSONResponse(status_code=404, content={"error": "Client not found"})
-
-    row = await pool.fetchrow(
-        "DELETE FROM stakeholders WHERE id = $1 AND client_id = $2 RETURNING id",
-        stakeholder_id, client_id,
-    )
-    if not row:
+    if not row["deleted"]:
         return JSONResponse(status_code=404, content={"error": "Stakeholder not found"})
 
+    cache.invalidate(user_id, "stakeholders")
     return JSONResponse(status_code=200, content={"deleted": True})
+
+
+@router.delete("/{client_id}/stakeholders/{stakeholder_id}")
+async def delete_stakeholder(client_id: int, stakeholder_id: int, user_id: int = Depends(current_user_id)):
+    return await remove_stakeholder(get_pool(), user_id, client_id, stakeholder_id)
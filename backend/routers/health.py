@@ -1,8 +1,52 @@
+import asyncio
+
+import asyncpg
 from fastapi import APIRouter
+from starlette.responses import Response
+
+from core import metrics, tracking
+from core.config import settings
+from core.database import get_pool, pool_stats
+from core.responses import JSONResponse
+from core.security import password_pool_stats
 
 router = APIRouter()
 
+password_pool = metrics.Gauge("password_pool", "Password hashing executor state", ("stat",))
+track_buffer = metrics.Gauge("track_buffer_rows", "Location samples waiting to be written", ("state",))
+
+
+@metrics.collector
+def _service_gauges():
+    stats = password_pool_stats()
+    for key in ("workers", "pending", "queued", "max_pending", "completed", "rejected", "failed", "busy_seconds"):
+        password_pool.set(stats[key], key)
+    stats = tracking.buffer.stats()
+    for key in ("buffered", "inflight", "capacity"):
+        track_buffer.set(stats[key], key)
+
 
+# Liveness: the process is up and serving; says nothing about its dependencies
 @router.get("/api/health")
 async def health():
     return {"status": "ok"}
+
+
+# Readiness: a pooled connection can be taken and answers within READY_TIMEOUT
+@router.get("/api/ready")
+async def ready():
+    try:
+        async with asyncio.timeout(settings.READY_TIMEOUT):
+            async with get_pool().acquire() as conn:
+                await conn.fetchval("SELECT 1")
+    except (TimeoutError, OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "error": type(exc).__name__, "db_pool": pool_stats()},
+        )
+    return {"status": "ready", "db_pool": pool_stats()}
+
+
+@router.get("/api/metrics")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
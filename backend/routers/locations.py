@@ -1,22 +1,18 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from datetime import datetime, timedelta, timezone
 
+from fastapi import APIRouter, Depends, Request
+
+from core import cache, geo, notify, queries, tracking
+from core.auth import current_user_id
+from core.config import settings
 from core.database import get_pool
-from core.security import decode_access_token
+from core.jsonsql import JsonShape, Projection, fetch_json_page
+from core.pagination import Page, page_params
+from core.responses import JSONResponse, list_response
 
 router = APIRouter(prefix="/api/locations")
 
-
-def _get_user_id(request: Request) -> int | None:
-    auth_header = request.headers.get("authorization", "")
-    if not auth_header.startswith("Bearer "):
-        return None
-    token = auth_header.split(" ", 1)[1]
-    try:
-        decoded = decode_access_token(token)
-        return decoded["id"]
-    except Exception:
-        return None
+_COLUMNS = "id, user_id, name, type, address, latitude, longitude, use_current_location, created_at"
 
 
 def _profile_dict(row) -> dict:
@@ -33,13 +29,20 @@ def _profile_dict(row) -> dict:
     }
 
 
-@router.post("")
-async def create_profile(request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+PROFILE_JSON = JsonShape(
+    "id", "user_id", "name", "type", "address", "latitude", "longitude",
+    "use_current_location", "created_at",
+    timestamps=("created_at",),
+    floats=("latitude", "longitude"),
+)
 
-    body = await request.json()
+PROFILE_FIELDS = Projection(
+    PROFILE_JSON,
+    summary=("id", "name", "type", "latitude", "longitude", "created_at"),
+)
+
+
+async def add_profile(conn, user_id: int, body: dict) -> JSONResponse:
     name = body.get("name")
     profile_type = body.get("type")
     address = body.get("address")
@@ -65,56 +68,200 @@ async def create_profile(request: Request):
             content={"error": "Address is required when not using current location"},
         )
 
-    # Only one base location per user
-    if profile_type == "base":
-        pool = get_pool()
-        existing = await pool.fetchrow(
-            "SELECT id FROM location_profiles WHERE user_id = $1 AND type = 'base'",
-            user_id,
-        )
-        if existing:
-            return JSONResponse(
-                status_code=409,
-                content={"error": "A base location already exists. Delete it first to create a new one."},
-            )
-
-    pool = get_pool()
-    row = await pool.fetchrow(
-        """INSERT INTO location_profiles (user_id, name, type, address, latitude, longitude, use_current_location)
-           VALUES ($1, $2, $3, $4, $5, $6, $7)
-           RETURNING *""",
+    row = await conn.fetchrow(
+        queries.INSERT_PROFILE.format(columns=_COLUMNS),
         user_id, name, profile_type, address, latitude, longitude, use_current_location,
     )
+    # Only one base location per user
+    if not row:
+        return JSONResponse(
+            status_code=409,
+            content={"error": "A base location already exists. Delete it first to create a new one."},
+        )
 
+    geo.invalidate(user_id)
+    cache.invalidate(user_id, "locations")
     return JSONResponse(status_code=201, content={"profile": _profile_dict(row)})
 
 
+@router.post("")
+async def create_profile(request: Request, user_id: int = Depends(current_user_id)):
+    return await add_profile(get_pool(), user_id, await request.json())
+
+
 @router.get("")
-async def list_profiles(request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+async def list_profiles(
+    request: Request,
+    page: Page = Depends(page_params),
+    shape: JsonShape = Depends(PROFILE_FIELDS),
+    user_id: int = Depends(current_user_id),
+):
+    async def load(pool):
+        items, next_cursor = await fetch_json_page(
+            pool,
+            f"SELECT {shape.columns()} FROM location_profiles WHERE user_id = $1",
+            [user_id],
+            shape,
+            page,
+        )
+        return list_response("profiles", items, next_cursor)
+
+    return await cache.read_through(request, user_id, ("locations",), load)
+
+
+# Profiles written by other processes reach the spatial cache the same way
+def _on_change(payload: str):
+    user_id, collection, _ = cache.parse_change(payload)
+    if collection == "locations":
+        geo.invalidate(user_id)
 
+
+notify.subscribe(cache.CHANGES_CHANNEL, _on_change)
+notify.on_state_change(lambda connected: geo.invalidate_all())
+
+
+async def _profiles_within(user_id: int, lat: float, lng: float, radius_m: float) -> list[tuple[float, dict]]:
+    hit, index = geo.cached_index(user_id)
     pool = get_pool()
-    rows = await pool.fetch(
-        "SELECT * FROM location_profiles WHERE user_id = $1 ORDER BY created_at DESC",
-        user_id,
-    )
+    if not hit:
+        ticket = geo.reserve(user_id)
+        rows = await pool.fetch(
+            f"""SELECT {_COLUMNS} FROM location_profiles
+                WHERE user_id = $1 AND geo_cell IS NOT NULL
+                LIMIT $2""",
+            user_id, settings.GEO_CACHE_MAX_PROFILES + 1,
+        )
+        index = geo.cache_index(ticket, user_id, [_profile_dict(r) for r in rows])
+    if index is not None:
+        return index.within(lat, lng, radius_m)
+
+    # Too many profiles to cache: narrow by grid cell in Postgres, then measure exactly
+    cells = geo.cells_within(lat, lng, radius_m)
+    if cells is None:
+        rows = await pool.fetch(
+            f"SELECT {_COLUMNS} FROM location_profiles WHERE user_id = $1 AND geo_cell IS NOT NULL",
+            user_id,
+        )
+    else:
+        rows = await pool.fetch(
+            f"SELECT {_COLUMNS} FROM location_profiles WHERE user_id = $1 AND geo_cell = ANY($2::bigint[])",
+            user_id, cells,
+        )
+    return geo.nearest([_profile_dict(r) for r in rows], lat, lng, radius_m)
+
+
+def _check_point(lat: float, lng: float) -> JSONResponse | None:
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return JSONResponse(status_code=400, content={"error": "Latitude or longitude out of range"})
+    return None
+
+
+@router.get("/nearby")
+async def nearby_profiles(
+    lat: float,
+    lng: float,
+    radius: float = 1000,
+    limit: int = 20,
+    user_id: int = Depends(current_user_id),
+):
+    invalid = _check_point(lat, lng)
+    if invalid:
+        return invalid
+    if radius <= 0 or radius > settings.NEARBY_MAX_RADIUS_M:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Radius must be between 0 and {settings.NEARBY_MAX_RADIUS_M} meters"},
+        )
+
+    hits = await _profiles_within(user_id, lat, lng, radius)
+    profiles = [{**p, "distance_m": round(d, 1)} for d, p in hits[: max(limit, 1)]]
+    return JSONResponse(status_code=200, content={"profiles": profiles})
 
+
+@router.get("/geofence")
+async def match_geofence(lat: float, lng: float, user_id: int = Depends(current_user_id)):
+    invalid = _check_point(lat, lng)
+    if invalid:
+        return invalid
+
+    hits = await _profiles_within(user_id, lat, lng, settings.GEOFENCE_RADIUS_M)
+    inside = [{**p, "distance_m": round(d, 1)} for d, p in hits]
     return JSONResponse(
         status_code=200,
-        content={"profiles": [_profile_dict(r) for r in rows]},
+        content={
+            "match": inside[0] if inside else None,
+            "inside": inside,
+            "radius_m": settings.GEOFENCE_RADIUS_M,
+        },
     )
 
 
-@router.delete("/{profile_id}")
-async def delete_profile(profile_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+def _parse_sample(raw, now: datetime) -> dict | None:
+    if not isinstance(raw, dict):
+        return None
+    try:
+        seq = int(raw["seq"])
+        latitude = float(raw["latitude"])
+        longitude = float(raw["longitude"])
+        # expo-location reports epoch milliseconds; ISO-8601 strings are accepted too
+        recorded = raw["recorded_at"]
+        if isinstance(recorded, (int, float)):
+            recorded_at = datetime.fromtimestamp(recorded / 1000, tz=timezone.utc)
+        else:
+            recorded_at = datetime.fromisoformat(recorded)
+            if recorded_at.tzinfo is None:
+                recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+        optional = {
+            key: None if raw.get(key) is None else float(raw[key])
+            for key in ("accuracy_m", "speed_mps", "heading")
+        }
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        return None
 
-    pool = get_pool()
-    row = await pool.fetchrow(
+    if seq < 0 or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        return None
+    oldest = now - timedelta(days=settings.TRACK_RETENTION_DAYS)
+    if not oldest <= recorded_at <= now + timedelta(days=1):
+        return None
+    return {
+        "seq": seq,
+        "recorded_at": recorded_at.astimezone(timezone.utc).replace(tzinfo=None),
+        "latitude": latitude,
+        "longitude": longitude,
+        **optional,
+    }
+
+
+@router.post("/track")
+async def upload_track(request: Request, user_id: int = Depends(current_user_id)):
+    body = await request.json()
+    device_id = body.get("device_id")
+    samples = body.get("samples")
+
+    if not isinstance(device_id, str) or not 0 < len(device_id) <= 64:
+        return JSONResponse(status_code=400, content={"error": "A device_id of up to 64 characters is required"})
+    if not isinstance(samples, list) or not samples:
+        return JSONResponse(status_code=400, content={"error": "At least one sample is required"})
+    if len(samples) > settings.TRACK_MAX_SAMPLES_PER_REQUEST:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"At most {settings.TRACK_MAX_SAMPLES_PER_REQUEST} samples per upload"},
+        )
+
+    now = datetime.now(timezone.utc)
+    parsed = []
+    for i, raw in enumerate(samples):
+        sample = _parse_sample(raw, now)
+        if sample is None:
+            return JSONResponse(status_code=400, content={"error": f"Invalid sample at index {i}"})
+        parsed.append(sample)
+
+    result = await tracking.buffer.submit(user_id, device_id, parsed)
+    return JSONResponse(status_code=200, content=result)
+
+
+async def remove_profile(conn, user_id: int, profile_id: int) -> JSONResponse:
+    row = await conn.fetchrow(
         "DELETE FROM location_profiles WHERE id = $1 AND user_id = $2 RETURNING id",
         profile_id, user_id,
     )
@@ -122,4 +269,11 @@ async def delete_profile(profile_id: int, request: Request):
     if not row:
         return JSONResponse(status_code=404, content={"error": "Profile not found"})
 
+    geo.invalidate(user_id)
+    cache.invalidate(user_id, "locations")
     return JSONResponse(status_code=200, content={"deleted": True})
+
+
+@router.delete("/{profile_id}")
+async def delete_profile(profile_id: int, user_id: int = Depends(current_user_id)):
+    return await remove_profile(get_pool(), user_id, profile_id)
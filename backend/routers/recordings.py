@@ -1,101 +1,386 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+import uuid
 
-from core.database import get_pool
-from core.security import decode_access_token
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import FileResponse
+
+from core import audio, batch, jobs
+from core.auth import current_user_id
+from core.config import settings
+from core.database import get_pool, get_read_pool
+from core.etags import collection_state
+from core.jsonsql import JsonShape, Projection, fetch_json_page
+from core.pagination import Page, decode_rank_cursor, encode_rank_cursor, page_params
+from core.responses import JSONResponse, list_response
 
 router = APIRouter(prefix="/api/recordings")
 
+# Explicit column list so the generated transcript_tsv column never leaves Postgres
+RECORDING_COLUMNS = (
+    "id, user_id, client_id, transcript, transcription_status, duration_seconds, "
+    "audio_content_type, audio_size_bytes, created_at"
+)
 
-def _get_user_id(request: Request) -> int | None:
-    auth_header = request.headers.get("authorization", "")
-    if not auth_header.startswith("Bearer "):
-        return None
-    token = auth_header.split(" ", 1)[1]
-    try:
-        decoded = decode_access_token(token)
-        return decoded["id"]
-    except Exception:
-        return None
+_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=10, MaxFragments=2"
 
 
 def _recording_dict(row) -> dict:
     return {
         "id": row["id"],
         "user_id": row["user_id"],
+        "client_id": row["client_id"],
         "transcript": row["transcript"],
+        "transcription_status": row["transcription_status"],
         "duration_seconds": row["duration_seconds"],
+        "audio_content_type": row["audio_content_type"],
+        "audio_size_bytes": row["audio_size_bytes"],
         "created_at": row["created_at"].isoformat(),
     }
 
 
-@router.post("")
-async def create_recording(request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+def _upload_dict(row) -> dict:
+    return {
+        "id": str(row["id"]),
+        "recording_id": row["recording_id"],
+        "size_bytes": row["size_bytes"],
+        "received_bytes": row["received_bytes"],
+        "content_type": row["content_type"],
+        "created_at": row["created_at"].isoformat(),
+    }
 
-    body = await request.json()
+
+RECORDING_JSON = JsonShape(
+    "id", "user_id", "client_id", "transcript", "transcription_status", "duration_seconds",
+    "audio_content_type", "audio_size_bytes", "created_at",
+    timestamps=("created_at",),
+)
+
+# The summary view leaves out the transcript, so list queries never detoast it
+RECORDING_FIELDS = Projection(
+    RECORDING_JSON,
+    summary=("id", "client_id", "transcription_status", "duration_seconds", "audio_size_bytes", "created_at"),
+)
+
+
+# Runs inside the caller's transaction, which the job enqueue shares
+async def add_recording(conn, user_id: int, body: dict) -> JSONResponse:
     transcript = body.get("transcript")
     duration_seconds = body.get("duration_seconds")
+    client_id = body.get("client_id")
 
-    pool = get_pool()
-    row = await pool.fetchrow(
-        """INSERT INTO recordings (user_id, transcript, duration_seconds)
-           VALUES ($1, $2, $3) RETURNING *""",
-        user_id, transcript, duration_seconds,
+    # The client, when given, must belong to the same user
+    row = await conn.fetchrow(
+        f"""INSERT INTO recordings (user_id, client_id, transcript, duration_seconds)
+           SELECT $1, $2, $3, $4
+           WHERE $2::integer IS NULL
+              OR EXISTS (SELECT 1 FROM clients WHERE id = $2 AND user_id = $1)
+           RETURNING {RECORDING_COLUMNS}""",
+        user_id, client_id, transcript, duration_seconds,
     )
+    if not row:
+        return JSONResponse(status_code=404, content={"error": "Client not found"})
+    # Without a client transcript the server transcribes once the audio is uploaded
+    if transcript is None:
+        await jobs.enqueue(conn, row["id"])
+        row = {**row, "transcription_status": "queued"}
 
     return JSONResponse(status_code=201, content={"recording": _recording_dict(row)})
 
 
+@router.post("")
+async def create_recording(request: Request, user_id: int = Depends(current_user_id)):
+    body = await request.json()
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            return await add_recording(conn, user_id, body)
+
+
 @router.get("")
-async def list_recordings(request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+async def list_recordings(
+    request: Request,
+    client_id: int | None = None,
+    page: Page = Depends(page_params),
+    shape: JsonShape = Depends(RECORDING_FIELDS),
+    user_id: int = Depends(current_user_id),
+):
+    source = f"SELECT {shape.columns()} FROM recordings WHERE user_id = $1"
+    args = [user_id]
+    if client_id is not None:
+        source += " AND client_id = $2"
+        args.append(client_id)
 
-    pool = get_pool()
+    pool = get_read_pool(user_id)
+    state = await collection_state(pool, request, user_id, "recordings")
+    if state.matches():
+        return state.not_modified()
+    items, next_cursor = await fetch_json_page(pool, source, args, shape, page)
+
+    return state.apply(list_response("recordings", items, next_cursor))
+
+
+@router.get("/search")
+async def search_recordings(
+    q: str = "",
+    limit: int | None = None,
+    cursor: str | None = None,
+    user_id: int = Depends(current_user_id),
+):
+    q = q.strip()
+    if not q:
+        return JSONResponse(status_code=400, content={"error": "Search query is required"})
+
+    page = await page_params(limit)
+    args = [user_id, q]
+    keyset = ""
+    if cursor:
+        rank, last_id = decode_rank_cursor(cursor)
+        keyset = " AND (ts_rank_cd(r.transcript_tsv, query)::float8, r.id) < ($3, $4)"
+        args.extend([rank, last_id])
+    args.append(page.limit + 1)
+
+    pool = get_read_pool(user_id)
+    # Rank every match via the GIN index, but only build headlines for the returned page
     rows = await pool.fetch(
-        "SELECT * FROM recordings WHERE user_id = $1 ORDER BY created_at DESC",
-        user_id,
+        f"""WITH hits AS (
+                SELECT r.id, r.user_id, r.client_id, r.transcript, r.transcription_status, r.duration_seconds,
+                       r.audio_content_type, r.audio_size_bytes, r.created_at,
+                       ts_rank_cd(r.transcript_tsv, query)::float8 AS rank, query
+                FROM recordings r, websearch_to_tsquery('english', $2) AS query
+                WHERE r.user_id = $1 AND r.transcript_tsv @@ query{keyset}
+                ORDER BY rank DESC, r.id DESC
+                LIMIT ${len(args)}
+            )
+            SELECT id, user_id, client_id, transcript, transcription_status, duration_seconds,
+                   audio_content_type, audio_size_bytes, created_at, rank,
+                   ts_headline('english', COALESCE(transcript, ''), query, '{_HEADLINE_OPTIONS}') AS snippet
+            FROM hits
+            ORDER BY rank DESC, id DESC""",
+        *args,
     )
 
-    return JSONResponse(
-        status_code=200,
-        content={"recordings": [_recording_dict(r) for r in rows]},
-    )
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        next_cursor = encode_rank_cursor(rows[-1]["rank"], rows[-1]["id"])
 
+    results = [
+        {**_recording_dict(r), "rank": r["rank"], "snippet": r["snippet"]}
+        for r in rows
+    ]
+    return JSONResponse(status_code=200, content={"recordings": results, "next_cursor": next_cursor})
 
-@router.get("/{recording_id}")
-async def get_recording(recording_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
 
-    pool = get_pool()
+@router.get("/{recording_id}")
+async def get_recording(recording_id: int, request: Request, user_id: int = Depends(current_user_id)):
+    pool = get_read_pool(user_id)
+    state = await collection_state(pool, request, user_id, "recordings")
+    if state.matches():
+        return state.not_modified()
     row = await pool.fetchrow(
-        "SELECT * FROM recordings WHERE id = $1 AND user_id = $2",
+        f"SELECT {RECORDING_COLUMNS} FROM recordings WHERE id = $1 AND user_id = $2",
         recording_id, user_id,
     )
     if not row:
         return JSONResponse(status_code=404, content={"error": "Recording not found"})
 
-    return JSONResponse(status_code=200, content={"recording": _recording_dict(row)})
+    return state.apply(JSONResponse(status_code=200, content={"recording": _recording_dict(row)}))
 
 
-@router.delete("/{recording_id}")
-async def delete_recording(recording_id: int, request: Request):
-    user_id = _get_user_id(request)
-    if user_id is None:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
+# ── Audio ────────────────────────────────────────────────
+
+_UPLOAD_COLUMNS = "id, recording_id, size_bytes, received_bytes, content_type, created_at"
+
+
+@router.post("/{recording_id}/audio")
+async def create_audio_upload(recording_id: int, request: Request, user_id: int = Depends(current_user_id)):
+    body = await request.json()
+    size_bytes = body.get("size_bytes")
+    content_type = (body.get("content_type") or "").strip().lower()
+
+    if not isinstance(size_bytes, int) or isinstance(size_bytes, bool) or size_bytes <= 0:
+        return JSONResponse(status_code=400, content={"error": "size_bytes must be a positive integer"})
+    if size_bytes > settings.AUDIO_MAX_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"Audio files are limited to {settings.AUDIO_MAX_BYTES} bytes"},
+        )
+    if not content_type.startswith("audio/") or len(content_type) > 100:
+        return JSONResponse(status_code=400, content={"error": "content_type must be an audio/* media type"})
 
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        # Abandoned sessions of this user are cleared whenever a new one starts
+        expired = await conn.fetch(
+            """DELETE FROM audio_uploads
+               WHERE user_id = $1 AND updated_at < NOW() - make_interval(hours => $2)
+               RETURNING id""",
+            user_id, settings.AUDIO_UPLOAD_TTL_HOURS,
+        )
+        row = await conn.fetchrow(
+            f"""INSERT INTO audio_uploads (id, user_id, recording_id, size_bytes, content_type)
+                SELECT $1, $2, id, $3, $4 FROM recordings WHERE id = $5 AND user_id = $2
+                RETURNING {_UPLOAD_COLUMNS}""",
+            uuid.uuid4(), user_id, size_bytes, content_type, recording_id,
+        )
+    await audio.discard_parts([str(r["id"]) for r in expired])
+    if not row:
+        return JSONResponse(status_code=404, content={"error": "Recording not found"})
+
+    return JSONResponse(status_code=201, content={"upload": _upload_dict(row)})
+
+
+async def _get_upload(conn, recording_id: int, upload_id: str, user_id: int):
+    try:
+        upload_uuid = uuid.UUID(upload_id)
+    except ValueError:
+        return None
+    return await conn.fetchrow(
+        f"""SELECT {_UPLOAD_COLUMNS} FROM audio_uploads
+            WHERE id = $1 AND recording_id = $2 AND user_id = $3""",
+        upload_uuid, recording_id, user_id,
+    )
+
+
+@router.get("/{recording_id}/audio/uploads/{upload_id}")
+async def get_audio_upload(recording_id: int, upload_id: str, user_id: int = Depends(current_user_id)):
+    pool = get_pool()
+    row = await _get_upload(pool, recording_id, upload_id, user_id)
+    if not row:
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+
+    return JSONResponse(status_code=200, content={"upload": _upload_dict(row)})
+
+
+@router.put("/{recording_id}/audio/uploads/{upload_id}")
+async def upload_audio_chunk(
+    recording_id: int,
+    upload_id: str,
+    request: Request,
+    user_id: int = Depends(current_user_id),
+):
+    pool = get_pool()
+    row = await _get_upload(pool, recording_id, upload_id, user_id)
+    if not row:
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+    # The URL may spell the id any way uuid.UUID accepts (case, braces, urn:uuid:);
+    # the part file must be the one expiry cleanup finds
+    upload_id = str(row["id"])
+
+    start, end = audio.parse_content_range(request.headers.get("content-range"), row["size_bytes"])
+    if start != row["received_bytes"]:
+        return JSONResponse(
+            status_code=409,
+            content={"error": "Chunk does not start at the upload offset", "received_bytes": row["received_bytes"]},
+        )
+
+    written = await audio.receive_chunk(request, upload_id, start, end)
+    # Only advances if no other request moved the offset while this chunk was written
+    received = await pool.fetchval(
+        """UPDATE audio_uploads SET received_bytes = $1, updated_at = NOW()
+            WHERE id = $2 AND received_bytes = $3
+            RETURNING received_bytes""",
+        start + written, row["id"], start,
+    )
+    if received is None:
+        return JSONResponse(status_code=409, content={"error": "Upload was modified concurrently"})
+    if received < row["size_bytes"]:
+        return JSONResponse(status_code=200, content={"upload": {**_upload_dict(row), "received_bytes": received}})
+
+    sha256 = await audio.hash_part(upload_id)
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            previous = await conn.fetchrow(
+                """SELECT audio_sha256, transcript, transcription_status FROM recordings
+                   WHERE id = $1 FOR UPDATE""",
+                recording_id,
+            )
+            if previous is None:
+                # Deleted while the upload was in progress; its session went with it
+                await audio.discard_parts([upload_id])
+                return JSONResponse(status_code=404, content={"error": "Recording not found"})
+            await audio.store_part(conn, upload_id, sha256, row["size_bytes"])
+            if previous["transcript"] is None or previous["transcription_status"] is not None:
+                await jobs.enqueue(conn, recording_id)
+            recording = await conn.fetchrow(
+                f"""UPDATE recordings
+                    SET audio_sha256 = $1, audio_content_type = $2, audio_size_bytes = $3
+                    WHERE id = $4 RETURNING {RECORDING_COLUMNS}""",
+                sha256, row["content_type"], row["size_bytes"], recording_id,
+            )
+            await conn.execute("DELETE FROM audio_uploads WHERE id = $1", row["id"])
+        if previous["audio_sha256"] and previous["audio_sha256"] != sha256:
+            await audio.release_blob(conn, previous["audio_sha256"])
+
+    return JSONResponse(status_code=200, content={"recording": _recording_dict(recording)})
+
+
+@router.api_route("/{recording_id}/audio", methods=["GET", "HEAD"])
+async def get_recording_audio(recording_id: int, user_id: int = Depends(current_user_id)):
     pool = get_pool()
     row = await pool.fetchrow(
-        "DELETE FROM recordings WHERE id = $1 AND user_id = $2 RETURNING id",
+        """SELECT audio_sha256, audio_content_type FROM recordings
+           WHERE id = $1 AND user_id = $2""",
         recording_id, user_id,
     )
     if not row:
         return JSONResponse(status_code=404, content={"error": "Recording not found"})
+    if not row["audio_sha256"]:
+        return JSONResponse(status_code=404, content={"error": "Recording has no audio"})
+
+    # Blobs never change once written, so the digest is a strong validator for If-Range
+    return FileResponse(
+        audio.blob_path(row["audio_sha256"]),
+        media_type=row["audio_content_type"],
+        headers={
+            "ETag": f'"{row["audio_sha256"]}"',
+            "Cache-Control": "private, max-age=31536000, immutable",
+        },
+    )
+
+
+@router.post("/{recording_id}/transcribe")
+async def transcribe_recording(recording_id: int, user_id: int = Depends(current_user_id)):
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            row = await conn.fetchrow(
+                "SELECT audio_sha256 FROM recordings WHERE id = $1 AND user_id = $2",
+                recording_id, user_id,
+            )
+            if not row:
+                return JSONResponse(status_code=404, content={"error": "Recording not found"})
+            if not row["audio_sha256"]:
+                return JSONResponse(status_code=409, content={"error": "Recording has no audio to transcribe"})
+            queued = await jobs.enqueue(conn, recording_id)
+
+    return JSONResponse(status_code=202, content={"queued": queued})
+
+
+async def _release_audio(sha256: str | None, uploads: list[str]):
+    async with get_pool().acquire() as conn:
+        await audio.release_blob(conn, sha256)
+    await audio.discard_parts(uploads)
+
+
+async def remove_recording(conn, user_id: int, recording_id: int) -> JSONResponse:
+    row = await conn.fetchrow(
+        """WITH deleted AS (
+               DELETE FROM recordings WHERE id = $1 AND user_id = $2
+               RETURNING id, audio_sha256
+           )
+           SELECT d.audio_sha256,
+                  ARRAY(SELECT u.id::text FROM audio_uploads u WHERE u.recording_id = d.id) AS uploads
+           FROM deleted d""",
+        recording_id, user_id,
+    )
+    if not row:
+        return JSONResponse(status_code=404, content={"error": "Recording not found"})
+    # Files go only once the delete has committed, or a rolled-back batch would lose them
+    await batch.after_commit(_release_audio, row["audio_sha256"], row["uploads"])
 
     return JSONResponse(status_code=200, content={"deleted": True})
+
+
+@router.delete("/{recording_id}")
+async def delete_recording(recording_id: int, user_id: int = Depends(current_user_id)):
+    return await remove_recording(get_pool(), user_id, recording_id)
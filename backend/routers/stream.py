@@ -0,0 +1,101 @@
+import asyncio
+
+import orjson
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import Headers
+
+from core import stream
+from core.auth import AuthError, verify_token
+from core.config import settings
+from core.errors import ApiError
+
+router = APIRouter(prefix="/api/stream")
+
+
+def _authenticate(headers: Headers, token: str | None) -> int:
+    # Browsers can't set headers on WebSocket or EventSource connections, hence ?token=
+    auth_header = headers.get("authorization", "")
+    if auth_header.startswith("Bearer "):
+        token = auth_header.split(" ", 1)[1]
+    if not token:
+        raise AuthError("No token provided")
+    user_id = verify_token(token)
+    if user_id is None:
+        raise AuthError("Invalid or expired token")
+    return user_id
+
+
+@router.websocket("")
+async def stream_socket(websocket: WebSocket, token: str | None = None, cursor: str | None = None):
+    await websocket.accept()
+    try:
+        user_id = _authenticate(websocket.headers, token)
+        seen = stream.decode_cursor(cursor) if cursor else None
+        subscriber = await stream.hub.open(user_id, seen)
+    except ApiError as exc:
+        # 4401, 4400, 4503: the HTTP status in the application close-code range
+        await websocket.send_text(orjson.dumps({"type": "error", "error": exc.message}).decode())
+        await websocket.close(code=4000 + exc.status_code)
+        return
+
+    async def watch_disconnect():
+        # Clients send nothing; reading is only how a closed socket is noticed
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscriber.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    stream.stream_connections.inc("websocket")
+    try:
+        async for event in subscriber.events():
+            message = orjson.dumps(event or {"type": "ping"}).decode()
+            # A client that stops reading is dropped; it resumes from its cursor
+            await asyncio.wait_for(websocket.send_text(message), settings.STREAM_SEND_TIMEOUT)
+            if event is not None:
+                stream.stream_events.inc("websocket")
+    except (WebSocketDisconnect, asyncio.TimeoutError, OSError):
+        pass
+    finally:
+        watcher.cancel()
+        stream.hub.close(subscriber)
+        stream.stream_connections.dec("websocket")
+
+
+# Server-sent events fallback for clients without WebSocket support (or behind proxies
+# that strip it). Each event's id is its cursor, which EventSource sends back as
+# Last-Event-ID when it reconnects.
+@router.get("")
+async def stream_events(request: Request, token: str | None = None, cursor: str | None = None):
+    user_id = _authenticate(request.headers, token)
+    request.state.user_id = user_id
+    resume = request.headers.get("last-event-id") or cursor
+    seen = stream.decode_cursor(resume) if resume else None
+    stream.hub.check_capacity()
+
+    async def body():
+        subscriber = await stream.hub.open(user_id, seen)
+        stream.stream_connections.inc("sse")
+        try:
+            yield f"retry: {settings.STREAM_RETRY_MS}\n\n".encode("utf-8")
+            async for event in subscriber.events():
+                if event is None:
+                    yield b": ping\n\n"
+                    continue
+                yield (
+                    f"id: {event['cursor']}\nevent: {event['type']}\n".encode("utf-8")
+                    + b"data: " + orjson.dumps(event) + b"\n\n"
+                )
+                if event["type"] == "change":
+                    stream.stream_events.inc("sse")
+        finally:
+            stream.hub.close(subscriber)
+            stream.stream_connections.dec("sse")
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,69 @@
+import orjson
+from fastapi import APIRouter, Depends
+
+from core import sync
+from core.auth import current_user_id
+from core.config import settings
+from core.database import get_pool
+from core.responses import JSONResponse, RawJSONResponse
+from routers.clients import CLIENT_JSON, STAKEHOLDER_JSON
+from routers.locations import PROFILE_JSON
+from routers.recordings import RECORDING_JSON
+
+router = APIRouter(prefix="/api/sync")
+
+_CHANGES = sync.changes_sql({
+    "clients": ("clients", CLIENT_JSON),
+    "stakeholders": ("stakeholders", STAKEHOLDER_JSON),
+    "locations": ("location_profiles", PROFILE_JSON),
+    "recordings": ("recordings", RECORDING_JSON),
+})
+
+
+# Everything created, changed or deleted since the cursor, in the same shapes as the
+# list endpoints. Without `since` (or with reset: true in the answer) the device should
+# replace its copy with what the pages return. Keep requesting with the returned cursor
+# while has_more is true; a stakeholder tombstone is also sent when its client's
+# deletion removed it.
+@router.get("")
+async def sync_changes(since: str | None = None, limit: int | None = None, user_id: int = Depends(current_user_id)):
+    if limit is None:
+        limit = settings.SYNC_PAGE_SIZE
+    if limit < 1 or limit > settings.SYNC_PAGE_MAX:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"limit must be between 1 and {settings.SYNC_PAGE_MAX}"},
+        )
+    txid, entity, entity_id, origin = sync.decode_cursor(since) if since else ("0", "", 0, "0")
+
+    # Always the primary: a replica's snapshot xmin says nothing about the primary's
+    pool = get_pool()
+    await sync.compact(pool)
+    rows = await pool.fetch(_CHANGES, user_id, txid, entity, entity_id, limit, origin)
+    if rows[0]["reset"]:
+        origin = "0"
+
+    changes = [r for r in rows if r["entity"] is not None]
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if has_more:
+        last = changes[-1]
+        cursor = sync.encode_cursor(last["txid"], last["entity"], last["entity_id"], origin)
+    else:
+        cursor = sync.encode_cursor(rows[0]["upto"])
+
+    upserted: dict[str, list[str]] = {name: [] for name in sync.ENTITIES}
+    deleted: dict[str, list[int]] = {name: [] for name in sync.ENTITIES}
+    for r in changes:
+        if r["data"] is None:
+            deleted[r["entity"]].append(r["entity_id"])
+        else:
+            upserted[r["entity"]].append(r["data"])
+
+    # Entity objects arrive as JSON text from Postgres, as on the list endpoints
+    parts = [f'"{name}":[{",".join(upserted[name])}]'.encode("utf-8") for name in sync.ENTITIES]
+    parts.append(b'"deleted":' + orjson.dumps(deleted))
+    parts.append(b'"cursor":' + orjson.dumps(cursor))
+    parts.append(b'"has_more":' + orjson.dumps(has_more))
+    parts.append(b'"reset":' + orjson.dumps(rows[0]["reset"]))
+    return RawJSONResponse(b"{" + b",".join(parts) + b"}")
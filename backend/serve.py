@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import importlib.util
+import os
+
+import asyncpg
+import uvicorn
+
+from core.config import settings
+
+# Production entry point: pre-forks API workers behind one listening socket.
+# `python main.py` stays the single-process, auto-reloading development server.
+#
+#   python serve.py                      # one worker per CPU
+#   python serve.py --workers 8 --max-requests 20000
+
+
+def cpu_count() -> int:
+    # CPUs this process may run on, which inside a container can be fewer than the host has
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+async def _connection_budget(host: str, port: int) -> int:
+    conn = await asyncpg.connect(
+        host=host,
+        port=port,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        database=settings.DB_NAME,
+    )
+    try:
+        max_connections = int(await conn.fetchval("SHOW max_connections"))
+        reserved = int(await conn.fetchval("SHOW superuser_reserved_connections"))
+    finally:
+        await conn.close()
+    return max_connections - reserved - settings.DB_CONNECTION_RESERVE
+
+
+def pool_size_per_worker(budget: int, workers: int, configured: int, dedicated: int = 0) -> int:
+    # dedicated: connections each worker opens outside its pool
+    per_worker = (budget - dedicated * workers) // workers
+    if per_worker < 1:
+        raise SystemExit(
+            f"Postgres allows {budget} application connections, too few for {workers} workers; "
+            "lower --workers or raise max_connections"
+        )
+    return min(configured, per_worker)
+
+
+def size_pools(workers: int):
+    # Each worker opens its own pool(s), plus one LISTEN connection to the primary
+    # (core/notify.py); shrink the pools so the whole fleet fits under max_connections,
+    # leaving DB_CONNECTION_RESERVE for migrate.py, worker.py and psql.
+    # Children read settings from the environment, so the sizes are passed that way.
+    budget = asyncio.run(_connection_budget(settings.DB_HOST, settings.DB_PORT))
+    size = pool_size_per_worker(budget, workers, settings.DB_POOL_MAX_SIZE, dedicated=1)
+    os.environ["DB_POOL_MAX_SIZE"] = str(size)
+    os.environ["DB_POOL_MIN_SIZE"] = str(min(settings.DB_POOL_MIN_SIZE, size))
+    print(f"Primary: {budget} connections available, {workers} workers x (pool of {size} + 1 listener)")
+
+    if settings.DB_REPLICA_HOST:
+        replica_budget = asyncio.run(
+            _connection_budget(settings.DB_REPLICA_HOST, settings.DB_REPLICA_PORT or settings.DB_PORT)
+        )
+        replica_size = pool_size_per_worker(
+            replica_budget, workers, settings.DB_REPLICA_POOL_MAX_SIZE or settings.DB_POOL_MAX_SIZE,
+        )
+        os.environ["DB_REPLICA_POOL_MAX_SIZE"] = str(replica_size)
+        print(f"Replica: {replica_budget} connections available, {workers} workers x pool of {replica_size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes")
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument(
+        "--workers", type=int, default=settings.WEB_WORKERS or cpu_count(),
+        help="worker processes (default: WEB_WORKERS, or one per CPU)",
+    )
+    parser.add_argument(
+        "--max-requests", type=int, default=settings.WEB_MAX_REQUESTS,
+        help="restart a worker after this many requests; 0 never does",
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=settings.WEB_GRACEFUL_TIMEOUT,
+        help="seconds a stopping worker waits for in-flight requests",
+    )
+    parser.add_argument("--skip-pool-sizing", action="store_true", help="use DB_POOL_* as configured")
+    args = parser.parse_args()
+
+    if not args.skip_pool_sizing:
+        size_pools(args.workers)
+    if args.workers > 1 and settings.RATE_LIMIT_BACKEND == "memory":
+        # Each worker keeps its own buckets and failure counts
+        print(
+            f"Warning: RATE_LIMIT_BACKEND=memory with {args.workers} workers lets each client make "
+            f"{args.workers}x the configured login/registration attempts; set RATE_LIMIT_BACKEND=postgres"
+        )
+
+    # uvicorn[standard] brings both; fall back to the pure-Python versions without them
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    print(f"Starting {args.workers} workers on {args.host}:{args.port} ({loop}, {http})")
+
+    # The supervisor replaces workers that exit, so --max-requests recycles them; the
+    # jitter keeps them from all restarting at once. On SIGTERM each worker stops
+    # accepting, finishes in-flight requests (up to --graceful-timeout), then runs the
+    # lifespan shutdown, which flushes buffered location samples and closes the pools.
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        limit_max_requests=args.max_requests or None,
+        limit_max_requests_jitter=min(settings.WEB_MAX_REQUESTS_JITTER, args.max_requests // 10),
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=settings.WEB_KEEP_ALIVE,
+        access_log=settings.WEB_ACCESS_LOG,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.WEB_FORWARDED_ALLOW_IPS,
+    )
+
+
+if __name__ == "__main__":
+    main()
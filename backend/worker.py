@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from core import audio, jobs, notify, transcription
+from core.config import settings
+from core.database import close_db, get_pool, init_db
+
+
+# Claims transcription jobs and runs the engine in a process pool, so CPU-heavy
+# work never touches the API processes. Run as many of these as throughput needs.
+class Worker:
+    def __init__(self, processes: int):
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self.processes = processes
+        self._executor: ProcessPoolExecutor | None = None
+        self._running: dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._last_recovery = 0.0
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self._executor
+
+    def _notified(self, *args):
+        self._wakeup.set()
+
+    async def run(self):
+        await init_db()
+        # core/notify.py's dedicated, self-reconnecting LISTEN connection. Jobs enqueued
+        # while it was down sent no wakeup, so reconnecting triggers a claim as well.
+        notify.subscribe(jobs.NOTIFY_CHANNEL, self._notified)
+        notify.on_state_change(self._notified)
+        notify.listener.start()
+        heartbeat = asyncio.create_task(self._heartbeat())
+        print(f"Transcription worker {self.id} started ({self.processes} processes, engine {settings.TRANSCRIPTION_ENGINE})")
+        try:
+            while not self._stopping:
+                await self._claim()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.TRANSCRIPTION_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            # Finish what was claimed; anything cut short is recovered by the lock timeout
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+            heartbeat.cancel()
+            await notify.listener.stop()
+            if self._executor is not None:
+                self._executor.shutdown()
+            await close_db()
+            print(f"Transcription worker {self.id} stopped")
+
+    async def _claim(self):
+        free = self.processes - len(self._running)
+        async with get_pool().acquire() as conn:
+            if time.monotonic() - self._last_recovery > settings.TRANSCRIPTION_LOCK_TIMEOUT / 2:
+                self._last_recovery = time.monotonic()
+                recovered = await jobs.requeue_stale(conn)
+                if recovered:
+                    print(f"Requeued {recovered} stale transcription jobs")
+            if free <= 0:
+                return
+            rows = await jobs.claim(conn, self.id, free)
+        for row in rows:
+            task = asyncio.create_task(self._process(row))
+            self._running[row["id"]] = task
+            task.add_done_callback(lambda _, job_id=row["id"]: self._finished(job_id))
+
+    def _finished(self, job_id: int):
+        self._running.pop(job_id, None)
+        self._wakeup.set()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.TRANSCRIPTION_HEARTBEAT)
+            try:
+                await jobs.heartbeat(get_pool(), self.id, list(self._running))
+            except Exception as exc:
+                print(f"Transcription heartbeat failed: {exc!r}")
+
+    async def _process(self, row):
+        path = str(audio.blob_path(row["audio_sha256"]))
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            transcript = await loop.run_in_executor(
+                self._get_executor(),
+                transcription.transcribe,
+                settings.TRANSCRIPTION_ENGINE, path, row["audio_content_type"],
+            )
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool) and self._executor is not None:
+                # A crashed child poisons the whole pool; start a fresh one for the next job
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            print(f"Transcription job {row['id']} failed (attempt {row['attempts']}/{row['max_attempts']}): {exc!r}")
+            await jobs.fail(get_pool(), row["id"], self.id, row["attempts"], repr(exc))
+            return
+
+        async with get_pool().acquire() as conn:
+            completed = await jobs.complete(conn, row["id"], self.id, row["audio_sha256"], transcript)
+        if completed:
+            print(f"Transcribed recording {row['recording_id']} in {time.perf_counter() - start:.2f}s")
+
+
+async def run(args: argparse.Namespace):
+    worker = Worker(args.processes)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background transcription jobs")
+    parser.add_argument(
+        "--processes", type=int, default=settings.TRANSCRIPTION_PROCESSES,
+        help="transcription processes in this worker",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
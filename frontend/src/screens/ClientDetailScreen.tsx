@@ -20,7 +20,8 @@ import {
   Inter_700Bold,
 } from '@expo-google-fonts/inter';
 import {
-  getClient,
+  fetchAll,
+  getClientOverview,
   getStakeholders,
   createStakeholder,
   deleteStakeholder,
@@ -64,12 +65,17 @@ export default function ClientDetailScreen({ token, clientId }: Props) {
 
   const loadData = useCallback(async () => {
     try {
-      const [clientData, stakeholderData] = await Promise.all([
-        getClient(token, clientId),
-        getStakeholders(token, clientId),
-      ]);
-      setClient(clientData.client);
-      setStakeholders(stakeholderData.stakeholders);
+      const overview = await getClientOverview(token, clientId, ['stakeholders']);
+      // The overview carries the first OVERVIEW_STAKEHOLDERS; page through the rest
+      const rest = overview.stakeholders_next_cursor
+        ? await fetchAll(
+            'stakeholders',
+            (cursor) => getStakeholders(token, clientId, cursor),
+            overview.stakeholders_next_cursor
+          )
+        : [];
+      setClient(overview.client);
+      setStakeholders([...(overview.stakeholders || []), ...rest]);
     } catch {} finally {
       setLoading(false);
     }
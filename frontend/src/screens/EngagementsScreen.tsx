@@ -20,7 +20,7 @@ import {
   Inter_600SemiBold,
   Inter_700Bold,
 } from '@expo-google-fonts/inter';
-import { createClient, getClients, Client } from '../services/api';
+import { createClient, fetchAll, getClientSummaries, ClientSummary } from '../services/api';
 import { EngagementsStackParamList } from '../navigation/types';
 
 type Props = {
@@ -46,7 +46,7 @@ export default function EngagementsScreen({ token }: Props) {
     Inter_700Bold,
   });
 
-  const [clients, setClients] = useState<Client[]>([]);
+  const [clients, setClients] = useState<ClientSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [showForm, setShowForm] = useState(false);
 
@@ -64,8 +64,7 @@ export default function EngagementsScreen({ token }: Props) {
 
   const loadClients = useCallback(async () => {
     try {
-      const data = await getClients(token);
-      setClients(data.clients);
+      setClients(await fetchAll('clients', (cursor) => getClientSummaries(token, cursor)));
     } catch {} finally {
       setLoading(false);
     }
@@ -27,6 +27,7 @@ import {
   createLocationProfile,
   getLocationProfiles,
   deleteLocationProfile,
+  fetchAll,
   LocationProfile,
 } from '../services/api';
 
@@ -102,8 +103,7 @@ export default function GeoSenseScreen({ token }: Props) {
 
   const loadProfiles = useCallback(async () => {
     try {
-      const data = await getLocationProfiles(token);
-      setProfiles(data.profiles);
+      setProfiles(await fetchAll('profiles', (cursor) => getLocationProfiles(token, cursor)));
     } catch {}
   }, [token]);
 
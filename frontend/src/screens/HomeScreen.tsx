@@ -21,8 +21,10 @@ import {
 } from '@expo-google-fonts/inter';
 import {
   createRecording,
-  getRecordings,
-  Recording,
+  uploadRecordingAudio,
+  getRecordingSummaries,
+  fetchAll,
+  RecordingSummary,
 } from '../services/api';
 import { HomeStackParamList } from '../navigation/types';
 
@@ -47,7 +49,7 @@ export default function HomeScreen({ user, token, onLogout }: HomeScreenProps) {
   const [elapsedSeconds, setElapsedSeconds] = useState(0);
 
   // Recordings list
-  const [recordings, setRecordings] = useState<Recording[]>([]);
+  const [recordings, setRecordings] = useState<RecordingSummary[]>([]);
   const [loadingRecordings, setLoadingRecordings] = useState(true);
 
   // Refs
@@ -57,8 +59,7 @@ export default function HomeScreen({ user, token, onLogout }: HomeScreenProps) {
 
   const loadRecordings = useCallback(async () => {
     try {
-      const data = await getRecordings(token);
-      setRecordings(data.recordings);
+      setRecordings(await fetchAll('recordings', (cursor) => getRecordingSummaries(token, cursor)));
     } catch {} finally {
       setLoadingRecordings(false);
     }
@@ -105,8 +106,10 @@ export default function HomeScreen({ user, token, onLogout }: HomeScreenProps) {
       timerRef.current = null;
     }
 
+    let audioUri: string | null = null;
     if (recordingRef.current) {
       await recordingRef.current.stopAndUnloadAsync();
+      audioUri = recordingRef.current.getURI();
       recordingRef.current = null;
     }
 
@@ -115,8 +118,12 @@ export default function HomeScreen({ user, token, onLogout }: HomeScreenProps) {
 
     // Auto-save the recording
     try {
-      await createRecording(token, { duration_seconds: elapsedRef.current });
+      const { recording } = await createRecording(token, { duration_seconds: elapsedRef.current });
       await loadRecordings();
+      if (audioUri) {
+        await uploadRecordingAudio(token, recording.id, audioUri);
+        await loadRecordings();
+      }
     } catch {}
 
     setElapsedSeconds(0);
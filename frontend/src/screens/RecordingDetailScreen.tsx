@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import {
   View,
   Text,
@@ -9,6 +9,7 @@ import {
   ScrollView,
 } from 'react-native';
 import { LinearGradient } from 'expo-linear-gradient';
+import { Audio, AVPlaybackStatus } from 'expo-av';
 import { useNavigation } from '@react-navigation/native';
 import {
   useFonts,
@@ -17,7 +18,7 @@ import {
   Inter_600SemiBold,
   Inter_700Bold,
 } from '@expo-google-fonts/inter';
-import { getRecording, deleteRecording, Recording } from '../services/api';
+import { getRecording, deleteRecording, recordingAudioSource, Recording } from '../services/api';
 
 type Props = {
   token: string;
@@ -37,6 +38,13 @@ export default function RecordingDetailScreen({ token, recordingId }: Props) {
   const [loading, setLoading] = useState(true);
   const [deleting, setDeleting] = useState(false);
 
+  // Playback
+  const soundRef = useRef<Audio.Sound | null>(null);
+  const [isPlaying, setIsPlaying] = useState(false);
+  const [positionMs, setPositionMs] = useState(0);
+  const [durationMs, setDurationMs] = useState(0);
+  const [trackWidth, setTrackWidth] = useState(0);
+
   const loadData = useCallback(async () => {
     try {
       const data = await getRecording(token, recordingId);
@@ -50,6 +58,53 @@ export default function RecordingDetailScreen({ token, recordingId }: Props) {
     loadData();
   }, [loadData]);
 
+  const onPlaybackStatus = useCallback((status: AVPlaybackStatus) => {
+    if (!status.isLoaded) return;
+    setIsPlaying(status.isPlaying);
+    setPositionMs(status.positionMillis);
+    if (status.durationMillis) setDurationMs(status.durationMillis);
+  }, []);
+
+  // The audio is streamed with Range requests, so it starts and seeks without a full download
+  useEffect(() => {
+    if (!recording?.audio_size_bytes) return;
+    let cancelled = false;
+    Audio.Sound.createAsync(
+      recordingAudioSource(token, recording.id),
+      { shouldPlay: false, progressUpdateIntervalMillis: 250 },
+      onPlaybackStatus
+    )
+      .then(({ sound }) => {
+        if (cancelled) {
+          sound.unloadAsync();
+        } else {
+          soundRef.current = sound;
+        }
+      })
+      .catch(() => {});
+    return () => {
+      cancelled = true;
+      soundRef.current?.unloadAsync();
+      soundRef.current = null;
+    };
+  }, [token, recording?.id, recording?.audio_size_bytes, onPlaybackStatus]);
+
+  const togglePlayback = async () => {
+    if (!soundRef.current) return;
+    if (isPlaying) {
+      await soundRef.current.pauseAsync();
+    } else {
+      await soundRef.current.playAsync();
+    }
+  };
+
+  const seekTo = async (ms: number) => {
+    if (!soundRef.current || !durationMs) return;
+    const target = Math.max(0, Math.min(ms, durationMs));
+    setPositionMs(target);
+    await soundRef.current.setPositionAsync(target);
+  };
+
   const handleDelete = async () => {
     setDeleting(true);
     try {
@@ -138,6 +193,42 @@ export default function RecordingDetailScreen({ token, recordingId }: Props) {
           </View>
         </View>
 
+        {/* Player */}
+        {recording.audio_size_bytes ? (
+          <View style={styles.playerCard}>
+            <TouchableOpacity
+              activeOpacity={1}
+              style={styles.progressTrack}
+              onLayout={(e) => setTrackWidth(e.nativeEvent.layout.width)}
+              onPress={(e) =>
+                trackWidth && seekTo((e.nativeEvent.locationX / trackWidth) * durationMs)
+              }
+            >
+              <View
+                style={[
+                  styles.progressFill,
+                  { width: durationMs ? `${(positionMs / durationMs) * 100}%` : '0%' },
+                ]}
+              />
+            </TouchableOpacity>
+            <View style={styles.timeRow}>
+              <Text style={styles.timeText}>{formatDuration(Math.floor(positionMs / 1000))}</Text>
+              <Text style={styles.timeText}>{formatDuration(Math.floor(durationMs / 1000))}</Text>
+            </View>
+            <View style={styles.controlsRow}>
+              <TouchableOpacity style={styles.skipButton} onPress={() => seekTo(positionMs - 15000)}>
+                <Text style={styles.skipText}>-15s</Text>
+              </TouchableOpacity>
+              <TouchableOpacity style={styles.playButton} onPress={togglePlayback}>
+                <Text style={styles.playText}>{isPlaying ? 'Pause' : 'Play'}</Text>
+              </TouchableOpacity>
+              <TouchableOpacity style={styles.skipButton} onPress={() => seekTo(positionMs + 15000)}>
+                <Text style={styles.skipText}>+15s</Text>
+              </TouchableOpacity>
+            </View>
+          </View>
+        ) : null}
+
         {/* Delete */}
         <TouchableOpacity
           style={styles.deleteButton}
@@ -255,6 +346,65 @@ const styles = StyleSheet.create({
     textAlign: 'right',
   },
 
+  // Player
+  playerCard: {
+    backgroundColor: 'rgba(255,255,255,0.08)',
+    borderWidth: 1,
+    borderColor: 'rgba(255,255,255,0.1)',
+    borderRadius: 16,
+    padding: 20,
+    marginBottom: 24,
+  },
+  progressTrack: {
+    height: 20,
+    justifyContent: 'center',
+    borderRadius: 10,
+  },
+  progressFill: {
+    height: 4,
+    borderRadius: 2,
+    backgroundColor: '#818cf8',
+  },
+  timeRow: {
+    flexDirection: 'row',
+    justifyContent: 'space-between',
+    marginTop: 6,
+  },
+  timeText: {
+    fontSize: 12,
+    fontFamily: 'Inter_500Medium',
+    color: 'rgba(255,255,255,0.4)',
+  },
+  controlsRow: {
+    flexDirection: 'row',
+    justifyContent: 'center',
+    alignItems: 'center',
+    marginTop: 16,
+    gap: 16,
+  },
+  playButton: {
+    paddingVertical: 12,
+    paddingHorizontal: 28,
+    borderRadius: 24,
+    backgroundColor: '#6366f1',
+  },
+  playText: {
+    fontSize: 15,
+    fontFamily: 'Inter_600SemiBold',
+    color: '#fff',
+  },
+  skipButton: {
+    paddingVertical: 10,
+    paddingHorizontal: 14,
+    borderRadius: 20,
+    backgroundColor: 'rgba(255,255,255,0.08)',
+  },
+  skipText: {
+    fontSize: 13,
+    fontFamily: 'Inter_500Medium',
+    color: '#fff',
+  },
+
   // Delete
   deleteButton: {
     paddingVertical: 14,
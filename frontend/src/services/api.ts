@@ -16,17 +16,69 @@ type ErrorResponse = {
   error: string;
 };
 
+// List endpoints return one keyset page at a time; pass next_cursor back to get the next one
+function withCursor(path: string, cursor?: string | null): string {
+  if (!cursor) return path;
+  return `${path}${path.includes('?') ? '&' : '?'}cursor=${encodeURIComponent(cursor)}`;
+}
+
+// Follows next_cursor to the last page, for screens that show a whole collection;
+// `from` continues a list whose first page came from elsewhere (e.g. an overview)
+export async function fetchAll<K extends string, T>(
+  key: K,
+  getPage: (cursor: string | null) => Promise<Record<K, T[]> & { next_cursor: string | null }>,
+  from: string | null = null
+): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = from;
+  do {
+    const page = await getPage(cursor);
+    items.push(...page[key]);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
+}
+
+// Last GET response per token and path; sent back as If-None-Match so unchanged
+// collections come back as an empty 304 instead of the full body
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+// Stamp of our latest write; sent with every request so reads served from a
+// database replica are guaranteed to include it
+let consistencyToken: string | null = null;
+
 async function request<T>(path: string, options: RequestInit = {}): Promise<T> {
+  const isGet = !options.method || options.method === 'GET';
+  const auth = (options.headers as Record<string, string> | undefined)?.Authorization || '';
+  const cacheKey = `${auth} ${path}`;
+  const cached = isGet ? etagCache.get(cacheKey) : undefined;
+
   const res = await fetch(`${API_URL}${path}`, {
     ...options,
     headers: {
       'Content-Type': 'application/json',
+      ...(cached ? { 'If-None-Match': cached.etag } : {}),
+      ...(consistencyToken ? { 'X-Consistency-Token': consistencyToken } : {}),
       ...options.headers,
     },
   });
 
+  const written = res.headers.get('X-Consistency-Token');
+  if (written) {
+    consistencyToken = written;
+  }
+
+  if (res.status === 304 && cached) {
+    return cached.data as T;
+  }
+
   const data = await res.json();
 
+  const etag = res.headers.get('ETag');
+  if (isGet && res.ok && etag) {
+    etagCache.set(cacheKey, { etag, data });
+  }
+
   if (!res.ok) {
     throw new Error((data as ErrorResponse).error || 'Something went wrong');
   }
@@ -87,10 +139,58 @@ export async function createLocationProfile(
 }
 
 export async function getLocationProfiles(
-  token: string
-): Promise<{ profiles: LocationProfile[] }> {
-  return request<{ profiles: LocationProfile[] }>('/locations', {
+  token: string,
+  cursor?: string | null
+): Promise<{ profiles: LocationProfile[]; next_cursor: string | null }> {
+  return request<{ profiles: LocationProfile[]; next_cursor: string | null }>(withCursor('/locations', cursor), {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+}
+
+export type NearbyProfile = LocationProfile & { distance_m: number };
+
+export async function getNearbyProfiles(
+  token: string,
+  latitude: number,
+  longitude: number,
+  radius = 1000
+): Promise<{ profiles: NearbyProfile[] }> {
+  return request<{ profiles: NearbyProfile[] }>(
+    `/locations/nearby?lat=${latitude}&lng=${longitude}&radius=${radius}`,
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+}
+
+export async function matchGeofence(
+  token: string,
+  latitude: number,
+  longitude: number
+): Promise<{ match: NearbyProfile | null; inside: NearbyProfile[]; radius_m: number }> {
+  return request<{ match: NearbyProfile | null; inside: NearbyProfile[]; radius_m: number }>(
+    `/locations/geofence?lat=${latitude}&lng=${longitude}`,
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+}
+
+export type TrackSample = {
+  seq: number;
+  recorded_at: number; // epoch milliseconds, as reported by expo-location
+  latitude: number;
+  longitude: number;
+  accuracy_m?: number | null;
+  speed_mps?: number | null;
+  heading?: number | null;
+};
+
+export async function uploadTrack(
+  token: string,
+  deviceId: string,
+  samples: TrackSample[]
+): Promise<{ accepted: number; duplicates: number; last_seq: number }> {
+  return request<{ accepted: number; duplicates: number; last_seq: number }>('/locations/track', {
+    method: 'POST',
     headers: { Authorization: `Bearer ${token}` },
+    body: JSON.stringify({ device_id: deviceId, samples }),
   });
 }
 
@@ -155,12 +255,39 @@ export async function createClient(
   });
 }
 
-export async function getClients(token: string): Promise<{ clients: Client[] }> {
-  return request<{ clients: Client[] }>('/clients', {
+export async function getClients(
+  token: string,
+  cursor?: string | null
+): Promise<{ clients: Client[]; next_cursor: string | null }> {
+  return request<{ clients: Client[]; next_cursor: string | null }>(withCursor('/clients', cursor), {
     headers: { Authorization: `Bearer ${token}` },
   });
 }
 
+// view=summary: only the columns the list screen renders
+export type ClientSummary = Pick<
+  Client,
+  | 'id'
+  | 'client_name'
+  | 'client_code'
+  | 'industry_sector'
+  | 'headquarters_location'
+  | 'client_tier'
+  | 'engagement_health'
+  | 'is_active'
+  | 'created_at'
+>;
+
+export async function getClientSummaries(
+  token: string,
+  cursor?: string | null
+): Promise<{ clients: ClientSummary[]; next_cursor: string | null }> {
+  return request<{ clients: ClientSummary[]; next_cursor: string | null }>(
+    withCursor('/clients?view=summary', cursor),
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+}
+
 export async function getClient(token: string, clientId: number): Promise<{ client: Client }> {
   return request<{ client: Client }>(`/clients/${clientId}`, {
     headers: { Authorization: `Bearer ${token}` },
@@ -194,9 +321,37 @@ export async function createStakeholder(
 
 export async function getStakeholders(
   token: string,
-  clientId: number
-): Promise<{ stakeholders: Stakeholder[] }> {
-  return request<{ stakeholders: Stakeholder[] }>(`/clients/${clientId}/stakeholders`, {
+  clientId: number,
+  cursor?: string | null
+): Promise<{ stakeholders: Stakeholder[]; next_cursor: string | null }> {
+  return request<{ stakeholders: Stakeholder[]; next_cursor: string | null }>(
+    withCursor(`/clients/${clientId}/stakeholders`, cursor),
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+}
+
+export type ClientOverview = {
+  client: Client;
+  stakeholders?: Stakeholder[];
+  stakeholders_next_cursor?: string | null;
+  recordings?: Recording[];
+  more_recordings?: boolean;
+  summary?: {
+    stakeholder_count: number;
+    recording_count: number;
+    recorded_seconds: number;
+    last_recording_at: string | null;
+  };
+};
+
+// Client, stakeholders, recent recordings and counts in one request
+export async function getClientOverview(
+  token: string,
+  clientId: number,
+  include?: ('stakeholders' | 'recordings' | 'summary')[]
+): Promise<ClientOverview> {
+  const query = include ? `?include=${include.join(',')}` : '';
+  return request<ClientOverview>(`/clients/${clientId}/overview${query}`, {
     headers: { Authorization: `Bearer ${token}` },
   });
 }
@@ -217,14 +372,18 @@ export async function deleteStakeholder(
 export type Recording = {
   id: number;
   user_id: number;
+  client_id: number | null;
   transcript: string | null;
+  transcription_status: 'queued' | 'processing' | 'completed' | 'failed' | null;
   duration_seconds: number | null;
+  audio_content_type: string | null;
+  audio_size_bytes: number | null;
   created_at: string;
 };
 
 export async function createRecording(
   token: string,
-  data: { transcript?: string; duration_seconds?: number }
+  data: { transcript?: string; duration_seconds?: number; client_id?: number }
 ): Promise<{ recording: Recording }> {
   return request<{ recording: Recording }>('/recordings', {
     method: 'POST',
@@ -233,8 +392,46 @@ export async function createRecording(
   });
 }
 
-export async function getRecordings(token: string): Promise<{ recordings: Recording[] }> {
-  return request<{ recordings: Recording[] }>('/recordings', {
+export async function getRecordings(
+  token: string,
+  cursor?: string | null
+): Promise<{ recordings: Recording[]; next_cursor: string | null }> {
+  return request<{ recordings: Recording[]; next_cursor: string | null }>(withCursor('/recordings', cursor), {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+}
+
+// view=summary leaves out the transcript, which is most of a recording's size
+export type RecordingSummary = Pick<
+  Recording,
+  'id' | 'client_id' | 'transcription_status' | 'duration_seconds' | 'audio_size_bytes' | 'created_at'
+>;
+
+export async function getRecordingSummaries(
+  token: string,
+  cursor?: string | null
+): Promise<{ recordings: RecordingSummary[]; next_cursor: string | null }> {
+  return request<{ recordings: RecordingSummary[]; next_cursor: string | null }>(
+    withCursor('/recordings?view=summary', cursor),
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+}
+
+export type RecordingSearchResult = Recording & {
+  rank: number;
+  snippet: string;
+};
+
+export async function searchRecordings(
+  token: string,
+  query: string,
+  cursor?: string | null
+): Promise<{ recordings: RecordingSearchResult[]; next_cursor: string | null }> {
+  let path = `/recordings/search?q=${encodeURIComponent(query)}`;
+  if (cursor) {
+    path += `&cursor=${encodeURIComponent(cursor)}`;
+  }
+  return request<{ recordings: RecordingSearchResult[]; next_cursor: string | null }>(path, {
     headers: { Authorization: `Bearer ${token}` },
   });
 }
@@ -257,3 +454,242 @@ export async function deleteRecording(
     headers: { Authorization: `Bearer ${token}` },
   });
 }
+
+export async function transcribeRecording(
+  token: string,
+  recordingId: number
+): Promise<{ queued: boolean }> {
+  return request<{ queued: boolean }>(`/recordings/${recordingId}/transcribe`, {
+    method: 'POST',
+    headers: { Authorization: `Bearer ${token}` },
+  });
+}
+
+// Recording audio
+
+export type AudioUpload = {
+  id: string;
+  recording_id: number;
+  size_bytes: number;
+  received_bytes: number;
+  content_type: string;
+  created_at: string;
+};
+
+const AUDIO_CHUNK_BYTES = 4 * 1024 * 1024;
+const AUDIO_CHUNK_RETRIES = 5;
+
+async function putAudioChunk(
+  token: string,
+  recordingId: number,
+  upload: AudioUpload,
+  chunk: Blob,
+  start: number
+): Promise<{ upload?: AudioUpload; recording?: Recording }> {
+  const end = start + chunk.size - 1;
+  const res = await fetch(`${API_URL}/recordings/${recordingId}/audio/uploads/${upload.id}`, {
+    method: 'PUT',
+    headers: {
+      Authorization: `Bearer ${token}`,
+      'Content-Type': 'application/octet-stream',
+      'Content-Range': `bytes ${start}-${end}/${upload.size_bytes}`,
+    },
+    body: chunk,
+  });
+  const data = await res.json();
+  if (!res.ok && res.status !== 409) {
+    throw new Error((data as ErrorResponse).error || 'Something went wrong');
+  }
+  return data;
+}
+
+export async function getAudioUpload(
+  token: string,
+  recordingId: number,
+  uploadId: string
+): Promise<{ upload: AudioUpload }> {
+  return request<{ upload: AudioUpload }>(`/recordings/${recordingId}/audio/uploads/${uploadId}`, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+}
+
+// Uploads a local audio file in chunks. After a dropped connection it asks the server how much
+// arrived and continues from there; pass a previous upload id to resume across app restarts.
+export async function uploadRecordingAudio(
+  token: string,
+  recordingId: number,
+  uri: string,
+  options: { uploadId?: string; onProgress?: (received: number, total: number) => void } = {}
+): Promise<{ recording: Recording }> {
+  const blob = await (await fetch(uri)).blob();
+
+  let upload: AudioUpload;
+  if (options.uploadId) {
+    upload = (await getAudioUpload(token, recordingId, options.uploadId)).upload;
+  } else {
+    upload = (
+      await request<{ upload: AudioUpload }>(`/recordings/${recordingId}/audio`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${token}` },
+        body: JSON.stringify({ size_bytes: blob.size, content_type: blob.type || 'audio/mp4' }),
+      })
+    ).upload;
+  }
+
+  let offset = upload.received_bytes;
+  let failures = 0;
+  while (true) {
+    options.onProgress?.(offset, upload.size_bytes);
+    try {
+      const chunk = blob.slice(offset, Math.min(offset + AUDIO_CHUNK_BYTES, upload.size_bytes));
+      const data = await putAudioChunk(token, recordingId, upload, chunk, offset);
+      if (data.recording) {
+        options.onProgress?.(upload.size_bytes, upload.size_bytes);
+        return { recording: data.recording };
+      }
+      if (!data.upload) {
+        throw new Error('Upload offset changed');
+      }
+      offset = data.upload.received_bytes;
+      failures = 0;
+    } catch (err) {
+      failures += 1;
+      if (failures > AUDIO_CHUNK_RETRIES) {
+        throw err;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** failures));
+      offset = (await getAudioUpload(token, recordingId, upload.id)).upload.received_bytes;
+    }
+  }
+}
+
+// Playback source for expo-av; the server answers Range requests, so seeking only fetches what it needs
+export function recordingAudioSource(
+  token: string,
+  recordingId: number
+): { uri: string; headers: Record<string, string> } {
+  return {
+    uri: `${API_URL}/recordings/${recordingId}/audio`,
+    headers: { Authorization: `Bearer ${token}` },
+  };
+}
+
+// Change stream
+
+export type CollectionName = 'clients' | 'stakeholders' | 'locations' | 'recordings';
+
+export type ChangeEvent = { collection: CollectionName; version: number };
+
+// Tells the app when one of the user's collections changes so it can refetch instead of
+// polling. Uses a WebSocket, falling back to server-sent events where that fails, and
+// reconnects with the last cursor so changes made while offline are still reported.
+// onReady fires on every (re)connect once the catch-up events have been delivered.
+export function subscribeToChanges(
+  token: string,
+  onChange: (event: ChangeEvent) => void,
+  onReady?: () => void
+): () => void {
+  const streamUrl = `${API_URL}/stream?token=${encodeURIComponent(token)}`;
+  let cursor: string | null = null;
+  let closed = false;
+  let failures = 0;
+  let useSse = false;
+  let socket: WebSocket | null = null;
+  let source: EventSource | null = null;
+  let retryTimer: ReturnType<typeof setTimeout> | null = null;
+
+  const handle = (message: { type: string; cursor?: string } & Partial<ChangeEvent>) => {
+    if (message.cursor) {
+      cursor = message.cursor;
+    }
+    if (message.type === 'change' && message.collection && message.version) {
+      onChange({ collection: message.collection, version: message.version });
+    } else if (message.type === 'ready') {
+      failures = 0;
+      onReady?.();
+    }
+  };
+
+  const reconnect = () => {
+    if (closed || retryTimer) return;
+    failures += 1;
+    const delay = Math.min(1000 * 2 ** failures, 30000) * (0.5 + Math.random() / 2);
+    retryTimer = setTimeout(() => {
+      retryTimer = null;
+      connect();
+    }, delay);
+  };
+
+  const connect = () => {
+    const url = cursor ? `${streamUrl}&cursor=${encodeURIComponent(cursor)}` : streamUrl;
+    if (useSse && typeof EventSource !== 'undefined') {
+      source = new EventSource(url);
+      for (const type of ['change', 'ready']) {
+        source.addEventListener(type, (e) => handle(JSON.parse((e as MessageEvent).data)));
+      }
+      source.onerror = () => {
+        source?.close();
+        source = null;
+        reconnect();
+      };
+      return;
+    }
+
+    let opened = false;
+    socket = new WebSocket(url.replace(/^http/, 'ws'));
+    socket.onopen = () => {
+      opened = true;
+    };
+    socket.onmessage = (e) => handle(JSON.parse(e.data));
+    socket.onclose = (e) => {
+      socket = null;
+      // 4401: the token is no longer valid; reconnecting won't help
+      if (e.code === 4401) return;
+      // A socket that never opened is likely blocked on the way; try SSE next time
+      if (!opened) useSse = true;
+      reconnect();
+    };
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    if (retryTimer) clearTimeout(retryTimer);
+    socket?.close();
+    source?.close();
+  };
+}
+
+// Batched writes
+
+// A queued write as it would have been sent on its own; paths are relative to /api.
+// "$<n>" as an id in the path, or as a *_id body field, stands for the id that
+// operation n of the same batch created.
+export type BatchOperation = {
+  method: 'POST' | 'PATCH' | 'DELETE';
+  path: string;
+  body?: Record<string, unknown>;
+  // Keep the same key when retrying, so an edit is never applied twice
+  idempotency_key?: string;
+};
+
+export type BatchResult = {
+  status: number;
+  body: unknown;
+  replayed: boolean;
+};
+
+// Applies the operations in order, in one transaction on the server. Each result carries
+// the status its request would have had on its own; one failing does not stop the rest.
+export async function runBatch(
+  token: string,
+  operations: BatchOperation[]
+): Promise<{ results: BatchResult[] }> {
+  return request<{ results: BatchResult[] }>('/batch', {
+    method: 'POST',
+    headers: { Authorization: `Bearer ${token}` },
+    body: JSON.stringify({
+      operations: operations.map((op) => ({ ...op, path: `/api${op.path}` })),
+    }),
+  });
+}